@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de régression - débit de ScriptAnalyzerV2.exporter_json
+Exporte un projet synthétique (100 000 shots par défaut) avec chaque
+encodeur JSON installé (orjson, msgspec, json) en modes compact et indenté,
+et échoue (code 1) si le débit de l'encodeur par défaut passe sous le budget.
+
+Usage : python benchmarks/export_json.py [--shots 100000] [--runs 3] [--min-shots-per-s 50000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from project_model import ShotTable  # noqa: E402
+from script_analyzer_v2 import ScriptAnalyzerV2  # noqa: E402
+from serialization import MODES, available_backends, default_backend  # noqa: E402
+
+
+def synthetic_project(count: int) -> ShotTable:
+    """`count` shots obtenus en répétant ceux du script par défaut"""
+    base = ScriptAnalyzerV2().analyser_script_avance()
+    table = ShotTable()
+    for index in range(count):
+        shot = base[index % len(base)].to_dict()
+        shot['numero'] = index + 1
+        table.append(shot)
+    return table
+
+
+def measure(analyzer: ScriptAnalyzerV2, shots: ShotTable, path: str, mode: str, backend: str, runs: int):
+    """Meilleur temps d'export (s) sur `runs` essais et taille du fichier (octets)"""
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        analyzer.exporter_json(shots, path, mode=mode, backend=backend)
+        best = min(best, time.perf_counter() - start)
+    return best, os.path.getsize(path)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--shots", type=int, default=100_000, help="taille du projet synthétique")
+    parser.add_argument("--runs", type=int, default=3, help="essais par combinaison (meilleur temps retenu)")
+    parser.add_argument("--min-shots-per-s", type=float, default=50_000.0,
+                        help="débit minimal de l'encodeur par défaut, mode compact")
+    args = parser.parse_args()
+
+    analyzer = ScriptAnalyzerV2()
+    analyzer.horodatage = datetime(2025, 1, 1)
+    shots = synthetic_project(args.shots)
+
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "project_data.json")
+        for backend in available_backends():
+            for mode in MODES:
+                elapsed, size = measure(analyzer, shots, path, mode, backend, args.runs)
+                rate = args.shots / elapsed
+                status = ""
+                if backend == default_backend() and mode == "compact":
+                    status = "OK" if rate >= args.min_shots_per_s else "RÉGRESSION"
+                    failed |= rate < args.min_shots_per_s
+                print(f"{backend:8} {mode:8} {elapsed * 1000:8.1f} ms  {rate:10.0f} shots/s  "
+                      f"{size / 1e6:6.1f} Mo {status}".rstrip())
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de régression - temps d'import à froid du backend V3
+Lance plusieurs processus `python -X importtime`, prend la médiane du temps
+cumulé d'import et échoue (code 1) si elle dépasse le budget ou si une
+dépendance optionnelle lourde est chargée au démarrage.
+
+Usage : python benchmarks/import_time.py [--budget-ms 120] [--runs 7]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+MODULES = ["script_analyzer_v3_backend"]
+
+# Modules qui ne doivent jamais être chargés par un simple import du backend
+LAZY_MODULES = ["reportlab", "requests", "numpy", "PIL", "concurrent.futures", "subprocess"]
+
+
+def measure_import_us(module: str) -> int:
+    """Temps cumulé d'import (µs) d'un module dans un processus neuf"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    for line in reversed(proc.stderr.splitlines()):
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    raise RuntimeError(f"Temps d'import introuvable pour {module}")
+
+
+def eagerly_loaded(module: str) -> list:
+    """Dépendances optionnelles chargées par l'import du module"""
+    code = (
+        f"import sys, {module}; "
+        f"print(' '.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return proc.stdout.split()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=120.0, help="temps cumulé maximal (médiane)")
+    parser.add_argument("--runs", type=int, default=7, help="nombre de processus mesurés")
+    args = parser.parse_args()
+
+    failed = False
+    for module in MODULES:
+        measure_import_us(module)  # premier lancement : compilation du .pyc
+        samples = [measure_import_us(module) / 1000 for _ in range(args.runs)]
+        median = statistics.median(samples)
+        status = "OK" if median <= args.budget_ms else "RÉGRESSION"
+        print(f"{module}: médiane {median:.1f} ms (min {min(samples):.1f}, budget {args.budget_ms:.0f} ms) {status}")
+        failed |= median > args.budget_ms
+
+        eager = eagerly_loaded(module)
+        if eager:
+            print(f"{module}: dépendances chargées au démarrage : {', '.join(eager)} RÉGRESSION")
+            failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
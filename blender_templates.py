@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Templates Blender - Court-Métrage K-pop Salta
+Les scripts Blender générés sont rendus depuis templates/blender/*.tmpl
+(syntaxe string.Template : ${nom}). Chaque template est découpé une seule
+fois en morceaux littéraux et champs, puis gardé en cache : rendre un script
+par shot n'est plus qu'une concaténation de paramètres.
+"""
+
+from functools import lru_cache
+from pathlib import Path
+from string import Template
+from typing import Any, List, Mapping, Tuple, Union
+
+TEMPLATE_DIR = Path(__file__).resolve().parent / "templates" / "blender"
+
+
+class CompiledTemplate:
+    """Template découpé en [littéral, champ, littéral, champ, ..., littéral]"""
+
+    def __init__(self, source: str, name: str = "<template>"):
+        self.name = name
+        self._literals: List[str] = []
+        self._fields: List[str] = []
+
+        position = 0
+        literal = []
+        for match in Template.pattern.finditer(source):
+            literal.append(source[position:match.start()])
+            position = match.end()
+            if match.group("escaped") is not None:
+                literal.append(Template.delimiter)
+            elif match.group("invalid") is not None:
+                line = source.count("\n", 0, match.start()) + 1
+                raise ValueError(f"{name}: placeholder invalide ligne {line}")
+            else:
+                self._literals.append("".join(literal))
+                self._fields.append(match.group("named") or match.group("braced"))
+                literal = []
+        literal.append(source[position:])
+        self._literals.append("".join(literal))
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        """Noms des champs, dans l'ordre d'apparition (doublons compris)"""
+        return tuple(self._fields)
+
+    def render(self, params: Mapping[str, Any]) -> str:
+        parts = [self._literals[0]]
+        try:
+            for field, literal in zip(self._fields, self._literals[1:]):
+                parts.append(str(params[field]))
+                parts.append(literal)
+        except KeyError as exc:
+            raise KeyError(f"{self.name}: paramètre manquant {exc.args[0]!r}") from None
+        return "".join(parts)
+
+
+@lru_cache(maxsize=None)
+def _compile(path: str, mtime_ns: int) -> CompiledTemplate:
+    # La date de modification fait partie de la clé : un template édité est recompilé
+    with open(path, 'r', encoding='utf-8') as f:
+        return CompiledTemplate(f.read(), Path(path).name)
+
+
+def load_template(name: str) -> CompiledTemplate:
+    """Template compilé de templates/blender (mis en cache entre les appels)"""
+    path = TEMPLATE_DIR / name
+    return _compile(str(path), path.stat().st_mtime_ns)
+
+
+def render_template(name: str, **params: Any) -> str:
+    return load_template(name).render(params)
+
+
+def template_sources() -> str:
+    """Contenu de tous les templates (pour les empreintes du build incrémental)"""
+    return "".join(
+        f"{path.name}\n{path.read_text(encoding='utf-8')}"
+        for path in sorted(TEMPLATE_DIR.glob("*.tmpl"))
+    )
+
+
+def hex_to_rgb(color: str, precision: int = 3) -> Tuple[float, float, float]:
+    """'#FF69B4' → (1.0, 0.412, 0.706), couleur attendue par light.data.color"""
+    color = color.lstrip("#")
+    return tuple(round(int(color[i:i + 2], 16) / 255, precision) for i in (0, 2, 4))
+
+
+def write_if_changed(path: Union[str, Path], content: str) -> bool:
+    """Écrit le fichier seulement si son contenu change (date de modification préservée sinon)"""
+    path = Path(path)
+    try:
+        if path.read_text(encoding='utf-8') == content:
+            return False
+    except (FileNotFoundError, UnicodeDecodeError):
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return True
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Trajectoires de Caméra - Court-Métrage K-pop Salta
+Calcul vectorisé (NumPy) des mouvements de caméra des scripts Blender
+générés, simplification des keyframes (segments de Bézier ajustés dans une
+tolérance donnée) et mise en forme en F-curves prêtes pour
+`keyframe_points.add(n)` + `foreach_set(...)`.
+"""
+
+import math
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Canal d'animation Blender : (data_path, index)
+Channel = Tuple[str, int]
+
+
+def orbit_path(frames: np.ndarray, radius: float = 4.0, center: Tuple[float, float, float] = (0.0, -4.0, 2.0),
+               bob: float = 0.5, period: float = 180, tilt: float = 1.2) -> Dict[Channel, np.ndarray]:
+    """Travelling circulaire autour du sujet : un tour complet toutes les `period` frames
+
+    La caméra oscille verticalement (deux fois par tour) et reste orientée
+    vers le centre. Retourne les valeurs de chaque canal, alignées sur `frames`.
+    """
+    frames = np.asarray(frames, dtype=np.float64)
+    angle = frames / period * math.tau
+    return {
+        ("location", 0): center[0] + radius * np.cos(angle),
+        ("location", 1): center[1] + radius * np.sin(angle),
+        ("location", 2): center[2] + bob * np.sin(angle * 2),
+        ("rotation_euler", 0): np.full_like(angle, tilt),
+        ("rotation_euler", 1): np.zeros_like(angle),
+        ("rotation_euler", 2): angle + math.pi / 2,
+    }
+
+
+def keyframe_coordinates(frames: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Tableau plat [frame0, valeur0, frame1, valeur1, ...] attendu par foreach_set("co")"""
+    co = np.empty((len(frames), 2), dtype=np.float64)
+    co[:, 0] = frames
+    co[:, 1] = values
+    return co.ravel()
+
+
+def _hermite(frames: np.ndarray, values: np.ndarray, slopes: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    """Évalue sur toutes les frames la courbe cubique passant par les keyframes `keys`
+
+    Les pentes aux keyframes sont celles de la trajectoire échantillonnée :
+    c'est exactement la courbe de Bézier dont les poignées sont à 1/3 du
+    segment (voir bezier_keyframes). `values` et `slopes` : (canaux, frames).
+    """
+    segment = np.clip(np.searchsorted(keys, np.arange(len(frames)), side="right") - 1, 0, len(keys) - 2)
+    i0, i1 = keys[segment], keys[segment + 1]
+    width = frames[i1] - frames[i0]
+    t = (frames - frames[i0]) / width
+    t2, t3 = t * t, t * t * t
+    h00 = 2 * t3 - 3 * t2 + 1
+    h10 = t3 - 2 * t2 + t
+    h01 = -2 * t3 + 3 * t2
+    h11 = t3 - t2
+    return (h00 * values[:, i0] + h10 * width * slopes[:, i0]
+            + h01 * values[:, i1] + h11 * width * slopes[:, i1])
+
+
+def simplify_keyframes(frames: np.ndarray, values: np.ndarray, tolerance: float) -> np.ndarray:
+    """Indices des keyframes à garder pour rester à moins de `tolerance` de la trajectoire
+
+    `values` : (canaux, frames) d'un même groupe (ex. location x/y/z) ;
+    l'erreur est la distance euclidienne entre la courbe de Bézier reconstruite
+    et chaque échantillon. Raffinement à la Ramer-Douglas-Peucker : chaque
+    segment hors tolérance est coupé à son point le plus éloigné.
+    """
+    frames = np.asarray(frames, dtype=np.float64)
+    values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+    if len(frames) <= 2:
+        return np.arange(len(frames))
+
+    slopes = np.gradient(values, frames, axis=1)
+    keys = np.array([0, len(frames) - 1])
+
+    while True:
+        error = np.linalg.norm(_hermite(frames, values, slopes, keys) - values, axis=0)
+        if error.max() <= tolerance:
+            return keys
+
+        # Point le plus éloigné de chaque segment hors tolérance
+        segment = np.clip(np.searchsorted(keys, np.arange(len(frames)), side="right") - 1, 0, len(keys) - 2)
+        order = np.lexsort((error, segment))
+        last_of_segment = np.r_[segment[order][1:] != segment[order][:-1], True]
+        worst = order[last_of_segment]
+        worst = worst[error[worst] > tolerance]
+        keys = np.union1d(keys, worst)
+
+
+def bezier_keyframes(frames: np.ndarray, values: np.ndarray, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Keyframes réduites d'un canal et leurs poignées de Bézier (tableaux plats co, gauche, droite)
+
+    Les poignées suivent la pente de la trajectoire d'origine, à un tiers de
+    l'écart avec la keyframe voisine.
+    """
+    frames = np.asarray(frames, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    slopes = np.gradient(values, frames)
+
+    key_frames, key_values, key_slopes = frames[keys], values[keys], slopes[keys]
+    gaps = np.diff(key_frames) / 3
+    left = np.r_[gaps[:1], gaps]
+    right = np.r_[gaps, gaps[-1:]]
+
+    return (
+        keyframe_coordinates(key_frames, key_values),
+        keyframe_coordinates(key_frames - left, key_values - key_slopes * left),
+        keyframe_coordinates(key_frames + right, key_values + key_slopes * right),
+    )
+
+
+def reduce_channels(frames: np.ndarray, channels: Dict[Channel, np.ndarray],
+                    tolerances: Dict[str, float]) -> Tuple[Dict[Channel, Tuple[np.ndarray, ...]], Dict[str, float]]:
+    """Simplifie les canaux par groupe de data_path (location, rotation_euler...)
+
+    Tous les canaux d'un groupe partagent les mêmes keyframes ; la tolérance
+    du groupe est une distance (mètres pour location, radians pour rotation).
+    Retourne les keyframes de Bézier par canal et les statistiques de
+    compression (keyframes d'origine, gardées, ratio).
+    """
+    frames = np.asarray(frames, dtype=np.float64)
+    groups: Dict[str, List[Channel]] = {}
+    for channel in channels:
+        groups.setdefault(channel[0], []).append(channel)
+
+    reduced = {}
+    original_count = kept_count = 0
+    for data_path, members in groups.items():
+        values = np.stack([channels[channel] for channel in members])
+        keys = simplify_keyframes(frames, values, tolerances.get(data_path, 1e-3))
+        for channel in members:
+            reduced[channel] = bezier_keyframes(frames, channels[channel], keys)
+        original_count += len(frames) * len(members)
+        kept_count += len(keys) * len(members)
+
+    stats = {
+        "original_keyframes": original_count,
+        "kept_keyframes": kept_count,
+        "compression_ratio": original_count / kept_count if kept_count else 1.0,
+    }
+    return reduced, stats
+
+
+def format_channels(channels: Dict[Channel, Tuple[np.ndarray, ...]], precision: int = 5) -> str:
+    """Littéral Python {(data_path, index): ([co...], [poignée gauche...], [poignée droite...])}
+    à insérer dans un script Blender
+    """
+    lines = ["{"]
+    for (data_path, index), arrays in channels.items():
+        lists = ", ".join(
+            "[" + ", ".join(repr(value) for value in np.round(array, precision).tolist()) + "]"
+            for array in arrays
+        )
+        lines.append(f"    ({data_path!r}, {index}): ({lists}),")
+    lines.append("}")
+    return "\n".join(lines)
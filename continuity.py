@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Continuité Couleur - Court-Métrage K-pop Salta
+Attribue à chaque shot un « look » (palette du mood board V1, template de
+concept art V2 et lumière clé de color_palette.lighting_colors) puis repère
+les raccords brutaux entre shots consécutifs d'un même lieu, mesurés en ΔE
+CIEDE2000 dans CIELAB.
+
+Tout le montage est traité en une passe NumPy : les looks sont choisis par
+action distincte (vocabulaire de la ShotTable), les distances entre palettes
+sont précalculées par paire de looks, et seules les lumières clés sont
+comparées raccord par raccord.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from palette_engine import dedupe_colors, delta_e_2000, hex_to_lab
+from project_model import ShotTable, en_table
+
+# Look → (entrée de mood_database, entrée de concept_art_templates, lumière clé)
+LOOKS = {
+    "kpop": ("kpop_chambre", "chambre_kpop", "neon_pink"),
+    "salta": ("argentine_salta", "architecture_salta", "golden_hour"),
+}
+DEFAULT_LOOK = "salta"
+
+# Mots-clés d'action (puis d'émotion) qui désignent un look, par ordre de priorité
+LOOK_KEYWORDS: Tuple[Tuple[Tuple[str, ...], str], ...] = (
+    (("danse", "concentration", "preparation", "imitation", "kpop"), "kpop"),
+    (("interruption", "interaction", "famil", "repas", "retour"), "salta"),
+)
+
+# Luminance de la lumière clé selon l'intensité émotionnelle (1 → 60 %, 10 → 100 %)
+EXPOSURE_MIN = 0.6
+EXPOSURE_STEP = (1.0 - EXPOSURE_MIN) / 9
+
+# Au-delà de ce ΔE (palette + lumière), un raccord dans un même lieu est signalé
+CONTINUITY_THRESHOLD = 20.0
+
+
+@dataclass
+class Look:
+    """Palette et éclairage attribués à un shot"""
+    name: str
+    palette: List[str]
+    lighting: str
+    key_light: str
+
+
+@dataclass
+class ContinuityReport:
+    """Looks par shot et distances des raccords (alignées sur les transitions i → i+1)"""
+    looks: List[Look]
+    shot_looks: np.ndarray
+    palette_delta: np.ndarray
+    light_delta: np.ndarray
+    same_location: np.ndarray
+    threshold: float
+    flagged: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def delta_e(self) -> np.ndarray:
+        return self.palette_delta + self.light_delta
+
+
+def build_looks(mood_database: Dict[str, Dict], concept_art_templates: Dict[str, Dict],
+                lighting_colors: Dict[str, str]) -> List[Look]:
+    """Looks de LOOKS construits depuis les bases des analyzers et la config"""
+    looks = []
+    for name, (mood_key, template_key, light_key) in LOOKS.items():
+        mood = mood_database.get(mood_key, {})
+        template = concept_art_templates.get(template_key, {})
+        palette = dedupe_colors(list(mood.get('couleurs', [])) + list(template.get('couleurs', [])))
+        lighting = template.get('eclairage') or mood.get('eclairage', '')
+        looks.append(Look(name, palette, lighting, lighting_colors[light_key]))
+    return looks
+
+
+def assign_looks(values: Sequence[str], looks: Sequence[Look],
+                 fallback: Optional[Sequence[Optional[str]]] = None) -> List[int]:
+    """Indice de look de chaque valeur (vocabulaire d'actions), None → fallback[i] puis DEFAULT_LOOK"""
+    names = [look.name for look in looks]
+    indices = []
+    for position, value in enumerate(values):
+        chosen = None
+        for candidate in (value, fallback[position] if fallback else None):
+            for keywords, look in LOOK_KEYWORDS:
+                if candidate and any(keyword in candidate for keyword in keywords):
+                    chosen = look
+                    break
+            if chosen:
+                break
+        indices.append(names.index(chosen or DEFAULT_LOOK))
+    return indices
+
+
+def palette_distance_matrix(looks: Sequence[Look]) -> np.ndarray:
+    """Distance (L, L) entre palettes : moyenne symétrique des ΔE2000 au plus proche voisin"""
+    labs = [hex_to_lab(look.palette) for look in looks]
+    size = len(looks)
+    matrix = np.zeros((size, size))
+    for i in range(size):
+        for j in range(i + 1, size):
+            distances = delta_e_2000(labs[i][:, None, :], labs[j][None, :, :])
+            matrix[i, j] = matrix[j, i] = (distances.min(axis=1).mean() + distances.min(axis=0).mean()) / 2
+    return matrix
+
+
+def key_lights(looks: Sequence[Look], shot_looks: np.ndarray, intensities: np.ndarray) -> np.ndarray:
+    """Couleur Lab (n, 3) de la lumière clé de chaque shot, luminance modulée par l'intensité"""
+    base = hex_to_lab([look.key_light for look in looks])[shot_looks]
+    exposure = EXPOSURE_MIN + EXPOSURE_STEP * (np.clip(intensities, 1, 10) - 1)
+    base[:, 0] *= exposure
+    return base
+
+
+def check_continuity(shots, looks: Sequence[Look], threshold: float = CONTINUITY_THRESHOLD) -> ContinuityReport:
+    """Raccords d'un même lieu dont l'écart palette + lumière dépasse `threshold` (ΔE2000)"""
+    shots: ShotTable = en_table(shots)
+    action_codes, actions = shots.codes('action')
+    emotion_codes, emotions = shots.codes('emotion')
+    lieu_codes, lieux = shots.codes('lieu')
+
+    # Un look par couple (action, émotion) distinct, puis diffusion sur tous les shots
+    action_codes = np.frombuffer(action_codes, dtype=action_codes.typecode).astype(np.int64)
+    emotion_codes = np.frombuffer(emotion_codes, dtype=emotion_codes.typecode).astype(np.int64)
+    lieu_codes = np.frombuffer(lieu_codes, dtype=lieu_codes.typecode).astype(np.int64)
+    pairs, inverse = np.unique(action_codes * max(len(emotions), 1) + emotion_codes, return_inverse=True)
+    pair_looks = assign_looks([actions[pair // max(len(emotions), 1)] for pair in pairs.tolist()], looks,
+                              [emotions[pair % max(len(emotions), 1)] for pair in pairs.tolist()])
+    shot_looks = np.asarray(pair_looks, dtype=np.int64)[inverse.reshape(-1)]
+
+    intensities = np.frombuffer(shots.intensites, dtype=shots.intensites.typecode).astype(np.float64)
+    lights = key_lights(looks, shot_looks, intensities)
+
+    palette_delta = palette_distance_matrix(looks)[shot_looks[:-1], shot_looks[1:]]
+    light_delta = delta_e_2000(lights[:-1], lights[1:])
+    same_location = lieu_codes[:-1] == lieu_codes[1:]
+
+    report = ContinuityReport(list(looks), shot_looks, palette_delta, light_delta, same_location, threshold)
+    total = palette_delta + light_delta
+    numeros = shots.numeros
+    for index in np.flatnonzero(same_location & (total > threshold)).tolist():
+        report.flagged.append({
+            "from_shot": numeros[index],
+            "to_shot": numeros[index + 1],
+            "lieu": lieux[lieu_codes[index]],
+            "looks": [looks[shot_looks[index]].name, looks[shot_looks[index + 1]].name],
+            "delta_e": round(float(total[index]), 2),
+            "palette_delta_e": round(float(palette_delta[index]), 2),
+            "light_delta_e": round(float(light_delta[index]), 2),
+        })
+    return report
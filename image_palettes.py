@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Palettes des Images de Référence - Court-Métrage K-pop Salta
+Extrait les couleurs dominantes des images d'un dossier de références
+(mood_board/ par défaut) pour alimenter ScriptAnalyzer.generer_mood_board.
+
+Chaque image est décodée directement à taille réduite (draft JPEG puis
+vignette), ses pixels sont regroupés par histogramme RGB (centres initiaux)
+puis affinés par k-means par mini-lots dans CIELAB. Les résultats sont mis en
+cache par fichier (date de modification, puis empreinte SHA-256) et les
+images sont traitées dans un pool de processus, une à la fois par worker.
+
+Exemple :
+    python image_palettes.py mood_board/ -k 5 -j 8 -o mood_board/palettes.json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".bmp", ".gif", ".tif", ".tiff"}
+
+# Plus grand côté des images une fois réduites (au plus 128 × 128 pixels analysés)
+MAX_SIDE = 128
+PALETTE_SIZE = 5
+# Subdivisions par canal de l'histogramme RGB (8³ cases)
+HISTOGRAM_BINS = 8
+BATCH_SIZE = 1024
+BATCH_ITERATIONS = 30
+
+CACHE_FILE = ".palette_cache.json"
+CACHE_VERSION = 1
+
+Chemin = Union[str, Path]
+
+
+def iter_images(folder: Chemin) -> Iterator[Path]:
+    """Images du dossier et de ses sous-dossiers, dans un ordre stable"""
+    for root, dirs, files in os.walk(folder):
+        dirs.sort()
+        for name in sorted(files):
+            path = Path(root) / name
+            if path.suffix.lower() in IMAGE_EXTENSIONS:
+                yield path
+
+
+def file_digest(path: Chemin) -> str:
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def load_pixels(path: Chemin, max_side: int = MAX_SIDE):
+    """Pixels sRGB [0, 1] (n, 3) de l'image réduite à `max_side` pixels de côté
+
+    Pour un JPEG, le décodeur ne produit que l'échelle nécessaire (draft) :
+    l'image pleine résolution n'est jamais en mémoire.
+    """
+    import numpy as np
+    from PIL import Image
+
+    with Image.open(path) as image:
+        image.draft("RGB", (max_side, max_side))
+        if image.mode in ("RGBA", "LA", "P"):
+            # Pixels transparents ignorés
+            rgba = image.convert("RGBA")
+            rgba.thumbnail((max_side, max_side))
+            pixels = np.asarray(rgba, dtype=np.float64).reshape(-1, 4)
+            return pixels[pixels[:, 3] > 0, :3] / 255.0
+        rgb = image.convert("RGB")
+        rgb.thumbnail((max_side, max_side))
+        return np.asarray(rgb, dtype=np.float64).reshape(-1, 3) / 255.0
+
+
+def histogram_seeds(pixels, count: int, bins: int = HISTOGRAM_BINS):
+    """Couleurs moyennes des `count` cases les plus peuplées de l'histogramme RGB (bins³ cases)"""
+    import numpy as np
+
+    cells = np.minimum((pixels * bins).astype(np.int64), bins - 1)
+    index = (cells[:, 0] * bins + cells[:, 1]) * bins + cells[:, 2]
+    population = np.bincount(index, minlength=bins ** 3)
+    top = np.argsort(-population, kind='stable')[:count]
+    top = top[population[top] > 0]
+    sums = np.stack([np.bincount(index, pixels[:, axis], minlength=bins ** 3) for axis in range(3)], axis=-1)
+    return sums[top] / population[top, None]
+
+
+def extract_palette(path: Chemin, size: int = PALETTE_SIZE, max_side: int = MAX_SIDE) -> List[Dict[str, Any]]:
+    """Couleurs dominantes d'une image : [{"hex": "#RRGGBB", "weight": part des pixels}], par poids décroissant"""
+    import numpy as np
+    from palette_engine import lab_to_hex, minibatch_kmeans, srgb_to_lab
+
+    pixels = load_pixels(path, max_side)
+    if not len(pixels):
+        return []
+    lab = srgb_to_lab(pixels)
+    centers = minibatch_kmeans(lab, srgb_to_lab(histogram_seeds(pixels, size)), BATCH_SIZE, BATCH_ITERATIONS)
+    labels = ((lab[:, None, :] - centers[None, :, :]) ** 2).sum(-1).argmin(axis=1)
+    weights = np.bincount(labels, minlength=len(centers)) / len(lab)
+    order = np.argsort(-weights, kind='stable')
+    colors = lab_to_hex(centers[order])
+    return [{"hex": color, "weight": round(float(weight), 4)}
+            for color, weight in zip(colors, weights[order]) if weight > 0]
+
+
+def _analyse(job: Tuple[str, Optional[str], int, int]) -> Dict[str, Any]:
+    """Worker : empreinte du fichier, puis palette si l'empreinte a changé
+
+    Un fichier illisible ou qui n'est pas une image (PIL.UnidentifiedImageError
+    est une OSError) donne une entrée {"error": message} au lieu d'interrompre
+    le lot.
+    """
+    path, cached_digest, size, max_side = job
+    try:
+        digest = file_digest(path)
+        if digest == cached_digest:
+            return {"sha256": digest, "palette": None}
+        return {"sha256": digest, "palette": extract_palette(path, size, max_side)}
+    except (OSError, ValueError, SyntaxError) as exc:
+        return {"error": f"{type(exc).__name__}: {exc}"}
+
+
+class PaletteCache:
+    """Cache JSON des palettes extraites, une entrée par chemin relatif au dossier"""
+
+    def __init__(self, path: Chemin, params: Dict[str, Any]):
+        self.path = Path(path)
+        self.params = params
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION and data.get("params") == params:
+                self.entries = data.get("entries", {})
+        except (OSError, ValueError):
+            pass
+
+    def lookup(self, key: str, stat: os.stat_result) -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
+        """(palette si la date et la taille n'ont pas changé, empreinte connue)"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None, None
+        if entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return entry["palette"], entry["sha256"]
+        return None, entry["sha256"]
+
+    def store(self, key: str, stat: os.stat_result, digest: str, palette: List[Dict[str, Any]]):
+        self.entries[key] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": digest, "palette": palette}
+
+    def save(self, keys: List[str]):
+        """Écriture atomique ; les entrées des fichiers disparus sont retirées"""
+        entries = {key: self.entries[key] for key in keys if key in self.entries}
+        tmp_file = self.path.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({"version": CACHE_VERSION, "params": self.params, "entries": entries}, f, indent=2)
+        os.replace(tmp_file, self.path)
+
+
+def extract_palettes(folder: Chemin, size: int = PALETTE_SIZE, max_side: int = MAX_SIDE,
+                     workers: Optional[int] = None, cache_path: Optional[Chemin] = None) -> Dict[str, Any]:
+    """Palettes dominantes de toutes les images d'un dossier
+
+    Retourne {"palettes": {chemin relatif: palette}, "computed": n, "cached": n,
+    "errors": {chemin relatif: message}}. Seules les images nouvelles ou
+    modifiées sont décodées, dans `workers` processus (1 = sans pool). Les
+    fichiers en erreur sont ignorés ; le cache des autres est toujours
+    enregistré.
+    """
+    folder = Path(folder)
+    cache = PaletteCache(cache_path or folder / CACHE_FILE, {"size": size, "max_side": max_side})
+    palettes: Dict[str, Any] = {}
+    pending = []
+    for path in iter_images(folder):
+        key = path.relative_to(folder).as_posix()
+        stat = path.stat()
+        palette, digest = cache.lookup(key, stat)
+        if palette is not None:
+            palettes[key] = palette
+        else:
+            pending.append((key, stat, (str(path), digest, size, max_side)))
+
+    jobs = [job for _, _, job in pending]
+    computed = 0
+    errors: Dict[str, str] = {}
+    try:
+        with ExitStack() as stack:
+            if workers == 1 or len(jobs) <= 1:
+                results = map(_analyse, jobs)
+            else:
+                pool = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+                chunksize = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))
+                results = pool.map(_analyse, jobs, chunksize=chunksize)
+
+            for (key, stat, _), result in zip(pending, results):
+                if "error" in result:
+                    errors[key] = result["error"]
+                    continue
+                if result["palette"] is None:  # fichier touché mais contenu identique
+                    result["palette"] = cache.entries[key]["palette"]
+                else:
+                    computed += 1
+                cache.store(key, stat, result["sha256"], result["palette"])
+                palettes[key] = result["palette"]
+    finally:
+        # Travail déjà fait conservé, même si le lot est interrompu
+        cache.save(list(palettes))
+
+    palettes = dict(sorted(palettes.items()))
+    return {"palettes": palettes, "computed": computed, "cached": len(palettes) - computed, "errors": errors}
+
+
+def dominant_colors(palettes: Dict[str, List[Dict[str, Any]]], count: int = 8) -> List[str]:
+    """Couleurs dominantes de l'ensemble des références, sans doublons perceptuels (ΔE)
+
+    Les teintes de toutes les images sont classées par poids cumulé, puis
+    dédupliquées ; c'est l'entrée `palettes_images` de generer_mood_board.
+    """
+    from palette_engine import dedupe_colors
+
+    totals: Dict[str, float] = {}
+    for palette in palettes.values():
+        for swatch in palette:
+            totals[swatch["hex"]] = totals.get(swatch["hex"], 0.0) + swatch["weight"]
+    ranked = sorted(totals, key=lambda color: (-totals[color], color))
+    return dedupe_colors(ranked)[:count]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="image_palettes", description="Couleurs dominantes des images de référence")
+    parser.add_argument("folder", type=Path, nargs="?", default=Path("mood_board"), help="dossier d'images")
+    parser.add_argument("-k", "--size", type=int, default=PALETTE_SIZE, help="couleurs par image")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="processus en parallèle")
+    parser.add_argument("--max-side", type=int, default=MAX_SIDE, help="côté maximal des images réduites")
+    parser.add_argument("-o", "--output", type=Path, help="fichier JSON des palettes")
+    args = parser.parse_args(argv)
+
+    if not args.folder.is_dir():
+        print(f"❌ Dossier introuvable : {args.folder}", file=sys.stderr)
+        return 2
+    try:
+        result = extract_palettes(args.folder, args.size, args.max_side, args.jobs)
+    except ImportError as exc:
+        print(f"❌ Pillow et NumPy sont requis (pip install pillow numpy) : {exc}", file=sys.stderr)
+        return 2
+
+    for key, palette in result["palettes"].items():
+        print(f"{key} : {', '.join(swatch['hex'] for swatch in palette)}")
+    for key, error in result["errors"].items():
+        print(f"⚠️  {key} ignoré : {error}", file=sys.stderr)
+    print(f"🎨 {len(result['palettes'])} images ({result['computed']} analysées, {result['cached']} en cache)")
+    if result["palettes"]:
+        print(f"Couleurs dominantes : {', '.join(dominant_colors(result['palettes']))}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result["palettes"], f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Synchronisation Musicale - Court-Métrage K-pop Salta
+Grille de beats à l'image près et export des timelines (Premiere Pro en XML
+écrit en flux).
+
+La grille est calculée depuis la section `music_sync` de config.json : toutes
+les pistes, changements de tempo aux frontières de piste, frames par beat
+fractionnaires (128 BPM à 24 fps = 11.25 frames) sans dérive. Chaque beat est
+calculé depuis le début de sa piste en arithmétique entière exacte, jamais
+par accumulation. Une seule règle d'arrondi en frames partout : demi-frame
+vers le haut, floor(x + 1/2).
+"""
+
+import math
+from dataclasses import dataclass
+from fractions import Fraction
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+from xml.sax.saxutils import XMLGenerator
+from xml.sax.xmlreader import AttributesImpl
+
+import numpy as np
+
+DEFAULT_FRAMERATE = 24
+DEFAULT_BEATS_PER_BAR = 4
+
+
+def round_frame(value: Fraction) -> int:
+    """Frame la plus proche d'une position exacte, demi-frame arrondie vers le haut"""
+    return math.floor(value + Fraction(1, 2))
+
+
+@dataclass
+class MusicTrack:
+    """Piste musicale placée sur la timeline"""
+    name: str
+    bpm: float
+    start_frame: int
+    end_frame: int
+    frames_per_beat: float
+
+
+class BeatGrid:
+    """Grille de beats et de mesures de toutes les pistes, en tableaux NumPy alignés
+
+    - frames : frame entière de chaque beat (arrondi au plus proche)
+    - positions : position exacte en frames (fractionnaire)
+    - track_index : indice de la piste du beat
+    - beat_in_bar : rang du beat dans sa mesure (0 = premier temps)
+    - bar_number : numéro global de mesure (à partir de 1)
+    """
+
+    def __init__(self, tracks: List[Dict[str, Any]], framerate: Union[int, float] = DEFAULT_FRAMERATE,
+                 beats_per_bar: int = DEFAULT_BEATS_PER_BAR):
+        self.framerate = framerate
+        # Cadence exacte, même fractionnaire (23.976 en config → 2997/125)
+        fps = Fraction(str(framerate))
+        self.beats_per_bar = beats_per_bar
+        self.tracks: List[MusicTrack] = []
+
+        frames, positions, track_index, beat_in_bar, bar_number = [], [], [], [], []
+        start = Fraction(0)  # début de piste, en secondes exactes
+        bars_before = 0
+
+        for index, track in enumerate(tracks):
+            bpm = Fraction(str(track["bpm"]))
+            duration = Fraction(str(track["duration"]))
+
+            # Beats k tels que start + k * 60 / bpm < start + duration
+            count = -(-(duration * bpm) // 60)
+            k = np.arange(int(count), dtype=np.int64)
+
+            # Position exacte en frames = (num0 + k * step) / den, en entiers
+            num0 = fps * start * bpm
+            step = 60 * fps
+            den = bpm
+            common = num0.denominator * step.denominator * den.denominator
+            num0_i = int(num0 * common)
+            step_i = int(step * common)
+            den_i = int(den * common)
+            numerators = num0_i + k * step_i
+
+            # floor(n / d + 1/2), comme round_frame, en entiers
+            frames.append((2 * numerators + den_i) // (2 * den_i))
+            positions.append(numerators / den_i)
+            track_index.append(np.full(k.size, index, dtype=np.int64))
+            beat_in_bar.append(k % beats_per_bar)
+            # Un changement de tempo ouvre une nouvelle mesure
+            bar_number.append(bars_before + 1 + k // beats_per_bar)
+            bars_before += int(-(-k.size // beats_per_bar))
+
+            end = start + duration
+            self.tracks.append(MusicTrack(
+                name=track.get("name", f"Track_{index + 1}"),
+                bpm=float(bpm),
+                start_frame=round_frame(start * fps),
+                end_frame=round_frame(end * fps),
+                frames_per_beat=float(60 * fps / bpm)
+            ))
+            start = end
+
+        def concat(arrays, dtype):
+            return np.concatenate(arrays).astype(dtype) if arrays else np.zeros(0, dtype=dtype)
+
+        self.frames = concat(frames, np.int64)
+        self.positions = concat(positions, np.float64)
+        self.track_index = concat(track_index, np.int64)
+        self.beat_in_bar = concat(beat_in_bar, np.int64)
+        self.bar_number = concat(bar_number, np.int64)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "BeatGrid":
+        """Construit la grille depuis config.json (music_sync + technical_specs)"""
+        music = config.get("music_sync", {})
+        framerate = config.get("technical_specs", {}).get("framerate", DEFAULT_FRAMERATE)
+        tracks = music.get("secondary_tracks")
+        if not tracks:
+            duration = config.get("project_config", {}).get("target_duration_seconds", 0)
+            tracks = [{"name": "Main", "bpm": music.get("main_track_bpm", 120), "duration": duration}]
+        return cls(tracks, framerate, music.get("beats_per_bar", DEFAULT_BEATS_PER_BAR))
+
+    @property
+    def is_bar(self) -> np.ndarray:
+        """Masque des premiers temps de mesure"""
+        return self.beat_in_bar == 0
+
+    @property
+    def bar_frames(self) -> np.ndarray:
+        return self.frames[self.is_bar]
+
+    @property
+    def duration_frames(self) -> int:
+        return self.tracks[-1].end_frame if self.tracks else 0
+
+    def track_frames(self, index: int) -> np.ndarray:
+        """Frames des beats d'une piste"""
+        return self.frames[self.track_index == index]
+
+    def track_bar_frames(self, index: int) -> np.ndarray:
+        """Frames des premiers temps de mesure d'une piste"""
+        return self.frames[(self.track_index == index) & self.is_bar]
+
+    def marker_name(self, index: int) -> str:
+        """Nom du marqueur du beat `index` : Bar_n sur un premier temps, Beat_n.b sinon"""
+        bar, beat = int(self.bar_number[index]), int(self.beat_in_bar[index])
+        return f"Bar_{bar}" if beat == 0 else f"Beat_{bar}.{beat + 1}"
+
+    def marker_names(self, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+        """Noms des marqueurs des beats [start, stop), produits au fil de la lecture"""
+        bars = self.bar_number[start:stop]
+        beats = self.beat_in_bar[start:stop]
+        for bar, beat in zip(bars.tolist(), beats.tolist()):
+            yield f"Bar_{bar}" if beat == 0 else f"Beat_{bar}.{beat + 1}"
+
+
+def shot_frame_ranges(durations, framerate: int = DEFAULT_FRAMERATE):
+    """Frames de début et de fin (exclusive) de shots montés bout à bout
+
+    Les bornes sont arrondies depuis le temps cumulé (demi-frame vers le
+    haut, comme round_frame) : pas de dérive même avec des durées
+    fractionnaires.
+    """
+    seconds = np.concatenate(([0.0], np.cumsum(np.asarray(durations, dtype=np.float64))))
+    bounds = np.floor(seconds * framerate + 0.5).astype(np.int64)
+    return bounds[:-1], bounds[1:]
+
+
+class XMLStreamWriter:
+    """Émetteur XML en flux (xml.sax.saxutils.XMLGenerator) avec indentation
+
+    Chaque élément est écrit immédiatement dans le flux : ni DOM ni chaîne
+    complète en mémoire, quelle que soit la taille de la timeline.
+    """
+
+    def __init__(self, stream, encoding: str = "utf-8", indent: str = "    "):
+        self._gen = XMLGenerator(stream, encoding, short_empty_elements=True)
+        self._indent = indent
+        self._depth = 0
+        self._root_written = False
+        self._gen.startDocument()
+
+    def _newline(self):
+        if self._depth or self._root_written:
+            self._gen.ignorableWhitespace("\n" + self._indent * self._depth)
+        self._root_written = True
+
+    def start(self, name: str, attrs: Optional[Dict[str, str]] = None):
+        self._newline()
+        self._gen.startElement(name, AttributesImpl(attrs or {}))
+        self._depth += 1
+
+    def end(self, name: str):
+        self._depth -= 1
+        self._newline()
+        self._gen.endElement(name)
+
+    def leaf(self, name: str, text: Any):
+        """Élément feuille <name>text</name>"""
+        self._newline()
+        self._gen.startElement(name, _NO_ATTRS)
+        self._gen.characters(str(text))
+        self._gen.endElement(name)
+
+    def close(self):
+        self._gen.ignorableWhitespace("\n")
+        self._gen.endDocument()
+
+
+_NO_ATTRS = AttributesImpl({})
+
+
+def write_premiere_xml(stream, shots: Sequence, grid: BeatGrid, name: str = "Kpop_Salta_Timeline",
+                       index=None):
+    """Écrit la timeline Premiere Pro (xmeml) en flux : un clip vidéo par shot,
+    un clip audio par piste et un marqueur par beat de la grille
+
+    Les bornes des clips vidéo viennent de `index` (timeline_index.TimelineIndex),
+    construit depuis les shots et la grille s'il n'est pas fourni.
+    """
+    from timeline_index import TimelineIndex
+
+    framerate = grid.framerate
+    if index is None:
+        index = TimelineIndex.from_project(shots, grid)
+    starts, ends = index.shots.starts, index.shots.ends
+    duration = max(index.duration_frames, grid.duration_frames)
+
+    xml = XMLStreamWriter(stream)
+    xml.start("xmeml", {"version": "5"})
+    xml.start("sequence")
+    xml.leaf("name", name)
+    xml.leaf("duration", duration)
+    xml.start("rate")
+    # xmeml : base entière, cadences NTSC (23.976, 29.97...) signalées par <ntsc>
+    xml.leaf("timebase", round(framerate))
+    if framerate != round(framerate):
+        xml.leaf("ntsc", "TRUE")
+    xml.end("rate")
+
+    xml.start("media")
+    xml.start("video")
+    xml.start("track")
+    for shot, start, end in zip(shots, starts, ends):
+        xml.start("clipitem")
+        xml.leaf("name", f"Shot_{shot.numero:02d}_{shot.action}")
+        xml.leaf("start", start)
+        xml.leaf("end", end)
+        xml.start("file")
+        xml.leaf("name", f"Shot_{shot.numero:02d}.mov")
+        xml.leaf("duration", end - start)
+        xml.end("file")
+        xml.end("clipitem")
+    xml.end("track")
+    xml.end("video")
+
+    xml.start("audio")
+    xml.start("track")
+    for track in grid.tracks:
+        xml.start("clipitem")
+        xml.leaf("name", track.name)
+        xml.leaf("start", track.start_frame)
+        xml.leaf("end", track.end_frame)
+        xml.start("file")
+        xml.leaf("name", f"{track.name.lower().replace(' ', '_')}.wav")
+        xml.leaf("duration", track.end_frame - track.start_frame)
+        xml.end("file")
+        xml.end("clipitem")
+    xml.end("track")
+    xml.end("audio")
+    xml.end("media")
+
+    for marker_name, frame in zip(grid.marker_names(), grid.frames.tolist()):
+        xml.start("marker")
+        xml.leaf("name", marker_name)
+        xml.leaf("in", frame)
+        xml.leaf("out", frame)
+        xml.end("marker")
+
+    xml.end("sequence")
+    xml.end("xmeml")
+    xml.close()
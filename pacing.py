@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Analyse du Rythme - Court-Métrage K-pop Salta
+Rythme de montage sur la timeline des shots : durée moyenne des plans
+glissante, courbes d'intensité émotionnelle, densité de coupes par beat
+face au BPM des pistes (music_sync.BeatGrid) et détection des anomalies de
+rythme.
+
+Toutes les requêtes de fenêtre reposent sur des sommes cumulées calculées
+une fois en O(n) : par shots (durées, intensités et leurs carrés) et par
+frame (coupes, intensité). Une fenêtre, en shots ou en frames, se lit
+ensuite en O(1) par différence de deux préfixes.
+"""
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from music_sync import DEFAULT_FRAMERATE, BeatGrid, shot_frame_ranges
+from project_model import ShotTable, en_table
+
+# Fenêtre glissante par défaut (en shots) pour la durée moyenne et l'intensité
+ROLLING_WINDOW = 8
+# Pas et largeur de la courbe d'intensité échantillonnée dans le temps (secondes)
+CURVE_STEP = 1.0
+CURVE_WINDOW = 5.0
+# Anomalies : écart à la moyenne locale (en écarts-types) et saut d'intensité entre shots consécutifs
+ANOMALY_Z = 2.5
+INTENSITY_JUMP = 4
+
+
+def _prefix(values: np.ndarray) -> np.ndarray:
+    """Sommes cumulées avec un zéro en tête : somme de [i, j) = P[j] - P[i]"""
+    prefix = np.zeros(len(values) + 1, dtype=np.float64)
+    np.cumsum(values, out=prefix[1:])
+    return prefix
+
+
+class PacingIndex:
+    """Sommes cumulées de la timeline pour des requêtes de fenêtre en O(1)
+
+    Fenêtres en shots : [first, last) ; fenêtres en frames : [start, end),
+    frames comptées à partir de 0 comme music_sync.shot_frame_ranges.
+    """
+
+    def __init__(self, durations, intensities, framerate: int = DEFAULT_FRAMERATE):
+        self.durations = np.asarray(durations, dtype=np.float64)
+        self.intensities = np.asarray(intensities, dtype=np.float64)
+        self.framerate = framerate
+        self.count = len(self.durations)
+
+        # Par shot
+        self._duration = _prefix(self.durations)
+        self._duration_sq = _prefix(self.durations ** 2)
+        self._intensity = _prefix(self.intensities)
+        self._intensity_sq = _prefix(self.intensities ** 2)
+
+        # Par frame : une coupe au début de chaque shot sauf le premier
+        self.start_frames, self.end_frames = shot_frame_ranges(self.durations, framerate)
+        self.total_frames = int(self.end_frames[-1]) if self.count else 0
+        cuts = np.zeros(self.total_frames, dtype=np.float64)
+        cut_frames = self.start_frames[1:]
+        cuts[cut_frames[cut_frames < self.total_frames]] = 1
+        self._cuts = _prefix(cuts)
+        frame_lengths = self.end_frames - self.start_frames
+        self._frame_intensity = _prefix(np.repeat(self.intensities, frame_lengths))
+
+    @classmethod
+    def from_shots(cls, shots, framerate: int = DEFAULT_FRAMERATE) -> "PacingIndex":
+        shots: ShotTable = en_table(shots)
+        return cls(np.frombuffer(shots.durees, dtype=np.float64),
+                   np.frombuffer(shots.intensites, dtype=shots.intensites.typecode), framerate)
+
+    @property
+    def duration(self) -> float:
+        """Durée totale de la timeline, en secondes"""
+        return float(self._duration[-1])
+
+    # --- Fenêtres en shots ------------------------------------------------
+
+    def mean_shot_length(self, first: int, last: int) -> float:
+        """Durée moyenne des plans (ASL) des shots [first, last), en secondes"""
+        return float((self._duration[last] - self._duration[first]) / max(last - first, 1))
+
+    def mean_intensity(self, first: int, last: int) -> float:
+        return float((self._intensity[last] - self._intensity[first]) / max(last - first, 1))
+
+    def intensity_std(self, first: int, last: int) -> float:
+        size = max(last - first, 1)
+        mean = (self._intensity[last] - self._intensity[first]) / size
+        return float(np.sqrt(max((self._intensity_sq[last] - self._intensity_sq[first]) / size - mean ** 2, 0.0)))
+
+    def _rolling(self, prefix: np.ndarray, window: int) -> np.ndarray:
+        window = max(1, min(window, self.count))
+        return (prefix[window:] - prefix[:-window]) / window
+
+    def rolling_shot_length(self, window: int = ROLLING_WINDOW) -> np.ndarray:
+        """ASL de chaque fenêtre de `window` shots consécutifs (n - window + 1 valeurs)"""
+        return self._rolling(self._duration, window)
+
+    def rolling_intensity(self, window: int = ROLLING_WINDOW) -> np.ndarray:
+        return self._rolling(self._intensity, window)
+
+    def _centered(self, prefix: np.ndarray, prefix_sq: np.ndarray, window: int):
+        """Moyenne et écart-type de la fenêtre centrée sur chaque shot (bornée aux extrémités)"""
+        index = np.arange(self.count)
+        first = np.clip(index - window // 2, 0, None)
+        last = np.clip(index + window // 2 + 1, None, self.count)
+        size = last - first
+        mean = (prefix[last] - prefix[first]) / size
+        variance = (prefix_sq[last] - prefix_sq[first]) / size - mean ** 2
+        return mean, np.sqrt(np.clip(variance, 0.0, None))
+
+    # --- Fenêtres en frames -----------------------------------------------
+
+    def cuts_between(self, start_frame: int, end_frame: int) -> int:
+        """Nombre de coupes dans les frames [start_frame, end_frame)"""
+        start, end = self._clip_frames(start_frame, end_frame)
+        return int(self._cuts[end] - self._cuts[start])
+
+    def mean_intensity_between(self, start_frame: int, end_frame: int) -> float:
+        """Intensité moyenne pondérée par la durée à l'écran sur [start_frame, end_frame)"""
+        start, end = self._clip_frames(start_frame, end_frame)
+        return float((self._frame_intensity[end] - self._frame_intensity[start]) / max(end - start, 1))
+
+    def _clip_frames(self, start_frame, end_frame):
+        return (np.clip(start_frame, 0, self.total_frames), np.clip(end_frame, 0, self.total_frames))
+
+    def intensity_curve(self, step: float = CURVE_STEP, window: float = CURVE_WINDOW):
+        """Courbe d'intensité échantillonnée toutes les `step` secondes, moyenne sur `window` secondes centrées"""
+        times = np.arange(0.0, self.total_frames / self.framerate, step)
+        centers = np.rint(times * self.framerate).astype(np.int64)
+        half = int(round(window * self.framerate / 2))
+        start, end = self._clip_frames(centers - half, centers + half)
+        values = (self._frame_intensity[end] - self._frame_intensity[start]) / np.maximum(end - start, 1)
+        return times, values
+
+    def cut_density(self, grid: BeatGrid) -> Dict[str, Any]:
+        """Coupes par beat, beat par beat et par piste musicale"""
+        beats = grid.frames
+        if not len(beats):
+            return {"cuts_per_beat": np.zeros(0, dtype=np.int64), "tracks": []}
+        bounds = np.append(beats, max(grid.duration_frames, int(beats[-1]) + 1))
+        start, end = self._clip_frames(bounds[:-1], bounds[1:])
+        per_beat = self._cuts[end] - self._cuts[start]
+
+        tracks = []
+        for index, track in enumerate(grid.tracks):
+            mask = grid.track_index == index
+            beat_count = int(mask.sum())
+            cuts = int(per_beat[mask].sum())
+            tracks.append({
+                "name": track.name,
+                "bpm": track.bpm,
+                "beats": beat_count,
+                "cuts": cuts,
+                "cuts_per_beat": round(cuts / beat_count, 3) if beat_count else 0.0,
+                "seconds_per_cut": round((track.end_frame - track.start_frame) / self.framerate / cuts, 2) if cuts else None,
+            })
+        return {"cuts_per_beat": per_beat.astype(np.int64), "tracks": tracks}
+
+    # --- Anomalies --------------------------------------------------------
+
+    def anomalies(self, window: int = ROLLING_WINDOW, z: float = ANOMALY_Z,
+                  jump: int = INTENSITY_JUMP) -> List[Dict[str, Any]]:
+        """Shots anormalement longs ou courts pour leur voisinage et sauts d'intensité brusques"""
+        if not self.count:
+            return []
+        mean, std = self._centered(self._duration, self._duration_sq, window)
+        scores = np.divide(self.durations - mean, std, out=np.zeros(self.count), where=std > 0)
+        found = [
+            {"shot_index": int(index), "type": "long_shot" if scores[index] > 0 else "short_shot",
+             "duration": float(self.durations[index]), "local_mean": round(float(mean[index]), 2),
+             "z_score": round(float(scores[index]), 2)}
+            for index in np.flatnonzero(np.abs(scores) > z).tolist()
+        ]
+        steps = np.diff(self.intensities)
+        found.extend(
+            {"shot_index": int(index + 1), "type": "intensity_jump",
+             "from": int(self.intensities[index]), "to": int(self.intensities[index + 1])}
+            for index in np.flatnonzero(np.abs(steps) >= jump).tolist()
+        )
+        return sorted(found, key=lambda anomaly: anomaly["shot_index"])
+
+
+def analyse_pacing(shots, grid: Optional[BeatGrid] = None, framerate: int = DEFAULT_FRAMERATE,
+                   window: int = ROLLING_WINDOW) -> Dict[str, Any]:
+    """Rapport de rythme JSON-compatible d'une liste de shots"""
+    shots = en_table(shots)
+    index = PacingIndex.from_shots(shots, framerate)
+    times, curve = index.intensity_curve()
+    numeros = list(shots.numeros)
+    anomalies = index.anomalies(window)
+    for anomaly in anomalies:
+        anomaly["shot"] = numeros[anomaly.pop("shot_index")]
+
+    report = {
+        "shots": index.count,
+        "framerate": framerate,
+        "duration_seconds": index.duration,
+        "mean_shot_length": round(index.mean_shot_length(0, index.count), 3),
+        "window": window,
+        "rolling_shot_length": np.round(index.rolling_shot_length(window), 3).tolist(),
+        "rolling_intensity": np.round(index.rolling_intensity(window), 3).tolist(),
+        "intensity_curve": {"step": CURVE_STEP, "window": CURVE_WINDOW, "values": np.round(curve, 3).tolist()},
+        "anomalies": anomalies,
+    }
+    if grid is not None:
+        density = index.cut_density(grid)
+        report["cut_density"] = {
+            "tracks": density["tracks"],
+            "max_cuts_per_beat": int(density["cuts_per_beat"].max()) if len(density["cuts_per_beat"]) else 0,
+        }
+    return report
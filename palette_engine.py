@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Moteur de Palettes - Court-Métrage K-pop Salta
+Calcul vectorisé (NumPy) des couleurs du mood board : conversion des palettes
+hexadécimales en CIELAB (illuminant D65), distances perceptuelles ΔE
+(CIE76 et CIEDE2000), déduplication des teintes quasi identiques, palettes de
+fusion K-pop × Salta par k-means pondéré et notation en lot de milliers de
+palettes candidates.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+HEX_COLOR = re.compile(r"^#?([0-9A-Fa-f]{6})$")
+
+# Blanc de référence D65 (XYZ normalisé, Y = 1)
+D65_WHITE = np.array([0.95047, 1.0, 1.08883])
+
+# sRGB linéaire → XYZ (D65)
+SRGB_TO_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+])
+XYZ_TO_SRGB = np.linalg.inv(SRGB_TO_XYZ)
+
+_DELTA = 6 / 29
+
+# Deux teintes à moins de ce ΔE2000 sont considérées identiques à l'écran
+DEDUPE_DELTA_E = 5.0
+
+# Parts de la palette K-pop dans les palettes de fusion candidates
+FUSION_MIXES = (0.35, 0.5, 0.65)
+FUSION_SIZE = 5
+
+# Poids de l'écart minimal entre teintes dans la note d'une palette
+SPREAD_WEIGHT = 0.5
+
+
+def is_hex_color(value) -> bool:
+    return isinstance(value, str) and HEX_COLOR.match(value) is not None
+
+
+def normalize_hex(color: str) -> str:
+    """'ff69b4' → '#FF69B4'"""
+    return "#" + HEX_COLOR.match(color).group(1).upper()
+
+
+def hex_to_rgb(colors: Iterable[str]) -> np.ndarray:
+    """Couleurs hexadécimales → tableau (n, 3) de composantes sRGB dans [0, 1]"""
+    values = np.array([int(HEX_COLOR.match(color).group(1), 16) for color in colors], dtype=np.int64)
+    channels = np.stack([(values >> 16) & 0xFF, (values >> 8) & 0xFF, values & 0xFF], axis=-1)
+    return channels.reshape(-1, 3) / 255.0
+
+
+def rgb_to_hex(rgb: np.ndarray) -> List[str]:
+    """Tableau (n, 3) sRGB dans [0, 1] → couleurs hexadécimales (valeurs hors gamut écrêtées)"""
+    channels = np.rint(np.clip(np.asarray(rgb, dtype=np.float64), 0.0, 1.0) * 255).astype(np.int64)
+    return [f"#{r:02X}{g:02X}{b:02X}" for r, g, b in channels.reshape(-1, 3).tolist()]
+
+
+def srgb_to_lab(rgb: np.ndarray) -> np.ndarray:
+    """sRGB [0, 1] (..., 3) → CIELAB (..., 3)"""
+    rgb = np.asarray(rgb, dtype=np.float64)
+    linear = np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+    xyz = linear @ SRGB_TO_XYZ.T / D65_WHITE
+    f = np.where(xyz > _DELTA ** 3, np.cbrt(xyz), xyz / (3 * _DELTA ** 2) + 4 / 29)
+    fx, fy, fz = f[..., 0], f[..., 1], f[..., 2]
+    return np.stack([116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz)], axis=-1)
+
+
+def lab_to_srgb(lab: np.ndarray) -> np.ndarray:
+    """CIELAB (..., 3) → sRGB [0, 1] (..., 3), non écrêté"""
+    lab = np.asarray(lab, dtype=np.float64)
+    fy = (lab[..., 0] + 16) / 116
+    f = np.stack([fy + lab[..., 1] / 500, fy, fy - lab[..., 2] / 200], axis=-1)
+    xyz = np.where(f > _DELTA, f ** 3, 3 * _DELTA ** 2 * (f - 4 / 29)) * D65_WHITE
+    linear = xyz @ XYZ_TO_SRGB.T
+    linear = np.clip(linear, 0.0, None)
+    return np.where(linear <= 0.0031308, linear * 12.92, 1.055 * linear ** (1 / 2.4) - 0.055)
+
+
+def hex_to_lab(colors: Iterable[str]) -> np.ndarray:
+    return srgb_to_lab(hex_to_rgb(colors))
+
+
+def lab_to_hex(lab: np.ndarray) -> List[str]:
+    return rgb_to_hex(lab_to_srgb(lab))
+
+
+def delta_e_76(lab1: np.ndarray, lab2: np.ndarray) -> np.ndarray:
+    """ΔE CIE76 (distance euclidienne dans CIELAB), avec diffusion NumPy"""
+    return np.linalg.norm(np.asarray(lab1) - np.asarray(lab2), axis=-1)
+
+
+def delta_e_2000(lab1: np.ndarray, lab2: np.ndarray) -> np.ndarray:
+    """ΔE CIEDE2000 (kL = kC = kH = 1), avec diffusion NumPy"""
+    lab1 = np.asarray(lab1, dtype=np.float64)
+    lab2 = np.asarray(lab2, dtype=np.float64)
+    L1, a1, b1 = lab1[..., 0], lab1[..., 1], lab1[..., 2]
+    L2, a2, b2 = lab2[..., 0], lab2[..., 1], lab2[..., 2]
+
+    c_bar7 = ((np.hypot(a1, b1) + np.hypot(a2, b2)) / 2) ** 7
+    g = 0.5 * (1 - np.sqrt(c_bar7 / (c_bar7 + 25.0 ** 7)))
+    a1p, a2p = (1 + g) * a1, (1 + g) * a2
+    c1p, c2p = np.hypot(a1p, b1), np.hypot(a2p, b2)
+    h1p = np.degrees(np.arctan2(b1, a1p)) % 360
+    h2p = np.degrees(np.arctan2(b2, a2p)) % 360
+    chroma_zero = c1p * c2p == 0
+
+    dlp = L2 - L1
+    dcp = c2p - c1p
+    dhp = h2p - h1p
+    dhp = np.where(dhp > 180, dhp - 360, np.where(dhp < -180, dhp + 360, dhp))
+    dhp = np.where(chroma_zero, 0.0, dhp)
+    dhp_big = 2 * np.sqrt(c1p * c2p) * np.sin(np.radians(dhp / 2))
+
+    lbp = (L1 + L2) / 2
+    cbp = (c1p + c2p) / 2
+    hsum = h1p + h2p
+    hbp = np.where(np.abs(h1p - h2p) <= 180, hsum / 2, np.where(hsum < 360, (hsum + 360) / 2, (hsum - 360) / 2))
+    hbp = np.where(chroma_zero, hsum, hbp)
+
+    t = (1 - 0.17 * np.cos(np.radians(hbp - 30)) + 0.24 * np.cos(np.radians(2 * hbp))
+         + 0.32 * np.cos(np.radians(3 * hbp + 6)) - 0.20 * np.cos(np.radians(4 * hbp - 63)))
+    d_theta = 30 * np.exp(-(((hbp - 275) / 25) ** 2))
+    cbp7 = cbp ** 7
+    r_c = 2 * np.sqrt(cbp7 / (cbp7 + 25.0 ** 7))
+    s_l = 1 + 0.015 * (lbp - 50) ** 2 / np.sqrt(20 + (lbp - 50) ** 2)
+    s_c = 1 + 0.045 * cbp
+    s_h = 1 + 0.015 * cbp * t
+    r_t = -np.sin(np.radians(2 * d_theta)) * r_c
+
+    dl, dc, dh = dlp / s_l, dcp / s_c, dhp_big / s_h
+    return np.sqrt(dl ** 2 + dc ** 2 + dh ** 2 + r_t * dc * dh)
+
+
+def pairwise_delta_e(lab: np.ndarray, metric=delta_e_2000) -> np.ndarray:
+    """Matrice (n, n) des distances entre les couleurs d'une palette"""
+    lab = np.asarray(lab, dtype=np.float64)
+    return metric(lab[:, None, :], lab[None, :, :])
+
+
+def dedupe_colors(colors: Sequence[str], threshold: float = DEDUPE_DELTA_E) -> List[str]:
+    """Couleurs hexadécimales sans les teintes quasi identiques (ΔE2000 < threshold)
+
+    L'ordre est conservé : la première occurrence d'un groupe de teintes
+    proches est gardée. Les valeurs non hexadécimales sont ignorées.
+    """
+    colors = [normalize_hex(color) for color in colors if is_hex_color(color)]
+    if not colors:
+        return []
+    distances = pairwise_delta_e(hex_to_lab(colors))
+    kept: List[int] = []
+    for index in range(len(colors)):
+        if not kept or distances[index, kept].min() >= threshold:
+            kept.append(index)
+    return [colors[index] for index in kept]
+
+
+def collect_palettes(mood_database: Dict[str, Dict], color_palette: Optional[Dict[str, Dict[str, str]]] = None
+                     ) -> Dict[str, List[str]]:
+    """Palettes hexadécimales nommées : entrées `couleurs` d'une base d'ambiances
+    et groupes de `color_palette` (config.json)
+
+    Les descriptions textuelles ('Palettes saturées'...) sont écartées.
+    """
+    palettes = {
+        name: [normalize_hex(color) for color in entry.get('couleurs', []) if is_hex_color(color)]
+        for name, entry in mood_database.items()
+    }
+    for group, colors in (color_palette or {}).items():
+        palettes[group] = [normalize_hex(color) for color in colors.values() if is_hex_color(color)]
+    return {name: colors for name, colors in palettes.items() if colors}
+
+
+def _squared_distances(lab1: np.ndarray, lab2: np.ndarray) -> np.ndarray:
+    difference = lab1 - lab2
+    return np.einsum('...i,...i->...', difference, difference)
+
+
+def kmeans(points: np.ndarray, k: int, weights: Optional[np.ndarray] = None, iterations: int = 50,
+           seed: int = 0, tol: float = 1e-6) -> Tuple[np.ndarray, np.ndarray]:
+    """k-means pondéré (initialisation k-means++, seed fixe) → (centres (k, d), étiquettes (n,))"""
+    points = np.asarray(points, dtype=np.float64)
+    weights = np.ones(len(points)) if weights is None else np.asarray(weights, dtype=np.float64)
+    k = min(k, len(points))
+    rng = np.random.default_rng(seed)
+
+    centers = [points[rng.choice(len(points), p=weights / weights.sum())]]
+    for _ in range(1, k):
+        nearest = ((points[:, None, :] - np.array(centers)[None, :, :]) ** 2).sum(-1).min(axis=1)
+        probabilities = weights * nearest
+        total = probabilities.sum()
+        if total <= 0:
+            break
+        centers.append(points[rng.choice(len(points), p=probabilities / total)])
+    centers = np.array(centers)
+
+    for _ in range(iterations):
+        labels = ((points[:, None, :] - centers[None, :, :]) ** 2).sum(-1).argmin(axis=1)
+        mass = np.bincount(labels, weights, minlength=len(centers))
+        sums = np.stack([np.bincount(labels, weights * points[:, axis], minlength=len(centers))
+                         for axis in range(points.shape[1])], axis=-1)
+        updated = np.where(mass[:, None] > 0, sums / np.maximum(mass, 1e-12)[:, None], centers)
+        shift = np.abs(updated - centers).max()
+        centers = updated
+        if shift < tol:
+            break
+    labels = ((points[:, None, :] - centers[None, :, :]) ** 2).sum(-1).argmin(axis=1)
+    return centers, labels
+
+
+def minibatch_kmeans(points: np.ndarray, centers: np.ndarray, batch_size: int = 1024, iterations: int = 30,
+                     seed: int = 0) -> np.ndarray:
+    """k-means par mini-lots (Sculley) à partir de centres initiaux → centres (k, d)
+
+    Chaque itération affecte un échantillon de `batch_size` points et
+    rapproche chaque centre de la moyenne de ses points avec un pas
+    1 / (nombre de points vus) : coût indépendant du nombre total de points.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    centers = np.array(centers, dtype=np.float64)
+    counts = np.zeros(len(centers))
+    rng = np.random.default_rng(seed)
+    for _ in range(iterations):
+        batch = points[rng.integers(0, len(points), size=min(batch_size, len(points)))]
+        labels = _squared_distances(batch[:, None, :], centers[None, :, :]).argmin(axis=1)
+        batch_counts = np.bincount(labels, minlength=len(centers))
+        sums = np.stack([np.bincount(labels, batch[:, axis], minlength=len(centers))
+                         for axis in range(points.shape[1])], axis=-1)
+        counts += batch_counts
+        seen = batch_counts > 0
+        centers[seen] += (sums[seen] - batch_counts[seen, None] * centers[seen]) / counts[seen, None]
+    return centers
+
+
+def fusion_palettes(palette_a: Sequence[str], palette_b: Sequence[str], size: int = FUSION_SIZE,
+                    mixes: Sequence[float] = FUSION_MIXES, seed: int = 0) -> List[List[str]]:
+    """Palettes de fusion entre deux jeux de couleurs, une par proportion de `mixes`
+
+    Les teintes des deux palettes sont regroupées en `size` centres par
+    k-means dans CIELAB ; `mix` est le poids total de palette_a (0.5 = à
+    parts égales). Les centres sont triés par luminance décroissante.
+    """
+    lab_a, lab_b = hex_to_lab(palette_a), hex_to_lab(palette_b)
+    points = np.concatenate([lab_a, lab_b])
+    palettes = []
+    for mix in mixes:
+        weights = np.concatenate([np.full(len(lab_a), mix / len(lab_a)),
+                                  np.full(len(lab_b), (1 - mix) / len(lab_b))])
+        centers, _ = kmeans(points, size, weights, seed=seed)
+        centers = centers[np.argsort(-centers[:, 0], kind='stable')]
+        palettes.append(lab_to_hex(centers))
+    return palettes
+
+
+def score_palettes(candidates_lab: np.ndarray, reference_lab: np.ndarray,
+                   spread_weight: float = SPREAD_WEIGHT) -> np.ndarray:
+    """Notes (m,) de m palettes candidates (m, k, 3) face à une palette de référence (r, 3)
+
+    note = spread_weight × écart minimal entre teintes de la candidate
+           − distance moyenne de chaque teinte de référence à la plus proche de la candidate
+    (ΔE CIE76). Plus la note est haute, mieux la palette couvre la référence
+    avec des teintes distinctes. Une seule passe NumPy pour toutes les candidates.
+    """
+    candidates_lab = np.asarray(candidates_lab, dtype=np.float64)
+    reference_lab = np.asarray(reference_lab, dtype=np.float64)
+    # Carrés des distances référence × candidate : (m, r, k), racine prise après le minimum
+    squared = _squared_distances(reference_lab[None, :, None, :], candidates_lab[:, None, :, :])
+    coverage = np.sqrt(squared.min(axis=2)).mean(axis=1)
+    first, second = np.triu_indices(candidates_lab.shape[1], k=1)
+    if len(first):
+        spread = np.sqrt(_squared_distances(candidates_lab[:, first], candidates_lab[:, second]).min(axis=1))
+    else:
+        spread = np.zeros(len(candidates_lab))
+    return spread_weight * spread - coverage
+
+
+def best_palette(candidates: Sequence[Sequence[str]], reference: Sequence[str]) -> List[str]:
+    """Palette candidate (de même taille) la mieux notée face à `reference`"""
+    candidates_lab = np.stack([hex_to_lab(palette) for palette in candidates])
+    scores = score_palettes(candidates_lab, hex_to_lab(reference))
+    return list(candidates[int(np.argmax(scores))])
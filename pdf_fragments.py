@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fragments PDF - Court-Métrage K-pop Salta
+Le dossier de production est rendu section par section (titre, shots,
+concept art, musique, planning, budget) : chaque section devient un
+fragment PDF rendu dans un pool de processus, mis en cache par empreinte de
+son contenu puis fusionné (pypdf) dans le document final. Modifier le budget
+ne refait que le fragment budget ; le tableau des shots est découpé en un
+fragment par bloc de lignes. Les fragments que le dernier build n'a pas
+utilisés sont supprimés du cache.
+
+Sans pypdf, toutes les sections sont rendues dans un seul document, sans
+cache.
+"""
+
+import hashlib
+import io
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+PINK = '#FF69B4'
+CYAN = '#00FFFF'
+GOLD = '#FFD700'
+
+Section = Tuple[str, Dict[str, Any]]
+
+# Tableau des shots : largeurs fixes (A4 moins les marges = 451 pt), lignes de
+# hauteur fixe, découpé en fragments de SHOT_TABLE_CHUNK lignes
+SHOT_TABLE_COLUMNS = (40, 50, 221, 60, 80)
+SHOT_TABLE_ROW_HEIGHT = 18
+SHOT_TABLE_HEADER_HEIGHT = 30
+SHOT_TABLE_FONT_SIZE = 9
+SHOT_TABLE_CHUNK = 200
+
+
+def _styles():
+    from reportlab.lib import colors
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        spaceAfter=30,
+        textColor=colors.HexColor(PINK),
+        alignment=1  # Centré
+    ))
+    return styles
+
+
+def _table(rows: List[List[str]], header_color: str, header_text=None, total_row: bool = False):
+    from reportlab.lib import colors
+    from reportlab.platypus import Table
+
+    table = Table(rows)
+    style = [
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor(header_color)),
+        ('TEXTCOLOR', (0, 0), (-1, 0), header_text or colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ]
+    if total_row:
+        style += [
+            ('BACKGROUND', (-1, -1), (-1, -1), colors.HexColor(GOLD)),
+            ('FONTNAME', (-1, -1), (-1, -1), 'Helvetica-Bold'),
+        ]
+    table.setStyle(style)
+    return table
+
+
+def _title_story(data, styles):
+    from reportlab.platypus import Paragraph, Spacer
+
+    return [
+        Paragraph("COURT-MÉTRAGE", styles['CustomTitle']),
+        Paragraph("Petite Fille K-pop à Salta", styles['CustomTitle']),
+        Spacer(1, 20),
+        Paragraph("Dossier de Production Complet", styles['Heading2']),
+        Paragraph(f"Généré le {data['generated_on']}", styles['Normal']),
+        Spacer(1, 50),
+        Paragraph("RÉSUMÉ EXÉCUTIF", styles['Heading2']),
+        Paragraph(data['summary'], styles['Normal']),
+        Spacer(1, 30),
+    ]
+
+
+def _fit(text: str, width: float, font: str = 'Helvetica', size: float = 10) -> str:
+    """Tronque `text` (avec …) pour tenir dans `width` points"""
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+
+    if stringWidth(text, font, size) <= width:
+        return text
+    # Plus long préfixe qui tient avec l'ellipse (recherche dichotomique)
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if stringWidth(text[:middle] + "…", font, size) <= width:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low].rstrip() + "…"
+
+
+def shot_table_sections(header: List[str], rows: Sequence[List[str]],
+                        chunk: int = SHOT_TABLE_CHUNK) -> List[Section]:
+    """Section "shots" découpée en une section par bloc de `chunk` lignes
+
+    Chaque bloc devient son propre fragment : reportlab ne construit jamais
+    plus de `chunk` lignes de flowables à la fois, et un shot modifié ne
+    refait que le fragment de son bloc.
+    """
+    return [
+        ("shots", {"header": header, "rows": list(rows[first:first + chunk]), "heading": first == 0})
+        for first in range(0, max(len(rows), 1), chunk)
+    ]
+
+
+def _shots_story(data, styles):
+    """Un bloc du tableau des shots (voir shot_table_sections) en LongTable
+
+    Largeurs de colonnes et hauteurs de lignes fixes : reportlab ne mesure
+    aucune cellule, et découper un tableau de taille bornée à chaque saut de
+    page reste linéaire, quel que soit le nombre de shots.
+    """
+    from reportlab.lib import colors
+    from reportlab.platypus import LongTable, Paragraph, Spacer
+
+    style = [
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor(PINK)),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('ALIGN', (2, 1), (2, -1), 'LEFT'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('FONTSIZE', (0, 1), (-1, -1), SHOT_TABLE_FONT_SIZE),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ]
+    description_width = SHOT_TABLE_COLUMNS[2] - 12  # padding gauche + droite
+    rows = [
+        [numero, duree, _fit(description, description_width, size=SHOT_TABLE_FONT_SIZE), intensite, plans]
+        for numero, duree, description, intensite, plans in data['rows']
+    ]
+    table = LongTable(
+        [data['header']] + rows,
+        colWidths=SHOT_TABLE_COLUMNS,
+        rowHeights=[SHOT_TABLE_HEADER_HEIGHT] + [SHOT_TABLE_ROW_HEIGHT] * len(rows),
+        repeatRows=1
+    )
+    table.setStyle(style)
+
+    story = [Paragraph("ANALYSE DÉTAILLÉE DES SHOTS", styles['Heading2'])] if data.get('heading', True) else []
+    return story + [table, Spacer(1, 20)]
+
+
+def _concept_art_story(data, styles):
+    from reportlab.platypus import Paragraph, Spacer
+
+    story = [Paragraph("CONCEPT ART", styles['Heading2'])]
+    for concept in data['concepts']:
+        story.append(Paragraph(concept['titre'], styles['Heading3']))
+        story.append(Paragraph(f"Style : {concept['style']}", styles['Italic']))
+        story.append(Paragraph(concept['prompt'], styles['Normal']))
+        story.append(Spacer(1, 12))
+    return story
+
+
+def _music_story(data, styles):
+    from reportlab.platypus import Paragraph, Spacer
+
+    rows = [['Piste', 'BPM', 'Début (s)', 'Durée (s)']] + [
+        [track['name'], f"{track['bpm']:g}", f"{track['start']:g}", f"{track['duration']:g}"]
+        for track in data['tracks']
+    ]
+    return [Paragraph("SYNCHRONISATION MUSICALE", styles['Heading2']), _table(rows, CYAN), Spacer(1, 20)]
+
+
+def _planning_story(data, styles):
+    from reportlab.platypus import Paragraph, Spacer
+
+    rows = [['Phase', 'Semaines', 'Tâches']] + [
+        [phase['name'], f"S{phase['start_week'] + 1}-S{phase['end_week']}", ", ".join(phase['tasks'])]
+        for phase in data['phases']
+    ]
+    return [Paragraph("PLANNING DE PRODUCTION", styles['Heading2']), _table(rows, GOLD), Spacer(1, 20)]
+
+
+def _budget_story(data, styles):
+    from reportlab.platypus import Paragraph
+
+    rows = [
+        ['Poste', 'Montant (€)'],
+        ['Pré-production', f"{data['pre_production']:.0f}"],
+        ['Production', f"{data['production']:.0f}"],
+        ['Post-production', f"{data['post_production']:.0f}"],
+        ['Matériel', f"{data['materiel']:.0f}"],
+        ['Logiciels', f"{data['logiciels']:.0f}"],
+        ['TOTAL', f"{data['total']:.0f}"],
+    ]
+    return [Paragraph("ESTIMATION BUDGÉTAIRE", styles['Heading2']), _table(rows, CYAN, total_row=True)]
+
+
+STORIES = {
+    "title": _title_story,
+    "shots": _shots_story,
+    "concept_art": _concept_art_story,
+    "music": _music_story,
+    "planning": _planning_story,
+    "budget": _budget_story,
+}
+
+
+def _document(target, invariant: bool):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate
+
+    return SimpleDocTemplate(
+        target,
+        pagesize=A4,
+        rightMargin=72,
+        leftMargin=72,
+        topMargin=72,
+        bottomMargin=18,
+        invariant=invariant
+    )
+
+
+def render_fragment(section: str, data: Dict[str, Any], invariant: bool = False) -> bytes:
+    """Rend une section seule en PDF (exécuté dans un processus du pool)"""
+    buffer = io.BytesIO()
+    _document(buffer, invariant).build(STORIES[section](data, _styles()))
+    return buffer.getvalue()
+
+
+def fragment_key(section: str, data: Dict[str, Any], invariant: bool) -> str:
+    """Empreinte d'un fragment : contenu de la section, mise en page et version de reportlab"""
+    import reportlab
+
+    hasher = hashlib.sha256()
+    hasher.update(json.dumps([section, data, invariant, reportlab.Version], sort_keys=True,
+                             ensure_ascii=False, default=str).encode('utf-8'))
+    hasher.update(Path(__file__).read_bytes())
+    return hasher.hexdigest()
+
+
+def _merge(fragments: Sequence[Path], path: Path, invariant: bool):
+    """Fusionne les fragments, lus depuis le cache un par un"""
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for fragment in fragments:
+        writer.append(str(fragment))
+    if invariant:
+        # Identifiant de fichier (/ID) calculé par pypdf depuis le contenu : fusion reproductible
+        writer.generate_file_identifiers()
+    with open(path, 'wb') as f:
+        writer.write(f)
+
+
+def _render_single(sections: Sequence[Section], path: Path, invariant: bool):
+    """Repli sans pypdf : toutes les sections dans un seul document
+
+    Les blocs successifs du tableau des shots s'enchaînent sans saut de page.
+    """
+    from reportlab.platypus import PageBreak
+
+    styles = _styles()
+    story = []
+    for index, (section, data) in enumerate(sections):
+        if index and not (section == "shots" and sections[index - 1][0] == "shots"):
+            story.append(PageBreak())
+        story.extend(STORIES[section](data, styles))
+    _document(str(path), invariant).build(story)
+
+
+def build_pdf(path, sections: Sequence[Section], cache_dir, invariant: bool = False,
+              max_workers: Optional[int] = None) -> Dict[str, List[str]]:
+    """Construit le PDF final depuis les fragments (cache + pool de processus)
+
+    Retourne les sections rendues et celles reprises du cache.
+    """
+    from importlib.util import find_spec
+
+    path = Path(path)
+    if find_spec("pypdf") is None:
+        _render_single(sections, path, invariant)
+        return {"rendered": [section for section, _ in sections], "cached": []}
+
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    keys = [fragment_key(section, data, invariant) for section, data in sections]
+    paths = [cache_dir / f"{key}.pdf" for key in keys]
+    missing = [index for index, fragment in enumerate(paths) if not fragment.exists()]
+
+    def store(index: int, fragment: bytes):
+        # Écriture atomique dès la fin du rendu : un fragment à moitié écrit
+        # n'est jamais repris, et aucun fragment n'est gardé en mémoire
+        tmp = paths[index].with_suffix(".pdf.tmp")
+        tmp.write_bytes(fragment)
+        os.replace(tmp, paths[index])
+
+    if len(missing) > 1 and (max_workers is None or max_workers > 1):
+        from concurrent.futures import ProcessPoolExecutor
+
+        workers = min(len(missing), max_workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rendered = pool.map(render_fragment, *zip(*((*sections[i], invariant) for i in missing)))
+            for index, fragment in zip(missing, rendered):
+                store(index, fragment)
+    else:
+        for index in missing:
+            store(index, render_fragment(*sections[index], invariant))
+
+    # Les fragments qu'aucune section de ce build n'utilise sont supprimés
+    used = {fragment.name for fragment in paths}
+    for stale in cache_dir.iterdir():
+        if stale.name not in used and stale.suffix in (".pdf", ".tmp"):
+            stale.unlink(missing_ok=True)
+
+    _merge(paths, path, invariant)
+    return {
+        "rendered": [sections[i][0] for i in missing],
+        "cached": [section for i, (section, _) in enumerate(sections) if i not in missing],
+    }
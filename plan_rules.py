@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Moteur de Règles - Suggestions de plans de caméra
+Les règles sont compilées une seule fois à la construction de l'analyzer et
+indexées par jeton d'action, jeton d'émotion et bande d'intensité : trouver
+les plans d'un shot ne dépend pas du nombre de règles chargées.
+
+Les plans retournés sont partagés entre tous les shots (tuple de plans figés :
+PlanSuggestion gelée, dict en lecture seule) ; le cache des combinaisons
+(action, émotion, intensité) est borné.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+INTENSITE_MAX = 10
+# Combinaisons (action, émotion, intensité) gardées en cache par moteur
+TAILLE_CACHE = 4096
+
+
+@dataclass
+class ReglePlan:
+    """Règle de suggestion : conditions sur le shot et plans proposés
+
+    Une condition vide est toujours vraie. Au sein d'une condition, un seul
+    jeton suffit (OU) ; les conditions se combinent entre elles (ET).
+    """
+    plans: List[Any]
+    actions: Tuple[str, ...] = ()
+    emotions: Tuple[str, ...] = ()
+    intensite_min: Optional[int] = None
+    intensite_max: Optional[int] = None
+    priorite: int = 0  # les priorités basses passent en premier
+
+
+def _figer(plan: Any) -> Any:
+    """Plan en lecture seule : les dict de V2 deviennent des vues non modifiables"""
+    return MappingProxyType(dict(plan)) if isinstance(plan, dict) else plan
+
+
+def jetons(valeur: str) -> FrozenSet[str]:
+    """Découpe une action/émotion en jetons : 'danse_energique' → {danse_energique, danse, energique}"""
+    valeur = valeur.lower()
+    return frozenset([valeur, *valeur.split('_')])
+
+
+class MoteurReglesPlans:
+    def __init__(self, regles: Iterable[ReglePlan]):
+        self.regles = list(regles)
+        self._actions: List[FrozenSet[str]] = []
+        self._emotions: List[FrozenSet[str]] = []
+        self._index_actions: Dict[str, List[int]] = {}
+        self._index_emotions: Dict[str, List[int]] = {}
+        self._index_intensite: List[List[int]] = [[] for _ in range(INTENSITE_MAX + 1)]
+        self._toujours: List[int] = []
+        self._plans: List[Tuple[Any, ...]] = [tuple(_figer(plan) for plan in regle.plans) for regle in self.regles]
+        self._selection = lru_cache(maxsize=TAILLE_CACHE)(self._calculer_plans)
+
+        # Ordre de sortie figé à la compilation : priorité puis ordre de déclaration
+        ordre = sorted(range(len(self.regles)), key=lambda i: (self.regles[i].priorite, i))
+        self._rang = {indice: rang for rang, indice in enumerate(ordre)}
+
+        for indice, regle in enumerate(self.regles):
+            actions = frozenset(a.lower() for a in regle.actions)
+            emotions = frozenset(e.lower() for e in regle.emotions)
+            self._actions.append(actions)
+            self._emotions.append(emotions)
+
+            # Chaque règle n'est indexée que sur sa condition la plus sélective
+            if actions:
+                for jeton in actions:
+                    self._index_actions.setdefault(jeton, []).append(indice)
+            elif emotions:
+                for jeton in emotions:
+                    self._index_emotions.setdefault(jeton, []).append(indice)
+            elif regle.intensite_min is not None or regle.intensite_max is not None:
+                bas = max(regle.intensite_min or 0, 0)
+                haut = min(INTENSITE_MAX if regle.intensite_max is None else regle.intensite_max, INTENSITE_MAX)
+                for niveau in range(bas, haut + 1):
+                    self._index_intensite[niveau].append(indice)
+            else:
+                self._toujours.append(indice)
+
+    def _verifier(self, indice: int, jetons_action, jetons_emotion, intensite: Optional[int]) -> bool:
+        """Vérifie les conditions d'une règle candidate"""
+        regle = self.regles[indice]
+        if self._actions[indice] and not (self._actions[indice] & jetons_action):
+            return False
+        if self._emotions[indice] and not (self._emotions[indice] & jetons_emotion):
+            return False
+        if regle.intensite_min is not None or regle.intensite_max is not None:
+            if intensite is None:
+                return False
+            if regle.intensite_min is not None and intensite < regle.intensite_min:
+                return False
+            if regle.intensite_max is not None and intensite > regle.intensite_max:
+                return False
+        return True
+
+    def plans_pour(self, action: str, emotion: str, intensite: Optional[int] = None) -> Tuple[Any, ...]:
+        """Retourne les plans de toutes les règles satisfaites, dans l'ordre de priorité
+
+        Tuple partagé (mis en cache) de plans en lecture seule : le copier
+        avant de le modifier.
+        """
+        return self._selection(action, emotion, intensite)
+
+    def _calculer_plans(self, action: str, emotion: str, intensite: Optional[int]) -> Tuple[Any, ...]:
+        jetons_action = jetons(action)
+        jetons_emotion = jetons(emotion)
+
+        candidats = set(self._toujours)
+        for jeton in jetons_action:
+            candidats.update(self._index_actions.get(jeton, ()))
+        for jeton in jetons_emotion:
+            candidats.update(self._index_emotions.get(jeton, ()))
+        if intensite is not None:
+            candidats.update(self._index_intensite[min(max(intensite, 0), INTENSITE_MAX)])
+
+        retenues = sorted(
+            (i for i in candidats if self._verifier(i, jetons_action, jetons_emotion, intensite)),
+            key=self._rang.__getitem__
+        )
+
+        return tuple(plan for i in retenues for plan in self._plans[i])
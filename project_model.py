@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modèle de Projet - Court-Métrage K-pop Salta
+Définitions communes aux analyzers V1, V2 et V3 : `Shot` et `PlanSuggestion`,
+et `ShotTable`, stockage en colonnes des shots d'un script analysé.
+
+Un script est parsé une seule fois en ShotTable ; rapports, JSON, PDF,
+scripts Blender et timelines lisent tous cette même table. Les colonnes
+numériques sont des `array` compacts, les actions, émotions, lieux et listes
+de personnages sont dédupliqués dans des vocabulaires : quelques dizaines
+d'octets par shot au lieu d'une instance de dataclass avec son dictionnaire.
+"""
+
+from array import array
+from dataclasses import asdict, dataclass, is_dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple, Union
+
+CHAMPS_SHOT = (
+    'numero', 'description', 'personnages', 'action', 'emotion', 'lieu',
+    'duree_estimee', 'intensite_emotionnelle'
+)
+
+
+@dataclass
+class Shot:
+    """Représente un plan avec ses caractéristiques"""
+    numero: int
+    description: str
+    personnages: List[str]
+    action: str
+    emotion: str
+    lieu: str
+    duree_estimee: float = 5.0  # en secondes
+    intensite_emotionnelle: int = 5  # 1-10
+
+
+@dataclass(frozen=True)
+class PlanSuggestion:
+    """Suggestion de plan de caméra (durée et difficulté renseignées par V2)
+
+    Gelée : les plans des règles sont partagés entre les shots (plan_rules).
+    """
+    type_plan: str
+    mouvement: str
+    angle: str
+    justification: str
+    duree_seconde: float = 0.0
+    difficulte_technique: str = ""  # "Facile", "Moyen", "Difficile"
+
+
+class _Vocabulaire:
+    """Valeurs distinctes d'une colonne catégorielle et leur code"""
+    __slots__ = ('valeurs', 'codes')
+
+    def __init__(self):
+        self.valeurs: List[Any] = []
+        self.codes: Dict[Any, int] = {}
+
+    def code(self, valeur) -> int:
+        code = self.codes.get(valeur)
+        if code is None:
+            code = self.codes[valeur] = len(self.valeurs)
+            self.valeurs.append(valeur)
+        return code
+
+
+def _champ(shot, nom: str):
+    return shot[nom] if isinstance(shot, dict) else getattr(shot, nom)
+
+
+class ShotTable:
+    """Shots d'un projet stockés en colonnes
+
+    Se comporte comme une séquence de shots : l'itération et l'indexation
+    produisent des `ShotRecord`, vues légères qui lisent et écrivent
+    directement dans les colonnes.
+    """
+    __slots__ = ('numeros', 'durees', 'intensites', 'descriptions',
+                 '_actions', '_emotions', '_lieux', '_personnages', '_vocabulaires')
+
+    def __init__(self, shots: Iterable = ()):
+        self.numeros = array('l')
+        self.durees = array('d')
+        self.intensites = array('h')
+        self.descriptions: List[str] = []
+        self._actions = array('I')
+        self._emotions = array('I')
+        self._lieux = array('I')
+        self._personnages = array('I')
+        self._vocabulaires = {
+            'action': _Vocabulaire(),
+            'emotion': _Vocabulaire(),
+            'lieu': _Vocabulaire(),
+            'personnages': _Vocabulaire(),
+        }
+        self.extend(shots)
+
+    def append(self, shot: Union[Shot, 'ShotRecord', Dict[str, Any]]):
+        """Ajoute un shot (dataclass Shot, ShotRecord ou dictionnaire de champs)"""
+        vocabulaires = self._vocabulaires
+        self.numeros.append(int(_champ(shot, 'numero')))
+        self.durees.append(float(_champ(shot, 'duree_estimee')))
+        self.intensites.append(int(_champ(shot, 'intensite_emotionnelle')))
+        self.descriptions.append(_champ(shot, 'description'))
+        self._actions.append(vocabulaires['action'].code(_champ(shot, 'action')))
+        self._emotions.append(vocabulaires['emotion'].code(_champ(shot, 'emotion')))
+        self._lieux.append(vocabulaires['lieu'].code(_champ(shot, 'lieu')))
+        self._personnages.append(vocabulaires['personnages'].code(tuple(_champ(shot, 'personnages'))))
+
+    def extend(self, shots: Iterable):
+        for shot in shots:
+            self.append(shot)
+
+    def __len__(self) -> int:
+        return len(self.numeros)
+
+    def __iter__(self) -> Iterator['ShotRecord']:
+        return (ShotRecord(self, index) for index in range(len(self.numeros)))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [ShotRecord(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("index de shot hors limites")
+        return ShotRecord(self, index)
+
+    def __repr__(self) -> str:
+        return f"ShotTable({len(self)} shots)"
+
+    def codes(self, champ: str) -> Tuple[array, Sequence[Any]]:
+        """Codes par shot et vocabulaire d'une colonne catégorielle (action, emotion, lieu, personnages)"""
+        colonnes = {'action': self._actions, 'emotion': self._emotions,
+                    'lieu': self._lieux, 'personnages': self._personnages}
+        return colonnes[champ], self._vocabulaires[champ].valeurs
+
+    def colonne(self, champ: str) -> List[Any]:
+        """Valeurs d'un champ pour tous les shots"""
+        if champ in ('action', 'emotion', 'lieu'):
+            codes, valeurs = self.codes(champ)
+            return [valeurs[code] for code in codes]
+        if champ == 'personnages':
+            codes, valeurs = self.codes(champ)
+            return [list(valeurs[code]) for code in codes]
+        return list({'numero': self.numeros, 'description': self.descriptions,
+                     'duree_estimee': self.durees, 'intensite_emotionnelle': self.intensites}[champ])
+
+    def iter_dicts(self) -> Iterator[Dict[str, Any]]:
+        """Shots en dictionnaires, lus colonne par colonne (sans passer par ShotRecord)"""
+        actions = self._vocabulaires['action'].valeurs
+        emotions = self._vocabulaires['emotion'].valeurs
+        lieux = self._vocabulaires['lieu'].valeurs
+        personnages = self._vocabulaires['personnages'].valeurs
+        for numero, description, code_personnages, action, emotion, lieu, duree, intensite in zip(
+                self.numeros, self.descriptions, self._personnages, self._actions, self._emotions,
+                self._lieux, self.durees, self.intensites):
+            yield {
+                'numero': numero, 'description': description, 'personnages': list(personnages[code_personnages]),
+                'action': actions[action], 'emotion': emotions[emotion], 'lieu': lieux[lieu],
+                'duree_estimee': duree, 'intensite_emotionnelle': intensite,
+            }
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return list(self.iter_dicts())
+
+
+def _propriete_categorielle(champ: str, colonne: str):
+    def lire(self):
+        return self._table._vocabulaires[champ].valeurs[getattr(self._table, colonne)[self._index]]
+
+    def ecrire(self, valeur):
+        getattr(self._table, colonne)[self._index] = self._table._vocabulaires[champ].code(valeur)
+
+    return property(lire, ecrire)
+
+
+def _propriete_colonne(colonne: str, conversion):
+    def lire(self):
+        return getattr(self._table, colonne)[self._index]
+
+    def ecrire(self, valeur):
+        getattr(self._table, colonne)[self._index] = conversion(valeur)
+
+    return property(lire, ecrire)
+
+
+class ShotRecord:
+    """Vue sur une ligne de ShotTable, mêmes attributs que Shot
+
+    `personnages` retourne une nouvelle liste : pour la modifier, réaffecter
+    l'attribut (`shot.personnages = [...]`).
+    """
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table: ShotTable, index: int):
+        self._table = table
+        self._index = index
+
+    numero = _propriete_colonne('numeros', int)
+    description = _propriete_colonne('descriptions', str)
+    duree_estimee = _propriete_colonne('durees', float)
+    intensite_emotionnelle = _propriete_colonne('intensites', int)
+    action = _propriete_categorielle('action', '_actions')
+    emotion = _propriete_categorielle('emotion', '_emotions')
+    lieu = _propriete_categorielle('lieu', '_lieux')
+
+    @property
+    def personnages(self) -> List[str]:
+        table = self._table
+        return list(table._vocabulaires['personnages'].valeurs[table._personnages[self._index]])
+
+    @personnages.setter
+    def personnages(self, valeur: Iterable[str]):
+        table = self._table
+        table._personnages[self._index] = table._vocabulaires['personnages'].code(tuple(valeur))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {champ: getattr(self, champ) for champ in CHAMPS_SHOT}
+
+    def to_shot(self) -> Shot:
+        return Shot(**self.to_dict())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (ShotRecord, Shot)):
+            return shot_dict(self) == shot_dict(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        champs = ", ".join(f"{champ}={getattr(self, champ)!r}" for champ in CHAMPS_SHOT)
+        return f"ShotRecord({champs})"
+
+
+def shot_dict(shot: Union[Shot, ShotRecord, Dict[str, Any]]) -> Dict[str, Any]:
+    """Champs d'un shot en dictionnaire, quelle que soit sa représentation"""
+    if isinstance(shot, ShotRecord):
+        return shot.to_dict()
+    if is_dataclass(shot):
+        return asdict(shot)
+    return {champ: shot[champ] for champ in CHAMPS_SHOT}
+
+
+def en_table(shots: Iterable) -> ShotTable:
+    """Retourne `shots` tel quel si c'est déjà une ShotTable, sinon la construit"""
+    return shots if isinstance(shots, ShotTable) else ShotTable(shots)
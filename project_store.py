@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Base de Projet SQLite - Court-Métrage K-pop Salta
+Stockage local de l'état du projet (shots, suggestions de plans, prompts IA,
+marqueurs de beats, lignes de budget) dans un fichier SQLite indexé sur le
+numéro de shot, le lieu, l'action et l'émotion. Les lectures passent par des
+curseurs parcourus en flux : aucune requête ne charge tout le projet. Les
+exports (JSON et NDJSON V2, timeline Resolve, prompts IA V3) lisent la base
+par ces curseurs.
+
+Exemples :
+    python project_store.py exports/project.sqlite --lieu chambre_salta --intensite-min 8
+    python project_store.py exports/project.sqlite --ndjson exports/project_data.ndjson
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from project_model import PlanSuggestion, Shot, ShotTable, en_table
+
+SCHEMA_VERSION = 1
+
+# Lignes lues par aller-retour avec SQLite lors des parcours en flux
+FETCH_SIZE = 512
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS shots (
+    id INTEGER PRIMARY KEY,  -- rang du shot dans le montage
+    numero INTEGER NOT NULL,
+    description TEXT NOT NULL,
+    personnages TEXT NOT NULL,
+    action TEXT NOT NULL,
+    emotion TEXT NOT NULL,
+    lieu TEXT NOT NULL,
+    duree_estimee REAL NOT NULL,
+    intensite_emotionnelle INTEGER NOT NULL,
+    debut_secondes REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_shots_numero ON shots (numero);
+CREATE INDEX IF NOT EXISTS idx_shots_lieu_intensite ON shots (lieu, intensite_emotionnelle);
+CREATE INDEX IF NOT EXISTS idx_shots_action ON shots (action);
+CREATE INDEX IF NOT EXISTS idx_shots_emotion ON shots (emotion);
+
+CREATE TABLE IF NOT EXISTS plan_suggestions (
+    shot_id INTEGER NOT NULL REFERENCES shots (id) ON DELETE CASCADE,
+    rang INTEGER NOT NULL,
+    type_plan TEXT NOT NULL,
+    mouvement TEXT NOT NULL,
+    angle TEXT NOT NULL,
+    justification TEXT NOT NULL,
+    duree_seconde REAL NOT NULL,
+    difficulte_technique TEXT NOT NULL,
+    PRIMARY KEY (shot_id, rang)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS prompts (
+    id INTEGER PRIMARY KEY,
+    titre TEXT NOT NULL,
+    prompt_detaille TEXT NOT NULL,
+    style_artistique TEXT NOT NULL,
+    parametres_techniques TEXT NOT NULL,
+    references_visuelles TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS music_tracks (
+    track_index INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    bpm REAL NOT NULL,
+    start_frame INTEGER NOT NULL,
+    end_frame INTEGER NOT NULL,
+    frames_per_beat REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS beat_markers (
+    frame INTEGER NOT NULL,
+    position REAL NOT NULL,
+    track_index INTEGER NOT NULL REFERENCES music_tracks (track_index),
+    beat_in_bar INTEGER NOT NULL,
+    bar_number INTEGER NOT NULL,
+    name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_beat_markers_frame ON beat_markers (frame);
+CREATE INDEX IF NOT EXISTS idx_beat_markers_track ON beat_markers (track_index, frame);
+
+CREATE TABLE IF NOT EXISTS budget_lines (
+    poste TEXT PRIMARY KEY,
+    montant REAL NOT NULL
+);
+"""
+
+SHOT_COLUMNS = ("numero, description, personnages, action, emotion, lieu, "
+                "duree_estimee, intensite_emotionnelle")
+
+Chemin = Union[str, Path]
+
+
+class ProjectStore:
+    """Base SQLite d'un projet ; utilisable comme gestionnaire de contexte"""
+
+    def __init__(self, path: Chemin = ":memory:", read_only: bool = False):
+        """`read_only` : base existante ouverte en lecture seule (sans effet sur ":memory:", toujours vide)"""
+        self.path = path if path == ":memory:" else Path(path)
+        if read_only and self.path != ":memory:":
+            # Lecteurs concurrents (étapes V3 en parallèle) : aucun verrou d'écriture
+            self.connection = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True)
+            return
+        if self.path != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(self.path))
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        # Un seul écrivain, puis des lecteurs : journal classique, pas de fichiers -wal/-shm
+        # laissés à côté de la base exportée (les bases créées en WAL sont reconverties)
+        self.connection.execute("PRAGMA journal_mode = DELETE")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self) -> "ProjectStore":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @contextmanager
+    def _transaction(self):
+        """Une transaction par écriture en masse (un seul fsync)"""
+        with self.connection:
+            yield self.connection
+
+    def _stream(self, sql: str, params: Iterable = ()) -> Iterator[tuple]:
+        """Parcourt un résultat par paquets de FETCH_SIZE lignes"""
+        cursor = self.connection.execute(sql, tuple(params))
+        try:
+            while True:
+                rows = cursor.fetchmany(FETCH_SIZE)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            cursor.close()
+
+    # --- Écriture ---------------------------------------------------------
+
+    def save_shots(self, shots: Iterable[Shot]):
+        """Remplace les shots du projet (et leurs suggestions de plans)"""
+        shots = en_table(shots)
+        personnages_codes, personnages = shots.codes('personnages')
+        personnages_json = [json.dumps(list(valeur), ensure_ascii=False) for valeur in personnages]
+
+        def rows():
+            debut = 0.0
+            for rang, (shot, code) in enumerate(zip(shots, personnages_codes)):
+                yield (rang, shot.numero, shot.description, personnages_json[code], shot.action, shot.emotion,
+                       shot.lieu, shot.duree_estimee, shot.intensite_emotionnelle, debut)
+                debut += shot.duree_estimee
+
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM shots")
+            connection.executemany(
+                f"INSERT INTO shots (id, {SHOT_COLUMNS}, debut_secondes) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows()
+            )
+
+    def save_plans(self, plans: Iterable[List[PlanSuggestion]]):
+        """Enregistre les suggestions de plans, une liste par shot dans l'ordre de save_shots"""
+        rows = (
+            (shot_id, rang, plan.type_plan, plan.mouvement, plan.angle, plan.justification,
+             plan.duree_seconde, plan.difficulte_technique)
+            for shot_id, plans_shot in enumerate(plans)
+            for rang, plan in enumerate(plans_shot)
+        )
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM plan_suggestions")
+            connection.executemany("INSERT INTO plan_suggestions VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def save_prompts(self, prompts: Iterable):
+        """Enregistre les prompts IA (AIImagePrompt)"""
+        rows = (
+            (prompt.titre, prompt.prompt_detaille, prompt.style_artistique,
+             json.dumps(prompt.parametres_techniques, ensure_ascii=False),
+             json.dumps(prompt.references_visuelles, ensure_ascii=False))
+            for prompt in prompts
+        )
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM prompts")
+            connection.executemany(
+                "INSERT INTO prompts (titre, prompt_detaille, style_artistique, parametres_techniques, "
+                "references_visuelles) VALUES (?, ?, ?, ?, ?)", rows
+            )
+
+    def save_beat_grid(self, grid):
+        """Enregistre les pistes et les marqueurs d'une music_sync.BeatGrid"""
+        tracks = [
+            (index, track.name, track.bpm, track.start_frame, track.end_frame, track.frames_per_beat)
+            for index, track in enumerate(grid.tracks)
+        ]
+        markers = zip(grid.frames.tolist(), grid.positions.tolist(), grid.track_index.tolist(),
+                      grid.beat_in_bar.tolist(), grid.bar_number.tolist(), grid.marker_names())
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM beat_markers")
+            connection.execute("DELETE FROM music_tracks")
+            connection.executemany("INSERT INTO music_tracks VALUES (?, ?, ?, ?, ?, ?)", tracks)
+            connection.executemany("INSERT INTO beat_markers VALUES (?, ?, ?, ?, ?, ?)", markers)
+
+    def save_budget(self, lines: Dict[str, float]):
+        """Enregistre les lignes de budget {poste: montant}"""
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM budget_lines")
+            connection.executemany("INSERT INTO budget_lines VALUES (?, ?)", lines.items())
+
+    # --- Lecture ----------------------------------------------------------
+
+    @staticmethod
+    def _shot_filters(numero: Optional[int] = None, lieu: Optional[str] = None, action: Optional[str] = None,
+                      emotion: Optional[str] = None, intensite_min: Optional[int] = None,
+                      intensite_max: Optional[int] = None) -> Tuple[str, List[Any]]:
+        conditions, params = [], []
+        for colonne, valeur in (("numero", numero), ("lieu", lieu), ("action", action), ("emotion", emotion)):
+            if valeur is not None:
+                conditions.append(f"{colonne} = ?")
+                params.append(valeur)
+        if intensite_min is not None:
+            conditions.append("intensite_emotionnelle >= ?")
+            params.append(intensite_min)
+        if intensite_max is not None:
+            conditions.append("intensite_emotionnelle <= ?")
+            params.append(intensite_max)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return where, params
+
+    def iter_shots(self, **filters) -> Iterator[Shot]:
+        """Shots filtrés (numero, lieu, action, emotion, intensite_min, intensite_max), dans l'ordre du montage
+
+        Exemple : iter_shots(lieu="chambre_salta", intensite_min=8) passe par
+        l'index (lieu, intensite_emotionnelle).
+        """
+        where, params = self._shot_filters(**filters)
+        for row in self._stream(f"SELECT {SHOT_COLUMNS} FROM shots{where} ORDER BY id", params):
+            yield Shot(row[0], row[1], json.loads(row[2]), *row[3:])
+
+    def iter_shots_with_plans(self, **filters) -> Iterator[Tuple[Shot, List[PlanSuggestion]]]:
+        """(shot, plans suggérés) dans l'ordre du montage, filtres de iter_shots
+
+        Deux curseurs triés par rang de shot sont parcourus en parallèle :
+        un seul shot et ses plans sont en mémoire à la fois.
+        """
+        where, params = self._shot_filters(**filters)
+        shots = self._stream(f"SELECT id, {SHOT_COLUMNS} FROM shots{where} ORDER BY id", params)
+        plans = self._stream(
+            "SELECT shot_id, type_plan, mouvement, angle, justification, duree_seconde, difficulte_technique "
+            f"FROM plan_suggestions WHERE shot_id IN (SELECT id FROM shots{where}) ORDER BY shot_id, rang", params
+        )
+        plan = next(plans, None)
+        for row in shots:
+            shot_id = row[0]
+            shot_plans = []
+            while plan is not None and plan[0] <= shot_id:
+                if plan[0] == shot_id:
+                    shot_plans.append(PlanSuggestion(*plan[1:]))
+                plan = next(plans, None)
+            yield Shot(row[1], row[2], json.loads(row[3]), *row[4:]), shot_plans
+
+    def shots(self, **filters) -> ShotTable:
+        """Shots filtrés, chargés dans une ShotTable"""
+        return ShotTable(self.iter_shots(**filters))
+
+    def count_shots(self, **filters) -> int:
+        where, params = self._shot_filters(**filters)
+        return self.connection.execute(f"SELECT COUNT(*) FROM shots{where}", params).fetchone()[0]
+
+    def query_plan(self, **filters) -> List[str]:
+        """Plan d'exécution SQLite d'une requête iter_shots (vérification des index)"""
+        where, params = self._shot_filters(**filters)
+        rows = self.connection.execute(
+            f"EXPLAIN QUERY PLAN SELECT {SHOT_COLUMNS} FROM shots{where} ORDER BY id", params
+        )
+        return [row[-1] for row in rows]
+
+    def iter_plans(self, numero: Optional[int] = None) -> Iterator[Tuple[int, PlanSuggestion]]:
+        """(numéro de shot, plan) dans l'ordre des suggestions"""
+        where, params = (" WHERE shots.numero = ?", [numero]) if numero is not None else ("", [])
+        sql = ("SELECT shots.numero, type_plan, mouvement, angle, justification, duree_seconde, "
+               "difficulte_technique FROM plan_suggestions JOIN shots ON shots.id = plan_suggestions.shot_id"
+               f"{where} ORDER BY shot_id, rang")
+        for row in self._stream(sql, params):
+            yield row[0], PlanSuggestion(*row[1:])
+
+    def iter_prompts(self) -> Iterator[Dict[str, Any]]:
+        sql = ("SELECT titre, prompt_detaille, style_artistique, parametres_techniques, references_visuelles "
+               "FROM prompts ORDER BY id")
+        for titre, prompt, style, parametres, references in self._stream(sql):
+            yield {"titre": titre, "prompt_detaille": prompt, "style_artistique": style,
+                   "parametres_techniques": json.loads(parametres), "references_visuelles": json.loads(references)}
+
+    def iter_music_tracks(self) -> Iterator[Tuple[int, str, float, int, int, float]]:
+        """(indice, nom, bpm, frame de début, frame de fin, frames par beat) des pistes, dans l'ordre"""
+        yield from self._stream("SELECT track_index, name, bpm, start_frame, end_frame, frames_per_beat "
+                                "FROM music_tracks ORDER BY track_index")
+
+    def iter_beat_markers(self, start_frame: Optional[int] = None, end_frame: Optional[int] = None,
+                          track_index: Optional[int] = None, bars_only: bool = False) -> Iterator[Tuple[int, str, int]]:
+        """(frame, nom, piste) des marqueurs dans [start_frame, end_frame), premiers temps seuls si `bars_only`"""
+        conditions, params = (["beat_in_bar = 0"] if bars_only else []), []
+        if track_index is not None:
+            conditions.append("track_index = ?")
+            params.append(track_index)
+        if start_frame is not None:
+            conditions.append("frame >= ?")
+            params.append(start_frame)
+        if end_frame is not None:
+            conditions.append("frame < ?")
+            params.append(end_frame)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        yield from self._stream(f"SELECT frame, name, track_index FROM beat_markers{where} ORDER BY frame", params)
+
+    def budget_lines(self) -> Dict[str, float]:
+        return dict(self.connection.execute("SELECT poste, montant FROM budget_lines ORDER BY rowid"))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="project_store", description="Interroge la base SQLite d'un projet")
+    parser.add_argument("database", type=Path, help="fichier SQLite (exports/project.sqlite)")
+    parser.add_argument("--numero", type=int)
+    parser.add_argument("--lieu")
+    parser.add_argument("--action")
+    parser.add_argument("--emotion")
+    parser.add_argument("--intensite-min", type=int)
+    parser.add_argument("--intensite-max", type=int)
+    parser.add_argument("--plan", action="store_true", help="affiche le plan d'exécution SQLite")
+    parser.add_argument("--json", type=Path, help="exporte le projet en JSON (ScriptAnalyzerV2.exporter_json)")
+    parser.add_argument("--ndjson", type=Path, help="exporte le projet en NDJSON, en flux depuis la base")
+    args = parser.parse_args(argv)
+
+    if not args.database.is_file():
+        print(f"❌ Base introuvable : {args.database}", file=sys.stderr)
+        return 2
+
+    filters = {"numero": args.numero, "lieu": args.lieu, "action": args.action, "emotion": args.emotion,
+               "intensite_min": args.intensite_min, "intensite_max": args.intensite_max}
+    with ProjectStore(args.database, read_only=True) as store:
+        if args.json or args.ndjson:
+            from script_analyzer_v2 import ScriptAnalyzerV2
+
+            analyzer = ScriptAnalyzerV2()
+            for filename, exporter in ((args.json, analyzer.exporter_json), (args.ndjson, analyzer.exporter_ndjson)):
+                if filename:
+                    print(f"✅ {exporter(store, str(filename))}")
+            return 0
+        if args.plan:
+            for step in store.query_plan(**filters):
+                print(f"-- {step}")
+        for shot in store.iter_shots(**filters):
+            print(f"SHOT {shot.numero} [{shot.lieu}] {shot.action}/{shot.emotion} "
+                  f"{shot.intensite_emotionnelle}/10 {shot.duree_estimee:g}s : {shot.description}")
+    return 0
+
+
+if __name__ == "__main__":
+    # main du module importé : les exporteurs V2 reconnaissent project_store.ProjectStore, pas __main__.ProjectStore
+    from project_store import main as _main
+    sys.exit(_main())
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Planificateur de Rendu - Court-Métrage K-pop Salta
+Découpe les shots en plages de frames, estime le coût de rendu par frame
+depuis config.json (technical_specs, project_config.target_resolution,
+blender_integration.render_settings), répartit les plages entre N workers
+locaux (plus longue tâche d'abord, LPT) et exécute le plan en parallèle.
+
+Exemples :
+    python render_farm.py render_manifest.json --renderer stub
+    python render_farm.py render_manifest.json --renderer blender --blend court_metrage.blend -j 4
+"""
+
+import argparse
+import heapq
+import json
+import math
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from project_model import Shot
+
+# Résolutions nommées de project_config.target_resolution
+RESOLUTIONS = {
+    "HD": (1280, 720),
+    "1080p": (1920, 1080),
+    "2K": (2048, 1080),
+    "4K": (3840, 2160),
+    "UHD": (3840, 2160),
+}
+
+# Calibrage du modèle de coût (Cycles, machine de référence)
+SECONDS_PER_MEGAPIXEL_SAMPLE = 0.004
+MOTION_BLUR_FACTOR = 1.25
+DENOISING_FACTOR = 1.1
+EEVEE_FACTOR = 0.05
+# Chaque personnage supplémentaire alourdit la scène
+CHARACTER_FACTOR = 0.25
+
+DEFAULT_MAX_FRAMES = 48
+MANIFEST_VERSION = 1
+
+
+@dataclass
+class FrameRange:
+    """Plage de frames d'un shot (bornes Blender incluses)"""
+    shot: int
+    start: int
+    end: int
+    seconds_per_frame: float
+
+    @property
+    def frames(self) -> int:
+        return self.end - self.start + 1
+
+    @property
+    def cost(self) -> float:
+        return self.frames * self.seconds_per_frame
+
+
+@dataclass
+class RenderChunk:
+    """Lot de plages attribué à un worker"""
+    worker: int
+    ranges: List[FrameRange] = field(default_factory=list)
+    cost: float = 0.0
+
+    @property
+    def frames(self) -> int:
+        return sum(frame_range.frames for frame_range in self.ranges)
+
+
+@dataclass
+class RenderPlan:
+    """Plan de rendu : réglages, coût par frame et lots par worker"""
+    settings: Dict[str, Any]
+    chunks: List[RenderChunk]
+
+    @property
+    def total_frames(self) -> int:
+        return sum(chunk.frames for chunk in self.chunks)
+
+    @property
+    def total_cost(self) -> float:
+        return sum(chunk.cost for chunk in self.chunks)
+
+    @property
+    def makespan(self) -> float:
+        """Durée estimée du rendu : le lot le plus chargé"""
+        return max((chunk.cost for chunk in self.chunks), default=0.0)
+
+    def to_manifest(self) -> Dict[str, Any]:
+        return {
+            "version": MANIFEST_VERSION,
+            "settings": self.settings,
+            "total_frames": self.total_frames,
+            "estimated_cost_seconds": round(self.total_cost, 2),
+            "estimated_makespan_seconds": round(self.makespan, 2),
+            "chunks": [
+                {"worker": chunk.worker, "cost": round(chunk.cost, 2),
+                 "ranges": [asdict(frame_range) for frame_range in chunk.ranges]}
+                for chunk in self.chunks
+            ],
+        }
+
+    @classmethod
+    def from_manifest(cls, manifest: Dict[str, Any]) -> "RenderPlan":
+        chunks = [
+            RenderChunk(chunk["worker"], [FrameRange(**frame_range) for frame_range in chunk["ranges"]], chunk["cost"])
+            for chunk in manifest["chunks"]
+        ]
+        return cls(manifest["settings"], chunks)
+
+    def write_manifest(self, path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_manifest(), f, indent=2, ensure_ascii=False)
+        return path
+
+
+def render_settings(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Réglages de rendu utiles au planificateur, extraits de config.json"""
+    specs = config.get("technical_specs", {})
+    render = config.get("blender_integration", {}).get("render_settings", {})
+    resolution = config.get("project_config", {}).get("target_resolution", "1080p")
+    width, height = RESOLUTIONS.get(resolution, RESOLUTIONS["1080p"])
+    return {
+        "framerate": specs.get("framerate", 24),
+        "resolution": [width, height],
+        "engine": render.get("engine", "Cycles"),
+        "samples": render.get("samples", 128),
+        "motion_blur": bool(render.get("motion_blur", False)),
+        "denoising": bool(render.get("denoising", False)),
+        "seconds_per_megapixel_sample": render.get("seconds_per_megapixel_sample", SECONDS_PER_MEGAPIXEL_SAMPLE),
+    }
+
+
+def frame_cost(settings: Dict[str, Any], characters: int = 1) -> float:
+    """Coût estimé d'une frame, en secondes sur la machine de référence"""
+    width, height = settings["resolution"]
+    cost = width * height / 1e6 * settings["samples"] * settings["seconds_per_megapixel_sample"]
+    if settings["motion_blur"]:
+        cost *= MOTION_BLUR_FACTOR
+    if settings["denoising"]:
+        cost *= DENOISING_FACTOR
+    if settings["engine"].lower() == "eevee":
+        cost *= EEVEE_FACTOR
+    return cost * (1 + CHARACTER_FACTOR * max(characters - 1, 0))
+
+
+def expand_shots(shots: Sequence, settings: Dict[str, Any], max_frames: int = DEFAULT_MAX_FRAMES) -> List[FrameRange]:
+    """Plages de frames des shots montés bout à bout, découpées en morceaux de `max_frames` au plus
+
+    Les bornes sont arrondies depuis le temps cumulé, demi-frame vers le
+    haut, comme la timeline (music_sync.shot_frame_ranges) et les scripts
+    Blender : frames Blender à partir de 1.
+    """
+    framerate = settings["framerate"]
+    ranges = []
+    elapsed = 0.0
+    previous_end = 0
+    for shot in shots:
+        elapsed += shot.duree_estimee
+        end = math.floor(elapsed * framerate + 0.5)
+        cost = frame_cost(settings, len(shot.personnages))
+        for start in range(previous_end, end, max_frames):
+            ranges.append(FrameRange(shot.numero, start + 1, min(start + max_frames, end), cost))
+        previous_end = end
+    return ranges
+
+
+def pack_ranges(ranges: Iterable[FrameRange], workers: int) -> List[RenderChunk]:
+    """Répartition LPT : les plages les plus coûteuses d'abord, chacune au worker le moins chargé"""
+    chunks = [RenderChunk(worker) for worker in range(max(workers, 1))]
+    heap = [(0.0, chunk.worker) for chunk in chunks]
+    for frame_range in sorted(ranges, key=lambda r: (-r.cost, r.start)):
+        load, worker = heapq.heappop(heap)
+        chunks[worker].ranges.append(frame_range)
+        chunks[worker].cost += frame_range.cost
+        heapq.heappush(heap, (load + frame_range.cost, worker))
+    for chunk in chunks:
+        chunk.ranges.sort(key=lambda r: r.start)
+    return chunks
+
+
+def ndjson_shots(path: Union[str, Path]) -> Iterator[Shot]:
+    """Shots d'un export NDJSON (ScriptAnalyzerV2.exporter_ndjson), lus en flux
+
+    Utilisable pendant l'écriture du fichier : seules les lignes complètes
+    sont lues.
+    """
+    from serialization import iter_ndjson
+
+    with open(path, 'rb') as f:
+        for record in iter_ndjson(f):
+            if record.get("type") == "shot":
+                yield Shot(**record["shot"])
+
+
+def plan_render(shots: Iterable, config: Dict[str, Any], workers: Optional[int] = None,
+                max_frames: int = DEFAULT_MAX_FRAMES) -> RenderPlan:
+    """Plan de rendu complet des shots pour `workers` processus locaux"""
+    settings = render_settings(config)
+    workers = workers or os.cpu_count() or 1
+    return RenderPlan(settings, pack_ranges(expand_shots(shots, settings, max_frames), workers))
+
+
+# --- Exécution locale -------------------------------------------------------
+
+def stub_renderer(frame_range: FrameRange, options: Dict[str, Any]) -> int:
+    """Rendu simulé : attend `time_scale` × coût estimé (0 par défaut)"""
+    time.sleep(frame_range.cost * options.get("time_scale", 0.0))
+    return frame_range.frames
+
+
+def blender_renderer(frame_range: FrameRange, options: Dict[str, Any]) -> int:
+    """Rendu en ligne de commande : blender -b fichier.blend -s début -e fin -a"""
+    import subprocess
+
+    command = [
+        options.get("blender", "blender"), "-b", options["blend"],
+        "-o", options.get("output", "//render/frame_####"),
+        "-s", str(frame_range.start), "-e", str(frame_range.end), "-a",
+    ]
+    subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+    return frame_range.frames
+
+
+RENDERERS: Dict[str, Callable[[FrameRange, Dict[str, Any]], int]] = {
+    "stub": stub_renderer,
+    "blender": blender_renderer,
+}
+
+_progress_queue = None
+
+
+def _init_worker(queue):
+    global _progress_queue
+    _progress_queue = queue
+
+
+def run_chunk(chunk: RenderChunk, renderer: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Rend les plages d'un lot (dans un processus worker) et signale chaque plage terminée"""
+    render = RENDERERS[renderer]
+    start = time.perf_counter()
+    frames = 0
+    for frame_range in chunk.ranges:
+        frames += render(frame_range, options)
+        if _progress_queue is not None:
+            _progress_queue.put((chunk.worker, frame_range.shot, frame_range.start, frame_range.end))
+    return {"worker": chunk.worker, "frames": frames, "seconds": round(time.perf_counter() - start, 3)}
+
+
+def run_plan(plan: RenderPlan, renderer: str = "stub", options: Optional[Dict[str, Any]] = None,
+             progress: Optional[Callable[[int, int, Tuple[int, int, int, int]], None]] = None) -> List[Dict[str, Any]]:
+    """Exécute les lots en parallèle (un processus par lot non vide)
+
+    `progress(frames_faites, frames_totales, (worker, shot, début, fin))`
+    est appelé dans le processus principal après chaque plage rendue.
+    """
+    import multiprocessing
+    import queue as queue_module
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    if renderer not in RENDERERS:
+        raise ValueError(f"Renderer inconnu : {renderer} (choix : {', '.join(RENDERERS)})")
+
+    options = options or {}
+    chunks = [chunk for chunk in plan.chunks if chunk.ranges]
+    total, done = plan.total_frames, 0
+    results = []
+    if not chunks:
+        return results
+
+    events = multiprocessing.Queue()
+
+    def drain(block_for: float = 0.0):
+        nonlocal done
+        try:
+            while True:
+                event = events.get(timeout=block_for) if block_for else events.get_nowait()
+                block_for = 0.0
+                done += event[3] - event[2] + 1
+                if progress:
+                    progress(done, total, event)
+        except queue_module.Empty:
+            pass
+
+    with ProcessPoolExecutor(max_workers=len(chunks), initializer=_init_worker, initargs=(events,)) as pool:
+        pending = {pool.submit(run_chunk, chunk, renderer, options) for chunk in chunks}
+        while pending:
+            finished, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+            drain()
+            results.extend(future.result() for future in finished)
+
+    # Évènements encore en transit après la fin des workers
+    while done < total:
+        before = done
+        drain(block_for=1.0)
+        if done == before:
+            break
+
+    results.sort(key=lambda result: result["worker"])
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="render_farm", description="Exécute un manifeste de rendu en local")
+    parser.add_argument("manifest", type=Path, help="manifeste JSON (ScriptAnalyzerV3.plan_render_farm)")
+    parser.add_argument("--renderer", choices=sorted(RENDERERS), default="stub")
+    parser.add_argument("--blend", help="fichier .blend (renderer blender)")
+    parser.add_argument("--blender", default="blender", help="exécutable Blender")
+    parser.add_argument("--output", default="//render/frame_####", help="motif de sortie Blender")
+    parser.add_argument("--time-scale", type=float, default=0.0, help="renderer stub : fraction du coût estimé à attendre")
+    parser.add_argument("-j", "--workers", type=int,
+                        help="processus de rendu (défaut : répartition du manifeste)")
+    args = parser.parse_args(argv)
+
+    if args.renderer == "blender" and not args.blend:
+        parser.error("--blend est requis avec --renderer blender")
+
+    with open(args.manifest, 'r', encoding='utf-8') as f:
+        plan = RenderPlan.from_manifest(json.load(f))
+    if args.workers:
+        # Plages du manifeste réparties à nouveau (LPT) sur le nombre de workers demandé
+        plan = RenderPlan(plan.settings, pack_ranges((r for chunk in plan.chunks for r in chunk.ranges), args.workers))
+
+    def progress(done, total, event):
+        worker, shot, start, end = event
+        print(f"[{done * 100 // total:3d}%] worker {worker} : shot {shot} frames {start}-{end}", flush=True)
+
+    options = {"blend": args.blend, "blender": args.blender, "output": args.output, "time_scale": args.time_scale}
+    for result in run_plan(plan, args.renderer, options, progress):
+        print(f"✅ worker {result['worker']} : {result['frames']} frames en {result['seconds']} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,28 +5,17 @@ Analyseur de Script pour Court-Métrage
 Génère des suggestions de plans de caméra et mood board
 """
 
+import io
+import itertools
 import re
+import sys
 from dataclasses import dataclass
-from typing import List, Dict
+from typing import List, Dict, Iterator, Optional, TextIO
 import json
 
-@dataclass
-class Shot:
-    """Représente un plan avec ses caractéristiques"""
-    numero: int
-    description: str
-    personnages: List[str]
-    action: str
-    emotion: str
-    lieu: str
-
-@dataclass
-class PlanSuggestion:
-    """Suggestion de plan de caméra"""
-    type_plan: str
-    mouvement: str
-    angle: str
-    justification: str
+from script_parser import SourceScript, iter_blocs_shots, completer_champs
+from plan_rules import ReglePlan, MoteurReglesPlans
+from project_model import Shot, PlanSuggestion, ShotTable
 
 @dataclass
 class MoodElement:
@@ -79,51 +68,26 @@ class ScriptAnalyzer:
             }
         }
 
-    def analyser_script(self, script_text: str) -> List[Shot]:
-        """Analyse le script et extrait les informations de chaque shot"""
-        shots = []
-        
-        # Pour ce prototype, on définit manuellement les 3 shots
-        shots_data = [
-            {
-                'numero': 1,
-                'description': 'Petite fille dans sa chambre, dansant sur de la K-pop',
-                'personnages': ['Petite fille'],
-                'action': 'danse',
-                'emotion': 'joie_energie',
-                'lieu': 'chambre_salta'
-            },
-            {
-                'numero': 2,
-                'description': 'Elle imite ses stars K-pop avec passion',
-                'personnages': ['Petite fille'],
-                'action': 'danse_imitation',
-                'emotion': 'concentration_passion',
-                'lieu': 'chambre_salta'
-            },
-            {
-                'numero': 3,
-                'description': 'Le père frappe à la porte pour qu\'elle vienne l\'aider',
-                'personnages': ['Petite fille', 'Père'],
-                'action': 'interaction',
-                'emotion': 'interruption_surprise',
-                'lieu': 'chambre_porte'
-            }
+        # Déduction des champs absents du script à partir de la description
+        self.lexique_script = [
+            (('frappe', 'porte'), {'action': 'interaction', 'emotion': 'interruption_surprise',
+                                   'lieu': 'chambre_porte', 'personnages': ['Petite fille', 'Père']}),
+            (('imite', 'imitation'), {'action': 'danse_imitation', 'emotion': 'concentration_passion'}),
+            (('danse', 'dansant'), {'action': 'danse', 'emotion': 'joie_energie'}),
         ]
-        
-        for data in shots_data:
-            shot = Shot(**data)
-            shots.append(shot)
-            
-        return shots
+        self.champs_par_defaut = {
+            'personnages': ['Petite fille'],
+            'action': 'inconnue',
+            'emotion': 'neutre',
+            'lieu': 'chambre_salta',
+            'duree_estimee': 5.0,
+            'intensite_emotionnelle': 5
+        }
 
-    def suggerer_plans(self, shot: Shot) -> List[PlanSuggestion]:
-        """Génère des suggestions de plans pour un shot donné"""
-        suggestions = []
-        
-        if 'danse' in shot.action:
+        # Règles de suggestion, compilées une fois pour toutes
+        self.regles_plans = [
             # Plans dynamiques pour la danse
-            suggestions.extend([
+            ReglePlan(actions=('danse',), plans=[
                 PlanSuggestion(
                     type_plan="Plan moyen dynamique",
                     mouvement="Travelling circulaire",
@@ -142,10 +106,8 @@ class ScriptAnalyzer:
                     angle="Plongée douce",
                     justification="Établit l'espace de la chambre et le contexte"
                 )
-            ])
-            
-        if 'interaction' in shot.action:
-            suggestions.extend([
+            ]),
+            ReglePlan(actions=('interaction',), plans=[
                 PlanSuggestion(
                     type_plan="Plan américain",
                     mouvement="Panoramique porte → fille",
@@ -159,13 +121,80 @@ class ScriptAnalyzer:
                     justification="Accentue l'interruption sonore"
                 )
             ])
-            
-        return suggestions
+        ]
+        self.moteur_plans = MoteurReglesPlans(self.regles_plans)
 
-    def generer_mood_board(self, shots: List[Shot]) -> Dict:
-        """Génère des éléments de mood board basés sur les shots"""
+    def iter_shots(self, script: SourceScript) -> Iterator[Shot]:
+        """Générateur : lit le script ligne par ligne et produit les shots un à un"""
+        for champs in iter_blocs_shots(script):
+            champs = completer_champs(champs, self.lexique_script, self.champs_par_defaut)
+            yield Shot(
+                numero=champs['numero'],
+                description=champs['description'],
+                personnages=champs['personnages'],
+                action=champs['action'],
+                emotion=champs['emotion'],
+                lieu=champs['lieu'],
+                duree_estimee=float(champs['duree_estimee']),
+                intensite_emotionnelle=int(champs['intensite_emotionnelle'])
+            )
+
+    def analyser_script(self, script_text: SourceScript) -> ShotTable:
+        """Analyse le script et extrait les informations de chaque shot"""
+        shots = ShotTable(self.iter_shots(script_text))
+        if len(shots):
+            return shots
+        
+        # Script sans bloc SHOT : on retombe sur les 3 shots du prototype
+        shots_data = [
+            {
+                'numero': 1,
+                'description': 'Petite fille dans sa chambre, dansant sur de la K-pop',
+                'personnages': ['Petite fille'],
+                'action': 'danse',
+                'emotion': 'joie_energie',
+                'lieu': 'chambre_salta'
+            },
+            {
+                'numero': 2,
+                'description': 'Elle imite ses stars K-pop avec passion',
+                'personnages': ['Petite fille'],
+                'action': 'danse_imitation',
+                'emotion': 'concentration_passion',
+                'lieu': 'chambre_salta'
+            },
+            {
+                'numero': 3,
+                'description': 'Le père frappe à la porte pour qu\'elle vienne l\'aider',
+                'personnages': ['Petite fille', 'Père'],
+                'action': 'interaction',
+                'emotion': 'interruption_surprise',
+                'lieu': 'chambre_porte'
+            }
+        ]
+        
+        shots.extend(Shot(**data) for data in shots_data)
+        return shots
+
+    def suggerer_plans(self, shot: Shot) -> List[PlanSuggestion]:
+        """Génère des suggestions de plans pour un shot donné"""
+        return list(self.moteur_plans.plans_pour(shot.action, shot.emotion))
+
+    def generer_mood_board(self, shots: List[Shot], color_palette: Optional[Dict[str, Dict[str, str]]] = None,
+                           palettes_images: Optional[List[str]] = None) -> Dict:
+        """Génère des éléments de mood board basés sur les shots
+
+        `color_palette` (section de config.json) complète les palettes K-pop
+        et Salta ; `palettes_images` sont les couleurs dominantes des images
+        de référence (image_palettes.dominant_colors). Avec NumPy, les
+        teintes quasi identiques sont fusionnées (ΔE2000) et une palette de
+        fusion K-pop × Salta est calculée par k-means dans CIELAB (voir
+        palette_engine).
+        """
         mood_elements = {
             'palette_principale': [],
+            'palette_fusion': [],
+            'palette_references': [],
             'styles_eclairage': [],
             'ambiances': [],
             'references_visuelles': []
@@ -176,7 +205,19 @@ class ScriptAnalyzer:
         argentine_mood = self.mood_database['argentine_salta']
         anim_mood = self.mood_database['animation_3d_graphique']
         
-        mood_elements['palette_principale'] = kpop_mood['couleurs'] + argentine_mood['couleurs'][:3]
+        try:
+            from palette_engine import best_palette, collect_palettes, dedupe_colors, fusion_palettes
+        except ImportError:  # NumPy absent : palette brute, sans fusion
+            mood_elements['palette_principale'] = kpop_mood['couleurs'] + argentine_mood['couleurs'][:3]
+            mood_elements['palette_references'] = list(palettes_images or [])
+        else:
+            palettes = collect_palettes(self.mood_database, color_palette)
+            kpop = dedupe_colors(palettes['kpop_chambre'] + palettes.get('kpop_colors', []))
+            salta = dedupe_colors(palettes['argentine_salta'] + palettes.get('argentina_colors', []))
+            mood_elements['palette_principale'] = dedupe_colors(kpop[:5] + salta[:3])
+            references = dedupe_colors(palettes_images or [])
+            mood_elements['palette_references'] = references
+            mood_elements['palette_fusion'] = best_palette(fusion_palettes(kpop, salta), kpop + salta + references)
         mood_elements['styles_eclairage'] = [
             kpop_mood['eclairage'],
             argentine_mood['eclairage'],
@@ -197,57 +238,82 @@ class ScriptAnalyzer:
         
         return mood_elements
 
-    def generer_rapport_complet(self, script_text: str) -> str:
+    def generer_rapport_complet(self, script_text: SourceScript, palettes_images: Optional[List[str]] = None) -> str:
         """Génère un rapport complet d'analyse"""
-        shots = self.analyser_script(script_text)
-        mood_board = self.generer_mood_board(shots)
+        flux = io.StringIO()
+        self.ecrire_rapport_complet(script_text, flux, palettes_images)
+        return flux.getvalue()
+
+    def ecrire_rapport_complet(self, script_text: SourceScript, flux: TextIO,
+                               palettes_images: Optional[List[str]] = None):
+        """Écrit le rapport complet dans un objet fichier, shot par shot
+
+        `palettes_images` : couleurs dominantes des images de référence
+        (image_palettes.dominant_colors), reprises dans le mood board.
+        """
+        ecrire = flux.write
+        shots = self.iter_shots(script_text)
+        premier = next(shots, None)
+        if premier is None:
+            shots = iter(self.analyser_script(''))
+        else:
+            shots = itertools.chain([premier], shots)
         
-        rapport = "="*60 + "\n"
-        rapport += "ANALYSE DE SCRIPT - COURT-MÉTRAGE\n"
-        rapport += "Projet : Petite fille K-pop à Salta\n"
-        rapport += "="*60 + "\n\n"
+        ecrire("="*60 + "\n")
+        ecrire("ANALYSE DE SCRIPT - COURT-MÉTRAGE\n")
+        ecrire("Projet : Petite fille K-pop à Salta\n")
+        ecrire("="*60 + "\n\n")
         
         # Analyse par shot
         for shot in shots:
-            rapport += f"SHOT {shot.numero}\n"
-            rapport += "-" * 20 + "\n"
-            rapport += f"Description : {shot.description}\n"
-            rapport += f"Personnages : {', '.join(shot.personnages)}\n"
-            rapport += f"Action : {shot.action}\n"
-            rapport += f"Émotion : {shot.emotion}\n\n"
+            ecrire(f"SHOT {shot.numero}\n")
+            ecrire("-" * 20 + "\n")
+            ecrire(f"Description : {shot.description}\n")
+            ecrire(f"Personnages : {', '.join(shot.personnages)}\n")
+            ecrire(f"Action : {shot.action}\n")
+            ecrire(f"Émotion : {shot.emotion}\n\n")
             
             # Suggestions de plans
             suggestions = self.suggerer_plans(shot)
-            rapport += "SUGGESTIONS DE PLANS :\n"
+            ecrire("SUGGESTIONS DE PLANS :\n")
             for i, suggestion in enumerate(suggestions, 1):
-                rapport += f"{i}. {suggestion.type_plan}\n"
-                rapport += f"   Mouvement : {suggestion.mouvement}\n"
-                rapport += f"   Angle : {suggestion.angle}\n"
-                rapport += f"   Pourquoi : {suggestion.justification}\n\n"
+                ecrire(f"{i}. {suggestion.type_plan}\n")
+                ecrire(f"   Mouvement : {suggestion.mouvement}\n")
+                ecrire(f"   Angle : {suggestion.angle}\n")
+                ecrire(f"   Pourquoi : {suggestion.justification}\n\n")
             
-            rapport += "\n"
+            ecrire("\n")
         
         # Mood board
-        rapport += "MOOD BOARD - STYLE VISUEL\n"
-        rapport += "="*30 + "\n"
-        rapport += f"Palette couleurs : {', '.join(mood_board['palette_principale'][:6])}\n\n"
+        mood_board = self.generer_mood_board([], palettes_images=palettes_images)
+        ecrire("MOOD BOARD - STYLE VISUEL\n")
+        ecrire("="*30 + "\n")
+        ecrire(f"Palette couleurs : {', '.join(mood_board['palette_principale'][:6])}\n")
+        if mood_board['palette_fusion']:
+            ecrire(f"Palette fusion K-pop × Salta : {', '.join(mood_board['palette_fusion'])}\n")
+        if mood_board['palette_references']:
+            ecrire(f"Palette des références : {', '.join(mood_board['palette_references'])}\n")
+        ecrire("\n")
         
-        rapport += "STYLES D'ÉCLAIRAGE :\n"
+        ecrire("STYLES D'ÉCLAIRAGE :\n")
         for style in mood_board['styles_eclairage']:
-            rapport += f"• {style}\n"
+            ecrire(f"• {style}\n")
         
-        rapport += "\nAMBIANCES CLÉS :\n"
+        ecrire("\nAMBIANCES CLÉS :\n")
         for ambiance in mood_board['ambiances']:
-            rapport += f"• {ambiance}\n"
+            ecrire(f"• {ambiance}\n")
             
-        rapport += "\nRÉFÉRENCES VISUELLES :\n"
+        ecrire("\nRÉFÉRENCES VISUELLES :\n")
         for ref in mood_board['references_visuelles']:
-            rapport += f"• {ref}\n"
-        
-        return rapport
+            ecrire(f"• {ref}\n")
 
 # Utilisation du script
 if __name__ == "__main__":
+    # Arguments en ligne de commande : mode lot non interactif
+    if len(sys.argv) > 1:
+        from script_analyzer_cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+    
     analyzer = ScriptAnalyzer()
     
     # Script d'exemple (vos 3 shots)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script Analyzer - Interface en ligne de commande non interactive
+Analyse par lot de plusieurs scripts (une saison d'épisodes...) répartis sur
+un pool de processus, résultats écrits dans un dossier de sortie par script.
+
+Exemples :
+    python script_analyzer_cli.py report episodes/*.txt -o sorties/
+    python script_analyzer_cli.py all episodes/*.txt -o sorties/ -j 8 --date 2025-05-27
+    python script_analyzer_cli.py report episodes/ep01.txt --v1 --references mood_board/
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Sous-commande → aide affichée par --help
+COMMANDS = {
+    "report": "rapport de production V2 (rapport_production.txt, V1 en plus avec --v1)",
+    "json": "export JSON du projet (project_data.json)",
+    "ndjson": "export NDJSON écrit shot par shot (project_data.ndjson)",
+    "pdf": "dossier de production PDF, ou HTML si ReportLab est absent (pdf_reports/)",
+    "blender": "scripts Blender de caméras, lumières et animation (blender_scripts/)",
+    "music-sync": "timelines Premiere Pro et DaVinci Resolve calées sur les beats (music_sync/)",
+    "budget": "estimation budgétaire (sans fichier)",
+    "render-plan": "plan de rendu par plages de frames (exports/render_manifest.json)",
+    "store": "base SQLite indexée du projet (exports/project.sqlite)",
+    "continuity": "continuité couleur des raccords (exports/continuity.json)",
+    "pacing": "rythme du montage face aux beats (exports/pacing.json)",
+    "all": "rapport, JSON et toutes les étapes V3 (sans l'export NDJSON, sous-commande ndjson)",
+}
+
+# Étapes V3 exécutées par sous-commande
+V3_STAGES = {
+    "pdf": ["pdf_export"],
+    "blender": ["blender_scripts"],
+    "music-sync": ["music_sync_files"],
+    "budget": ["estimated_budget"],
+    "render-plan": ["render_plan"],
+    "store": ["project_store"],
+    "continuity": ["continuity"],
+    "pacing": ["pacing"],
+}
+
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    """Date de génération fixe : --date ISO, sinon SOURCE_DATE_EPOCH, sinon None (heure courante)"""
+    if value:
+        return datetime.fromisoformat(value)
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    if epoch:
+        return datetime.fromtimestamp(int(epoch), tz=timezone.utc).replace(tzinfo=None)
+    return None
+
+
+def _output_dirs(scripts: List[Path], output_dir: Path) -> List[Path]:
+    """Un dossier de sortie par script, nommé d'après le fichier (suffixé si doublon)"""
+    dirs, used = [], set()
+    for script in scripts:
+        name, index = script.stem, 2
+        while name in used:
+            name = f"{script.stem}-{index}"
+            index += 1
+        used.add(name)
+        dirs.append(output_dir / name)
+    return dirs
+
+
+def run_job(job: Dict) -> Dict:
+    """Traite un script pour une sous-commande (exécuté dans un processus du pool)"""
+    from script_analyzer import ScriptAnalyzer
+    from script_analyzer_v2 import ScriptAnalyzerV2
+    from script_analyzer_v3_backend import ScriptAnalyzerV3
+
+    command = job["command"]
+    script = Path(job["script"])
+    out = Path(job["output"])
+    generated_at = datetime.fromisoformat(job["date"]) if job["date"] else None
+    out.mkdir(parents=True, exist_ok=True)
+    outputs = {}
+
+    try:
+        if command in ("report", "all"):
+            analyzer = ScriptAnalyzerV2()
+            analyzer.horodatage = generated_at
+            report_file = out / "rapport_production.txt"
+            with open(report_file, 'w', encoding='utf-8') as f:
+                analyzer.ecrire_rapport_complet_v2(f, script)
+            outputs["report"] = str(report_file)
+
+            if job["v1"] or job["references"]:
+                report_v1 = out / "analyse_script.txt"
+                with open(report_v1, 'w', encoding='utf-8') as f:
+                    ScriptAnalyzer().ecrire_rapport_complet(script, f, job["references"])
+                outputs["report_v1"] = str(report_v1)
+
+        if command in ("json", "all"):
+            analyzer = ScriptAnalyzerV2()
+            analyzer.horodatage = generated_at
+            json_file = out / "project_data.json"
+            analyzer.exporter_json(analyzer.analyser_script_avance(script), str(json_file), mode=job["json_mode"])
+            outputs["json"] = str(json_file)
+
+        if command == "ndjson":
+            # Shots lus en flux depuis le script et écrits au fur et à mesure
+            analyzer = ScriptAnalyzerV2()
+            analyzer.horodatage = generated_at
+            ndjson_file = out / "project_data.ndjson"
+            analyzer.exporter_ndjson(analyzer.iter_shots_avance(script), str(ndjson_file))
+            outputs["ndjson"] = str(ndjson_file)
+
+        if command in V3_STAGES or command == "all":
+            shots = ScriptAnalyzerV2().analyser_script_avance(script)
+            analyzer_v3 = ScriptAnalyzerV3(str(out), config_path=job["config"], shots=shots)
+            analyzer_v3.generated_at = generated_at
+            results = analyzer_v3.generate_complete_project(
+                incremental=job["incremental"], max_workers=1, stages=V3_STAGES.get(command)
+            )
+            outputs.update({key: results[key] for key in ("rebuilt", "skipped", "timings")})
+            outputs.update({stage: results[stage] for stage in results["rebuilt"] + results["skipped"]})
+
+        return {"script": str(script), "command": command, "status": "ok", "outputs": outputs}
+    except Exception as exc:  # un script en échec ne bloque pas le lot
+        return {"script": str(script), "command": command, "status": "erreur", "error": f"{type(exc).__name__}: {exc}"}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="script_analyzer_cli",
+        description="Analyse par lot de scripts de court-métrage (V1, V2, V3), sans menu interactif"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    for command, help_text in COMMANDS.items():
+        sub = subparsers.add_parser(command, help=help_text, description=help_text[0].upper() + help_text[1:])
+        sub.add_argument("scripts", nargs="+", type=Path, help="fichiers de script (format 'SHOT n: ...')")
+        sub.add_argument("-o", "--output-dir", type=Path, default=Path("sorties"), help="dossier de sortie")
+        sub.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="processus en parallèle")
+        sub.add_argument("--config", default="config.json", help="config.json du projet (exports V3)")
+        sub.add_argument("--date", help="date de génération ISO fixe (défaut : SOURCE_DATE_EPOCH ou maintenant)")
+        sub.add_argument("--v1", action="store_true", help="ajoute le rapport de l'analyzer V1 (report/all)")
+        sub.add_argument("--references", type=Path,
+                         help="dossier d'images de référence du mood board (rapport V1, report/all)")
+        sub.add_argument("--incremental", action="store_true",
+                         help="build incrémental V3, seuls les artefacts dont les entrées ont changé sont "
+                              f"reconstruits ({'/'.join([*V3_STAGES, 'all'])})")
+        sub.add_argument("--json-mode", choices=["pretty", "compact"], default="pretty",
+                         help="format de project_data.json (json/all)")
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    # Ordre stable : mêmes entrées → mêmes dossiers de sortie
+    scripts = sorted(args.scripts)
+    missing = [str(script) for script in scripts if not script.is_file()]
+    if missing:
+        print(f"❌ Scripts introuvables : {', '.join(missing)}", file=sys.stderr)
+        return 2
+
+    # Couleurs des références calculées une fois pour tout le lot (cache image_palettes)
+    references = None
+    if args.references:
+        if not args.references.is_dir():
+            print(f"❌ Dossier de références introuvable : {args.references}", file=sys.stderr)
+            return 2
+        try:
+            from image_palettes import dominant_colors, extract_palettes
+            extraction = extract_palettes(args.references, workers=args.jobs)
+        except ImportError as exc:
+            print(f"❌ Pillow et NumPy sont requis pour --references (pip install pillow numpy) : {exc}",
+                  file=sys.stderr)
+            return 2
+        for key, error in extraction["errors"].items():
+            print(f"⚠️  Référence ignorée {key} : {error}", file=sys.stderr)
+        references = dominant_colors(extraction["palettes"])
+
+    generated_at = _parse_date(args.date)
+    config = str(Path(args.config).resolve())
+    jobs = [
+        {
+            "command": args.command,
+            "script": str(script.resolve()),
+            "output": str(out.resolve()),
+            "config": config,
+            "date": generated_at.isoformat() if generated_at else None,
+            "v1": args.v1,
+            "references": references,
+            "incremental": args.incremental,
+            "json_mode": args.json_mode,
+        }
+        for script, out in zip(scripts, _output_dirs(scripts, args.output_dir))
+    ]
+
+    # Chaque résultat est écrit en JSON sur une ligne dès qu'il est disponible
+    failures = 0
+    if args.jobs and args.jobs > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            futures = [pool.submit(run_job, job) for job in jobs]
+            for future in as_completed(futures):
+                result = future.result()
+                failures += result["status"] != "ok"
+                print(json.dumps(result, ensure_ascii=False), flush=True)
+    else:
+        for job in jobs:
+            result = run_job(job)
+            failures += result["status"] != "ok"
+            print(json.dumps(result, ensure_ascii=False), flush=True)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
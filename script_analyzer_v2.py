@@ -10,32 +10,36 @@ Nouvelles fonctionnalités :
 - Interface utilisateur améliorée
 """
 
+import io
 import re
 import json
-from dataclasses import dataclass, asdict
-from typing import List, Dict, Tuple
+import math
+from dataclasses import dataclass
+from typing import List, Dict, Tuple, Iterator, Iterable, Callable, TextIO, Any, Optional
 from datetime import datetime
 import os
+import sys
 
-@dataclass
-class Shot:
-    numero: int
-    description: str
-    personnages: List[str]
-    action: str
-    emotion: str
-    lieu: str
-    duree_estimee: float  # en secondes
-    intensite_emotionnelle: int  # 1-10
+# NumPy optionnel : uniquement pour l'analyse par lot
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
 
-@dataclass
-class PlanSuggestion:
-    type_plan: str
-    mouvement: str
-    angle: str
-    justification: str
-    duree_seconde: float
-    difficulte_technique: str  # "Facile", "Moyen", "Difficile"
+from script_parser import SourceScript, iter_blocs_shots, completer_champs
+from plan_rules import ReglePlan, MoteurReglesPlans, INTENSITE_MAX
+from project_model import Shot, PlanSuggestion, ShotTable, en_table
+
+# Seuil à partir duquel un insert émotion forte est ajouté en tête des plans
+SEUIL_INTENSITE_FORTE = 8
+
+# Bornes (exclusives) des rythmes narratifs, en secondes de durée totale
+SEUILS_RYTHME = ((30, 'Rapide'), (60, 'Modéré'))
+RYTHME_PAR_DEFAUT = 'Lent'
+
+# Export NDJSON : le fichier est vidé sur disque tous les N shots écrits
+NDJSON_FLUSH_SHOTS = 256
 
 @dataclass
 class ConceptArt:
@@ -54,6 +58,9 @@ class SuggestionMusicale:
 
 class ScriptAnalyzerV2:
     def __init__(self):
+        # Date de génération fixe (lots reproductibles) ; None = heure courante
+        self.horodatage: Optional[datetime] = None
+        
         # Base de données étendue des types de plans
         self.plan_database = {
             'danse_energique': {
@@ -118,12 +125,85 @@ class ScriptAnalyzerV2:
             }
         }
 
-    def analyser_script_avance(self, script_personnalise: str = None) -> List[Shot]:
+        # Déduction des champs absents d'un script personnalisé
+        self.lexique_script = [
+            (('frappe', 'porte', 'interromp', 'interruption'), {
+                'action': 'interruption_surprise', 'emotion': 'surprise_retour_realite',
+                'lieu': 'chambre_porte_salta', 'personnages': ['Petite fille', 'Père (voix off)'],
+                'duree_estimee': 6.0, 'intensite_emotionnelle': 5
+            }),
+            (('imite', 'concentration'), {
+                'action': 'concentration_artistique', 'emotion': 'focus_passion',
+                'duree_estimee': 10.0, 'intensite_emotionnelle': 8
+            }),
+            (('prépar', 'prepar'), {
+                'action': 'preparation_danse', 'emotion': 'anticipation_joyeuse',
+                'duree_estimee': 8.0, 'intensite_emotionnelle': 6
+            }),
+            (('danse', 'dansant'), {
+                'action': 'danse_energique', 'emotion': 'extase_creative',
+                'duree_estimee': 12.0, 'intensite_emotionnelle': 9
+            }),
+        ]
+        self.champs_par_defaut = {
+            'personnages': ['Petite fille'],
+            'action': 'inconnue',
+            'emotion': 'neutre',
+            'lieu': 'chambre_salta',
+            'duree_estimee': 5.0,
+            'intensite_emotionnelle': 5
+        }
+
+        self.compiler_regles()
+
+    def compiler_regles(self):
+        """Compile plan_database en moteur de règles indexé
+
+        À rappeler après modification de plan_database.
+        """
+        self.regles_plans = [
+            ReglePlan(actions=(action,), plans=entree['plans'])
+            for action, entree in self.plan_database.items()
+        ]
+        # Ajustement selon l'intensité émotionnelle : inséré en tête
+        self.regles_plans.append(ReglePlan(
+            intensite_min=SEUIL_INTENSITE_FORTE,
+            priorite=-1,
+            plans=[{
+                'type': 'Insert émotion forte', 'mouvement': 'Macro focus', 'angle': 'Très proche',
+                'duree': 1.5, 'difficulte': 'Moyen',
+                'justification': "L'intensité émotionnelle élevée nécessite un plan très intime"
+            }]
+        ))
+        self.moteur_plans = MoteurReglesPlans(self.regles_plans)
+
+    def _maintenant(self) -> datetime:
+        """Date de génération des rapports et exports"""
+        return self.horodatage or datetime.now()
+
+    def iter_shots_avance(self, script: SourceScript) -> Iterator[Shot]:
+        """Générateur : lit le script ligne par ligne et produit les shots un à un
+
+        La mémoire reste constante quelle que soit la longueur du script.
+        """
+        for champs in iter_blocs_shots(script):
+            champs = completer_champs(champs, self.lexique_script, self.champs_par_defaut)
+            yield Shot(
+                numero=champs['numero'],
+                description=champs['description'],
+                personnages=champs['personnages'],
+                action=champs['action'],
+                emotion=champs['emotion'],
+                lieu=champs['lieu'],
+                duree_estimee=float(champs['duree_estimee']),
+                intensite_emotionnelle=int(champs['intensite_emotionnelle'])
+            )
+
+    def analyser_script_avance(self, script_personnalise: SourceScript = None) -> ShotTable:
         """Analyse avancée avec timing précis et émotions graduées"""
         
         if script_personnalise:
-            # TODO: Parser un script personnalisé
-            pass
+            return ShotTable(self.iter_shots_avance(script_personnalise))
         
         # Script par défaut avec timing précis
         shots_data = [
@@ -169,44 +249,21 @@ class ScriptAnalyzerV2:
             }
         ]
         
-        shots = []
-        for data in shots_data:
-            shot = Shot(**data)
-            shots.append(shot)
-            
-        return shots
+        return ShotTable(shots_data)
 
     def suggerer_plans_avances(self, shot: Shot) -> List[PlanSuggestion]:
         """Suggestions de plans avec timing et difficulté technique"""
-        suggestions = []
-        
-        # Cherche dans la base de données selon l'action
-        if shot.action in self.plan_database:
-            plans_data = self.plan_database[shot.action]['plans']
-            
-            for plan_data in plans_data:
-                suggestion = PlanSuggestion(
-                    type_plan=plan_data['type'],
-                    mouvement=plan_data['mouvement'],
-                    angle=plan_data['angle'],
-                    justification=self._generer_justification(plan_data, shot),
-                    duree_seconde=plan_data['duree'],
-                    difficulte_technique=plan_data['difficulte']
-                )
-                suggestions.append(suggestion)
-        
-        # Ajuste selon l'intensité émotionnelle
-        if shot.intensite_emotionnelle >= 8:
-            suggestions.insert(0, PlanSuggestion(
-                type_plan="Insert émotion forte",
-                mouvement="Macro focus",
-                angle="Très proche",
-                justification="L'intensité émotionnelle élevée nécessite un plan très intime",
-                duree_seconde=1.5,
-                difficulte_technique="Moyen"
-            ))
-        
-        return suggestions
+        return [
+            PlanSuggestion(
+                type_plan=plan_data['type'],
+                mouvement=plan_data['mouvement'],
+                angle=plan_data['angle'],
+                justification=plan_data.get('justification') or self._generer_justification(plan_data, shot),
+                duree_seconde=plan_data['duree'],
+                difficulte_technique=plan_data['difficulte']
+            )
+            for plan_data in self.moteur_plans.plans_pour(shot.action, shot.emotion, shot.intensite_emotionnelle)
+        ]
 
     def _generer_justification(self, plan_data: dict, shot: Shot) -> str:
         """Génère une justification personnalisée selon le contexte"""
@@ -270,157 +327,329 @@ class ScriptAnalyzerV2:
         
         return concepts
 
-    def suggerer_musique(self, shots: List[Shot]) -> Dict[str, SuggestionMusicale]:
-        """Suggestions musicales adaptées à chaque séquence"""
-        suggestions = {}
-        
-        for shot in shots:
-            if 'danse' in shot.action:
-                suggestions[f"Shot {shot.numero}"] = SuggestionMusicale(
-                    **self.musique_database['danse_kpop']
-                )
-            elif 'interruption' in shot.action:
-                suggestions[f"Shot {shot.numero}"] = SuggestionMusicale(
-                    **self.musique_database['transition']
-                )
-            else:
-                suggestions[f"Shot {shot.numero}"] = SuggestionMusicale(
-                    **self.musique_database['moment_familial']
-                )
-        
-        return suggestions
-
-    def calculer_timing_total(self, shots: List[Shot]) -> Dict[str, float]:
-        """Calcule le timing total et les statistiques"""
-        duree_totale = sum(shot.duree_estimee for shot in shots)
-        intensite_moyenne = sum(shot.intensite_emotionnelle for shot in shots) / len(shots)
+    def suggerer_musique(self, shots: Iterable[Shot]) -> Dict[str, SuggestionMusicale]:
+        """Suggestions musicales adaptées à chaque séquence
+
+        Une suggestion est calculée par action distincte et partagée entre
+        les shots de même action.
+        """
+        shots = en_table(shots)
+        codes, actions = shots.codes('action')
+        par_action = [self._suggestion_musicale_action(action) for action in actions]
+        return {f"Shot {numero}": par_action[code] for numero, code in zip(shots.numeros, codes)}
+
+    def _suggestion_musicale(self, shot: Shot) -> SuggestionMusicale:
+        """Suggestion musicale d'un shot selon son action"""
+        return self._suggestion_musicale_action(shot.action)
+
+    def _suggestion_musicale_action(self, action: str) -> SuggestionMusicale:
+        if 'danse' in action:
+            musique = self.musique_database['danse_kpop']
+        elif 'interruption' in action:
+            musique = self.musique_database['transition']
+        else:
+            musique = self.musique_database['moment_familial']
+        
+        return SuggestionMusicale(
+            tempo_bpm=musique['tempo'],
+            genre=musique['genre'],
+            instruments_cles=musique['instruments'],
+            ambiance=musique['ambiance']
+        )
+
+    def calculer_timing_total(self, shots: Iterable[Shot]) -> Dict[str, float]:
+        """Calcule le timing total et les statistiques (en une passe, accepte un générateur)"""
+        if isinstance(shots, ShotTable):
+            # Colonnes déjà en mémoire : pas de parcours shot par shot
+            compteurs = {'shots': len(shots), 'intensite': sum(shots.intensites)}
+            duree_totale = math.fsum(shots.durees)
+        else:
+            compteurs = {'shots': 0, 'intensite': 0}
+            
+            def durees():
+                for shot in shots:
+                    compteurs['shots'] += 1
+                    compteurs['intensite'] += shot.intensite_emotionnelle
+                    yield shot.duree_estimee
+            
+            duree_totale = math.fsum(durees())
+        intensite_moyenne = compteurs['intensite'] / compteurs['shots'] if compteurs['shots'] else 0.0
         
         return {
             'duree_totale_secondes': duree_totale,
             'duree_totale_minutes': duree_totale / 60,
             'intensite_emotionnelle_moyenne': round(intensite_moyenne, 1),
-            'nombre_shots': len(shots),
-            'rythme': 'Rapide' if duree_totale < 30 else 'Modéré' if duree_totale < 60 else 'Lent'
+            'nombre_shots': compteurs['shots'],
+            'rythme': self._classer_rythme(duree_totale)
+        }
+
+    @staticmethod
+    def _classer_rythme(duree_totale: float) -> str:
+        """Rythme narratif selon la durée totale"""
+        for borne, rythme in SEUILS_RYTHME:
+            if duree_totale < borne:
+                return rythme
+        return RYTHME_PAR_DEFAUT
+
+    def analyser_lot(self, shots: Iterable[Shot]) -> Dict[str, Any]:
+        """Analyse par lot vectorisée (NumPy) pour les projets de milliers de shots
+
+        Retourne des colonnes alignées sur `shots` plus les statistiques de
+        timing ; les résultats sont identiques à ceux du chemin shot par shot
+        (calculer_timing_total, suggerer_plans_avances).
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("NumPy est requis pour analyser_lot (pip install numpy)")
+        
+        # Colonnes de la ShotTable lues sans copie Python par shot
+        shots = en_table(shots)
+        numeros = np.frombuffer(shots.numeros, dtype=shots.numeros.typecode).astype(np.int64)
+        durees = np.frombuffer(shots.durees, dtype=np.float64).copy()
+        intensites = np.frombuffer(shots.intensites, dtype=shots.intensites.typecode).astype(np.int64)
+        
+        # Nombre de plans : une consultation du moteur par combinaison distincte
+        # (action, émotion, intensité), puis redistribution sur tous les shots
+        codes_action, actions = shots.codes('action')
+        codes_emotion, emotions = shots.codes('emotion')
+        codes_action = np.frombuffer(codes_action, dtype=codes_action.typecode).astype(np.int64)
+        codes_emotion = np.frombuffer(codes_emotion, dtype=codes_emotion.typecode).astype(np.int64)
+        niveaux = np.clip(intensites, 0, INTENSITE_MAX)
+        cles = (codes_action * len(emotions) + codes_emotion) * (INTENSITE_MAX + 1) + niveaux
+        cles_uniques, premiers, inverse = np.unique(cles, return_index=True, return_inverse=True)
+        comptes = np.array([
+            len(self.moteur_plans.plans_pour(
+                shots[i].action, shots[i].emotion, shots[i].intensite_emotionnelle
+            ))
+            for i in premiers
+        ], dtype=np.int64)
+        
+        duree_totale = math.fsum(durees)
+        
+        return {
+            'numero': numeros,
+            'duree_estimee': durees,
+            'intensite_emotionnelle': intensites,
+            'debut_secondes': np.concatenate(([0.0], np.cumsum(durees)))[:len(durees)],
+            'insert_emotion_forte': intensites >= SEUIL_INTENSITE_FORTE,
+            'nombre_plans': comptes[inverse.reshape(-1)],
+            'timing_stats': {
+                'duree_totale_secondes': duree_totale,
+                'duree_totale_minutes': duree_totale / 60,
+                'intensite_emotionnelle_moyenne': round(int(intensites.sum()) / len(shots), 1) if len(shots) else 0.0,
+                'nombre_shots': len(shots),
+                'rythme': self._classer_rythme(duree_totale)
+            }
         }
 
-    def generer_rapport_complet_v2(self) -> str:
+    def generer_rapport_complet_v2(self, script_personnalise: SourceScript = None) -> str:
         """Génère un rapport complet avec toutes les nouvelles fonctionnalités"""
-        shots = self.analyser_script_avance()
-        concept_arts = self.generer_concept_art(shots)
-        suggestions_musicales = self.suggerer_musique(shots)
-        timing_stats = self.calculer_timing_total(shots)
+        flux = io.StringIO()
+        self.ecrire_rapport_complet_v2(flux, script_personnalise)
+        return flux.getvalue()
+
+    def _source_shots(self, script_personnalise: SourceScript = None) -> Callable[[], Iterable[Shot]]:
+        """Retourne une fabrique d'itérateurs de shots, relisible à chaque section du rapport
+
+        Un chemin de fichier est relu en flux à chaque passe ; un flux non
+        relisible (objet fichier) est matérialisé une seule fois.
+        """
+        if not script_personnalise:
+            shots = self.analyser_script_avance()
+            return lambda: shots
+        if isinstance(script_personnalise, (str, os.PathLike)):
+            return lambda: self.iter_shots_avance(script_personnalise)
+        shots = ShotTable(self.iter_shots_avance(script_personnalise))
+        return lambda: shots
+
+    def ecrire_rapport_complet_v2(self, flux: TextIO, script_personnalise: SourceScript = None):
+        """Écrit le rapport complet section par section dans un objet fichier
+
+        Les shots sont relus en flux pour chaque section : la mémoire reste
+        constante quelle que soit la taille du script.
+        """
+        ecrire = flux.write
+        source_shots = self._source_shots(script_personnalise)
+        concept_arts = self.generer_concept_art(source_shots())
+        timing_stats = self.calculer_timing_total(source_shots())
         
-        rapport = "=" * 80 + "\n"
-        rapport += "SCRIPT ANALYZER V2.0 - RAPPORT DE PRODUCTION\n"
-        rapport += "Court-Métrage : 'Petite Fille K-pop à Salta'\n"
-        rapport += f"Généré le : {datetime.now().strftime('%d/%m/%Y à %H:%M')}\n"
-        rapport += "=" * 80 + "\n\n"
+        ecrire("=" * 80 + "\n")
+        ecrire("SCRIPT ANALYZER V2.0 - RAPPORT DE PRODUCTION\n")
+        ecrire("Court-Métrage : 'Petite Fille K-pop à Salta'\n")
+        ecrire(f"Généré le : {self._maintenant().strftime('%d/%m/%Y à %H:%M')}\n")
+        ecrire("=" * 80 + "\n\n")
         
         # STATISTIQUES GÉNÉRALES
-        rapport += "📊 STATISTIQUES GÉNÉRALES\n"
-        rapport += "-" * 30 + "\n"
-        rapport += f"Durée totale estimée : {timing_stats['duree_totale_minutes']:.1f} minutes ({timing_stats['duree_totale_secondes']:.0f}s)\n"
-        rapport += f"Nombre de shots : {timing_stats['nombre_shots']}\n"
-        rapport += f"Intensité émotionnelle moyenne : {timing_stats['intensite_emotionnelle_moyenne']}/10\n"
-        rapport += f"Rythme narratif : {timing_stats['rythme']}\n\n"
+        ecrire("📊 STATISTIQUES GÉNÉRALES\n")
+        ecrire("-" * 30 + "\n")
+        ecrire(f"Durée totale estimée : {timing_stats['duree_totale_minutes']:.1f} minutes ({timing_stats['duree_totale_secondes']:.0f}s)\n")
+        ecrire(f"Nombre de shots : {timing_stats['nombre_shots']}\n")
+        ecrire(f"Intensité émotionnelle moyenne : {timing_stats['intensite_emotionnelle_moyenne']}/10\n")
+        ecrire(f"Rythme narratif : {timing_stats['rythme']}\n\n")
         
         # ANALYSE DÉTAILLÉE PAR SHOT
-        rapport += "🎬 ANALYSE DÉTAILLÉE PAR SHOT\n"
-        rapport += "=" * 50 + "\n\n"
-        
-        for shot in shots:
-            rapport += f"SHOT {shot.numero} | {shot.duree_estimee}s | Intensité: {shot.intensite_emotionnelle}/10\n"
-            rapport += "-" * 60 + "\n"
-            rapport += f"📝 Description : {shot.description}\n"
-            rapport += f"👥 Personnages : {', '.join(shot.personnages)}\n"
-            rapport += f"🎭 Action/Émotion : {shot.action} → {shot.emotion}\n"
-            rapport += f"📍 Lieu : {shot.lieu}\n\n"
+        ecrire("🎬 ANALYSE DÉTAILLÉE PAR SHOT\n")
+        ecrire("=" * 50 + "\n\n")
+        
+        for shot in source_shots():
+            ecrire(f"SHOT {shot.numero} | {shot.duree_estimee}s | Intensité: {shot.intensite_emotionnelle}/10\n")
+            ecrire("-" * 60 + "\n")
+            ecrire(f"📝 Description : {shot.description}\n")
+            ecrire(f"👥 Personnages : {', '.join(shot.personnages)}\n")
+            ecrire(f"🎭 Action/Émotion : {shot.action} → {shot.emotion}\n")
+            ecrire(f"📍 Lieu : {shot.lieu}\n\n")
             
             # Plans suggérés
             suggestions = self.suggerer_plans_avances(shot)
-            rapport += "🎥 PLANS SUGGÉRÉS :\n"
+            ecrire("🎥 PLANS SUGGÉRÉS :\n")
             for i, plan in enumerate(suggestions, 1):
-                rapport += f"  {i}. {plan.type_plan} ({plan.duree_seconde}s - {plan.difficulte_technique})\n"
-                rapport += f"     Mouvement : {plan.mouvement}\n"
-                rapport += f"     Angle : {plan.angle}\n"
-                rapport += f"     → {plan.justification}\n\n"
+                ecrire(f"  {i}. {plan.type_plan} ({plan.duree_seconde}s - {plan.difficulte_technique})\n")
+                ecrire(f"     Mouvement : {plan.mouvement}\n")
+                ecrire(f"     Angle : {plan.angle}\n")
+                ecrire(f"     → {plan.justification}\n\n")
             
-            rapport += "\n"
+            ecrire("\n")
         
         # CONCEPT ART
-        rapport += "🎨 CONCEPT ART - RÉFÉRENCES VISUELLES\n"
-        rapport += "=" * 50 + "\n\n"
+        ecrire("🎨 CONCEPT ART - RÉFÉRENCES VISUELLES\n")
+        ecrire("=" * 50 + "\n\n")
         
         for concept in concept_arts:
-            rapport += f"🖼️  {concept.titre}\n"
-            rapport += "-" * 40 + "\n"
-            rapport += f"{concept.description_visuelle}\n\n"
-            rapport += f"🎨 Palette : {', '.join(concept.palette_couleurs)}\n"
-            rapport += f"💡 Éclairage : {concept.style_eclairage}\n"
-            rapport += f"📚 Références :\n"
+            ecrire(f"🖼️  {concept.titre}\n")
+            ecrire("-" * 40 + "\n")
+            ecrire(f"{concept.description_visuelle}\n\n")
+            ecrire(f"🎨 Palette : {', '.join(concept.palette_couleurs)}\n")
+            ecrire(f"💡 Éclairage : {concept.style_eclairage}\n")
+            ecrire(f"📚 Références :\n")
             for ref in concept.references:
-                rapport += f"   • {ref}\n"
-            rapport += "\n"
+                ecrire(f"   • {ref}\n")
+            ecrire("\n")
         
         # SUGGESTIONS MUSICALES
-        rapport += "🎵 DESIGN SONORE ET MUSICAL\n"
-        rapport += "=" * 50 + "\n\n"
+        ecrire("🎵 DESIGN SONORE ET MUSICAL\n")
+        ecrire("=" * 50 + "\n\n")
         
-        for shot_key, musique in suggestions_musicales.items():
-            rapport += f"♪ {shot_key}\n"
-            rapport += f"   Tempo : {musique.tempo_bpm} BPM\n"
-            rapport += f"   Genre : {musique.genre}\n"
-            rapport += f"   Instruments : {', '.join(musique.instruments_cles)}\n"
-            rapport += f"   Ambiance : {musique.ambiance}\n\n"
+        for shot in source_shots():
+            musique = self._suggestion_musicale(shot)
+            ecrire(f"♪ Shot {shot.numero}\n")
+            ecrire(f"   Tempo : {musique.tempo_bpm} BPM\n")
+            ecrire(f"   Genre : {musique.genre}\n")
+            ecrire(f"   Instruments : {', '.join(musique.instruments_cles)}\n")
+            ecrire(f"   Ambiance : {musique.ambiance}\n\n")
         
         # CONSEILS DE PRODUCTION
-        rapport += "💡 CONSEILS DE PRODUCTION 3D\n"
-        rapport += "=" * 50 + "\n"
-        rapport += "• MODÉLISATION : Privilégier un style 'toon shader' pour l'animation 3D\n"
-        rapport += "• ÉCLAIRAGE : Mélanger éclairage 3D technique et artistique (néons + chaleur)\n"
-        rapport += "• ANIMATION : Exagérer les expressions faciales (style Pixar)\n"
-        rapport += "• TEXTURES : Contraste entre matériaux modernes (plastique, métal) et traditionnels (adobe, bois)\n"
-        rapport += "• POST-PRODUCTION : Color grading pour accentuer le contraste K-pop/Argentine\n\n"
+        ecrire("💡 CONSEILS DE PRODUCTION 3D\n")
+        ecrire("=" * 50 + "\n")
+        ecrire("• MODÉLISATION : Privilégier un style 'toon shader' pour l'animation 3D\n")
+        ecrire("• ÉCLAIRAGE : Mélanger éclairage 3D technique et artistique (néons + chaleur)\n")
+        ecrire("• ANIMATION : Exagérer les expressions faciales (style Pixar)\n")
+        ecrire("• TEXTURES : Contraste entre matériaux modernes (plastique, métal) et traditionnels (adobe, bois)\n")
+        ecrire("• POST-PRODUCTION : Color grading pour accentuer le contraste K-pop/Argentine\n\n")
         
         # PLANNING SUGGÉRÉ
-        rapport += "📅 PLANNING DE PRODUCTION SUGGÉRÉ\n"
-        rapport += "=" * 50 + "\n"
-        rapport += "PHASE 1 - Pré-production (2-3 semaines)\n"
-        rapport += "  • Storyboard détaillé\n"
-        rapport += "  • Concept art finalisé\n"
-        rapport += "  • Modélisation 3D des personnages\n\n"
-        rapport += "PHASE 2 - Production (4-6 semaines)\n"
-        rapport += "  • Animation des séquences de danse\n"
-        rapport += "  • Rendu et éclairage\n"
-        rapport += "  • Design sonore\n\n"
-        rapport += "PHASE 3 - Post-production (1-2 semaines)\n"
-        rapport += "  • Montage final\n"
-        rapport += "  • Color grading\n"
-        rapport += "  • Mixage audio\n\n"
-        
-        rapport += "=" * 80 + "\n"
-        rapport += "Rapport généré par Script Analyzer V2.0\n"
-        rapport += "Prêt pour la production ! 🚀\n"
-        rapport += "=" * 80 + "\n"
-        
-        return rapport
-
-    def exporter_json(self, shots: List[Shot], filename: str = "project_data.json"):
-        """Exporte toutes les données en JSON pour intégration avec d'autres outils"""
+        ecrire("📅 PLANNING DE PRODUCTION SUGGÉRÉ\n")
+        ecrire("=" * 50 + "\n")
+        ecrire("PHASE 1 - Pré-production (2-3 semaines)\n")
+        ecrire("  • Storyboard détaillé\n")
+        ecrire("  • Concept art finalisé\n")
+        ecrire("  • Modélisation 3D des personnages\n\n")
+        ecrire("PHASE 2 - Production (4-6 semaines)\n")
+        ecrire("  • Animation des séquences de danse\n")
+        ecrire("  • Rendu et éclairage\n")
+        ecrire("  • Design sonore\n\n")
+        ecrire("PHASE 3 - Post-production (1-2 semaines)\n")
+        ecrire("  • Montage final\n")
+        ecrire("  • Color grading\n")
+        ecrire("  • Mixage audio\n\n")
+        
+        ecrire("=" * 80 + "\n")
+        ecrire("Rapport généré par Script Analyzer V2.0\n")
+        ecrire("Prêt pour la production ! 🚀\n")
+        ecrire("=" * 80 + "\n")
+
+    def exporter_json(self, shots: Iterable[Shot], filename: str = "project_data.json", mode: str = "pretty",
+                      backend: Optional[str] = None):
+        """Exporte toutes les données en JSON pour intégration avec d'autres outils
+
+        `shots` : shots analysés ou project_store.ProjectStore (shots lus par
+        son curseur). `mode` vaut "pretty" (indenté) ou "compact" ;
+        l'encodeur (orjson, msgspec ou json) est choisi par
+        serialization.default_backend().
+        """
+        from project_store import ProjectStore
+        from serialization import dump
+        
+        shots = shots.shots() if isinstance(shots, ProjectStore) else en_table(shots)
         data = {
             'metadata': {
                 'titre': 'Court-Métrage K-pop Salta',
                 'version_analyzer': '2.0',
-                'date_generation': datetime.now().isoformat(),
+                'date_generation': self._maintenant().isoformat(),
             },
-            'shots': [asdict(shot) for shot in shots],
-            'concept_arts': [asdict(concept) for concept in self.generer_concept_art(shots)],
+            # Shots lus directement dans les colonnes ; les dataclasses sont converties à l'encodage
+            'shots': shots.to_dicts(),
+            'concept_arts': self.generer_concept_art(shots),
             'suggestions_musicales': self.suggerer_musique(shots),
             'timing_stats': self.calculer_timing_total(shots)
         }
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        with open(filename, 'wb') as f:
+            dump(data, f, mode, backend)
+        
+        return f"Données exportées vers {filename}"
+
+    def exporter_ndjson(self, shots: Iterable[Shot], filename: str = "project_data.ndjson",
+                        backend: Optional[str] = None, flush_every: int = NDJSON_FLUSH_SHOTS):
+        """Exporte le projet en JSON délimité par lignes (NDJSON), écrit au fil de l'analyse
+
+        Une ligne "metadata", puis une ligne "shot" par shot (champs, début
+        sur la timeline, plans suggérés, suggestion musicale), puis une ligne
+        "timing_stats". `shots` peut être un générateur (iter_shots_avance)
+        ou une project_store.ProjectStore, dont les shots et les plans déjà
+        enregistrés sont lus en flux : rien n'est gardé en mémoire, et le
+        fichier est vidé tous les `flush_every` shots pour que les outils en
+        aval le lisent pendant l'écriture (serialization.iter_ndjson).
+        """
+        from project_store import ProjectStore
+        from serialization import get_encoder
+        
+        encoder = get_encoder("compact", backend)
+        if isinstance(shots, ProjectStore):
+            lignes = shots.iter_shots_with_plans()
+        else:
+            if isinstance(shots, ShotTable):
+                # Une dataclass par ligne, lue dans les colonnes : plus rapide que les ShotRecord
+                shots = (Shot(**champs) for champs in shots.iter_dicts())
+            lignes = ((shot, None) for shot in shots)
+        
+        with open(filename, 'wb') as f:
+            def ecrire(enregistrement):
+                f.write(encoder(enregistrement))
+                f.write(b"\n")
+            
+            ecrire({
+                'type': 'metadata',
+                'titre': 'Court-Métrage K-pop Salta',
+                'version_analyzer': '2.0',
+                'date_generation': self._maintenant().isoformat(),
+            })
+            f.flush()
+            
+            def shots_ecrits():
+                debut = 0.0
+                for rang, (shot, plans) in enumerate(lignes, 1):
+                    ecrire({
+                        'type': 'shot',
+                        'shot': shot,
+                        'debut_secondes': debut,
+                        'plans_suggeres': plans if plans is not None else self.suggerer_plans_avances(shot),
+                        'suggestion_musicale': self._suggestion_musicale(shot),
+                    })
+                    if rang % flush_every == 0:
+                        f.flush()
+                    debut += shot.duree_estimee
+                    yield shot
+            
+            ecrire({'type': 'timing_stats', **self.calculer_timing_total(shots_ecrits())})
         
         return f"Données exportées vers {filename}"
 
@@ -443,16 +672,15 @@ def interface_utilisateur():
         
         if choix == "1":
             print("\n🔄 Génération du rapport...")
-            rapport = analyzer.generer_rapport_complet_v2()
-            
             filename = f"rapport_production_{datetime.now().strftime('%Y%m%d_%H%M')}.txt"
             with open(filename, 'w', encoding='utf-8') as f:
-                f.write(rapport)
+                analyzer.ecrire_rapport_complet_v2(f)
             
             print(f"\n✅ Rapport généré : {filename}")
             print("\n📋 APERÇU DU RAPPORT :")
             print("-" * 40)
-            print(rapport[:1000] + "...\n[Rapport complet dans le fichier]")
+            with open(filename, 'r', encoding='utf-8') as f:
+                print(f.read(1000) + "...\n[Rapport complet dans le fichier]")
             
         elif choix == "2":
             print("\n🔄 Export JSON...")
@@ -462,8 +690,16 @@ def interface_utilisateur():
             print(f"\n✅ {result}")
             
         elif choix == "3":
-            print("\n📝 Fonctionnalité à venir dans la V3.0 !")
-            print("Pour l'instant, utilisez le script par défaut.")
+            chemin = input("\n📝 Chemin du script (format 'SHOT n: ...') : ").strip()
+            if not os.path.isfile(chemin):
+                print(f"\n❌ Fichier introuvable : {chemin}")
+                continue
+            
+            nombre_shots = 0
+            for shot in analyzer.iter_shots_avance(chemin):
+                nombre_shots += 1
+                print(f"SHOT {shot.numero} | {shot.duree_estimee}s | {shot.action} → {shot.emotion}")
+            print(f"\n✅ {nombre_shots} shots analysés")
             
         elif choix == "4":
             print("\n👋 Au revoir ! Bon courage pour votre court-métrage !")
@@ -474,6 +710,11 @@ def interface_utilisateur():
 
 # UTILISATION DIRECTE
 if __name__ == "__main__":
+    # Arguments en ligne de commande : mode lot non interactif
+    if len(sys.argv) > 1:
+        from script_analyzer_cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+    
     # Choix : interface utilisateur ou génération directe
     print("🎬 Script Analyzer V2.0 pour 'Petite Fille K-pop à Salta'")
     print("\nMode de lancement :")
@@ -489,11 +730,10 @@ if __name__ == "__main__":
         analyzer = ScriptAnalyzerV2()
         print("\n🔄 Génération du rapport complet...")
         
-        rapport = analyzer.generer_rapport_complet_v2()
         filename = f"rapport_kpop_salta_{datetime.now().strftime('%Y%m%d_%H%M')}.txt"
         
         with open(filename, 'w', encoding='utf-8') as f:
-            f.write(rapport)
+            analyzer.ecrire_rapport_complet_v2(f)
             
         print(f"\n✅ Rapport généré avec succès : {filename}")
         print(f"📊 Aperçu : Court-métrage de {analyzer.calculer_timing_total(analyzer.analyser_script_avance())['duree_totale_minutes']:.1f} minutes")
@@ -6,32 +6,58 @@ Court-Métrage K-pop Salta
 Toutes les fonctionnalités avancées : IA, PDF, 3D, Sync Musical
 """
 
+import copy
 import json
+import math
 import os
+import sys
+import hashlib
+import time
+import importlib.util
 from datetime import datetime
 from dataclasses import dataclass, asdict
-from typing import List, Dict, Any, Optional
-import base64
+from functools import partial
+from typing import List, Dict, Any, Callable, Iterable, Optional, Sequence
 from pathlib import Path
-import subprocess
-import tempfile
-
-# Tentative d'imports optionnels
-try:
-    from reportlab.lib.pagesizes import A4
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib import colors
-    from reportlab.lib.units import inch
-    REPORTLAB_AVAILABLE = True
-except ImportError:
-    REPORTLAB_AVAILABLE = False
-
-try:
-    import requests
-    REQUESTS_AVAILABLE = True
-except ImportError:
-    REQUESTS_AVAILABLE = False
+
+from project_model import ShotTable, en_table
+
+# Dépendances optionnelles (reportlab, requests...) : importées à la première
+# utilisation de la fonctionnalité qui en a besoin, jamais au chargement du
+# module. Les lots de production lancent des milliers de processus courts.
+
+def _module_available(name: str) -> bool:
+    """Vérifie qu'un module optionnel est installé, sans l'importer"""
+    return importlib.util.find_spec(name) is not None
+
+def _module_source(name: str) -> str:
+    """Code source d'un module du projet (pour les empreintes), sans l'importer"""
+    spec = importlib.util.find_spec(name)
+    if spec is None or not spec.origin:
+        return ""
+    with open(spec.origin, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def __getattr__(name: str):
+    # Compatibilité : REPORTLAB_AVAILABLE / REQUESTS_AVAILABLE évalués à la demande
+    if name == "REPORTLAB_AVAILABLE":
+        return _module_available("reportlab")
+    if name == "REQUESTS_AVAILABLE":
+        return _module_available("requests")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Manifeste du build incrémental (empreintes des entrées de chaque artefact)
+BUILD_MANIFEST = ".build_manifest.json"
+# Attribut absent de l'analyzer avant une étape (voir _run_stage)
+_MISSING = object()
+
+# Couleurs par défaut des lumières des scripts Blender (color_palette.lighting_colors)
+LIGHTING_COLORS = {
+    "neon_pink": "#FF1493",
+    "neon_cyan": "#00FFFF",
+    "golden_hour": "#FFD700",
+    "soft_fill": "#E6E6FA",
+}
 
 @dataclass
 class AIImagePrompt:
@@ -72,18 +98,31 @@ class BudgetEstimate:
     total: float
 
 class ScriptAnalyzerV3:
-    def __init__(self, project_path: str = "."):
+    def __init__(self, project_path: str = ".", config_path: Optional[str] = None, shots: Optional[Iterable] = None):
         self.project_path = Path(project_path)
+        # Shots analysés (ShotTable partagée avec V1/V2) : un seul parsing pour tous les exports
+        self._shots = None if shots is None else en_table(shots)
+        self.config_path = Path(config_path) if config_path else self.project_path / "config.json"
         self.config = self._load_config()
+        # Date de génération fixe (lots reproductibles) ; None = heure courante
+        self.generated_at: Optional[datetime] = None
         self.ai_prompts = []
         self.blender_scripts = []
+        # Keyframes d'origine / gardées par caméra après simplification des trajectoires
+        self.camera_compression: Dict[str, Dict[str, float]] = {}
+        self.last_export_path: Optional[Path] = None
+        self.last_render_manifest: Optional[Path] = None
+        self.last_project_store: Optional[Path] = None
+        self.last_continuity_report: Optional[Path] = None
+        self.last_pacing_report: Optional[Path] = None
+        self.last_pdf_fragments: Dict[str, List[str]] = {}
         
         # Initialisation des dossiers de projet
         self._init_project_structure()
         
     def _load_config(self) -> Dict:
         """Charge la configuration du projet"""
-        config_file = self.project_path / "config.json"
+        config_file = self.config_path
         if config_file.exists():
             with open(config_file, 'r', encoding='utf-8') as f:
                 return json.load(f)
@@ -98,6 +137,18 @@ class ScriptAnalyzerV3:
             "target_resolution": "4K"
         }
     
+    @property
+    def shots(self) -> ShotTable:
+        """Shots analysés (V2) ; par défaut ceux du script du court-métrage"""
+        if self._shots is None:
+            from script_analyzer_v2 import ScriptAnalyzerV2
+            self._shots = ScriptAnalyzerV2().analyser_script_avance()
+        return self._shots
+
+    def _now(self) -> datetime:
+        """Date de génération des exports"""
+        return self.generated_at or datetime.now()
+    
     def _init_project_structure(self):
         """Initialise la structure de dossiers du projet"""
         folders = [
@@ -106,7 +157,7 @@ class ScriptAnalyzerV3:
         ]
         
         for folder in folders:
-            (self.project_path / folder).mkdir(exist_ok=True)
+            (self.project_path / folder).mkdir(parents=True, exist_ok=True)
 
     def generate_ai_image_prompts(self) -> List[AIImagePrompt]:
         """Génère des prompts optimisés pour l'IA"""
@@ -198,223 +249,82 @@ class ScriptAnalyzerV3:
         self.ai_prompts = prompts
         return prompts
 
-    def generate_blender_scripts(self) -> List[BlenderScript]:
-        """Génère des scripts Blender automatiques"""
+    def generate_blender_scripts(self, tolerance: Optional[float] = None,
+                                 rotation_tolerance: Optional[float] = None) -> List[BlenderScript]:
+        """Génère des scripts Blender automatiques
+
+        Les trajectoires de caméra sont simplifiées : seules les keyframes
+        nécessaires pour rester à moins de `tolerance` (mètres) et de
+        `rotation_tolerance` (radians) de la trajectoire échantillonnée sont
+        écrites, avec leurs poignées de Bézier. Défauts : section
+        `blender_integration` de config.json.
+        """
+        import numpy as np
+        from blender_templates import hex_to_rgb, load_template, render_template
+        from camera_paths import orbit_path, reduce_channels, format_channels
+        from music_sync import BeatGrid
+        
+        blender_config = self.config.get("blender_integration", {})
+        tolerances = {
+            "location": tolerance if tolerance is not None else blender_config.get("keyframe_tolerance", 0.001),
+            "rotation_euler": rotation_tolerance if rotation_tolerance is not None
+            else blender_config.get("rotation_tolerance", 0.001),
+        }
+        
         scripts = []
         
+        # Trajectoire du travelling circulaire, calculée en bloc puis simplifiée
+        frames = np.arange(1, 180)
+        orbit_keys, orbit_stats = reduce_channels(frames, orbit_path(frames), tolerances)
+        orbit_channels = format_channels(orbit_keys)
+        self.camera_compression = {"Camera_Shot02_Circular": orbit_stats}
+        
+        # Couleurs des lumières : lighting_colors de config.json, défauts sinon
+        colors = {**LIGHTING_COLORS, **self.config.get("color_palette", {}).get("lighting_colors", {})}
+        lighting = {name: hex_to_rgb(color) for name, color in colors.items()}
+        
+        # Plages des shots, pistes et beats : caméras et marqueurs placés via l'index de timeline
+        grid = BeatGrid.from_config(self.config)
+        index = self.build_timeline_index(grid)
+        starts, ends = index.shots.starts, index.shots.ends
+        
         # Script 1: Setup de caméra automatique
-        camera_script = BlenderScript(
+        scripts.append(BlenderScript(
             nom_script="camera_movements_kpop.py",
-            code_python="""
-import bpy
-import mathutils
-from mathutils import Vector
-import bmesh
-
-def setup_kpop_cameras():
-    \"\"\"Configure les caméras pour les séquences K-pop\"\"\"
-    
-    # Supprimer caméras existantes
-    bpy.ops.object.select_all(action='DESELECT')
-    for obj in bpy.context.scene.objects:
-        if obj.type == 'CAMERA':
-            obj.select_set(True)
-    bpy.ops.object.delete()
-    
-    # Shot 1: Plan large établissement
-    bpy.ops.object.camera_add(location=(5, -8, 3))
-    cam1 = bpy.context.active_object
-    cam1.name = "Camera_Shot01_Wide"
-    cam1.rotation_euler = (1.1, 0, 0.8)
-    
-    # Keyframes pour zoom avant
-    cam1.keyframe_insert(data_path="location", frame=1)
-    cam1.location = (3, -5, 2.5)
-    cam1.keyframe_insert(data_path="location", frame=120)
-    
-    # Shot 2: Travelling circulaire dynamique
-    bpy.ops.object.camera_add(location=(4, -4, 2))
-    cam2 = bpy.context.active_object
-    cam2.name = "Camera_Shot02_Circular"
-    
-    # Animation circulaire
-    for frame in range(1, 180):
-        angle = (frame / 180) * 6.28  # 2 tours
-        x = 4 * mathutils.cos(angle)
-        y = 4 * mathutils.sin(angle) - 4
-        z = 2 + mathutils.sin(angle * 2) * 0.5
-        
-        cam2.location = (x, y, z)
-        cam2.keyframe_insert(data_path="location", frame=frame)
-        
-        # Rotation pour garder le sujet en cadre
-        cam2.rotation_euler = (1.2, 0, angle + 1.57)
-        cam2.keyframe_insert(data_path="rotation_euler", frame=frame)
-    
-    # Shot 3: Gros plan avec focus pull
-    bpy.ops.object.camera_add(location=(1, -2, 1.6))
-    cam3 = bpy.context.active_object
-    cam3.name = "Camera_Shot03_Closeup"
-    cam3.rotation_euler = (1.3, 0, 0.2)
-    
-    # Configuration depth of field
-    cam3.data.dof.use_dof = True
-    cam3.data.dof.focus_distance = 2.0
-    cam3.data.dof.aperture_fstop = 1.4
-    
-    # Shot 4: Plan américain réaction
-    bpy.ops.object.camera_add(location=(2, -3, 1.8))
-    cam4 = bpy.context.active_object
-    cam4.name = "Camera_Shot04_American"
-    cam4.rotation_euler = (1.15, 0, 0.3)
-    
-    print("Caméras K-pop configurées avec succès!")
-
-def setup_lighting_kpop():
-    \"\"\"Configure l'éclairage K-pop avec néons\"\"\"
-    
-    # Supprimer éclairage existant
-    bpy.ops.object.select_all(action='DESELECT')
-    for obj in bpy.context.scene.objects:
-        if obj.type == 'LIGHT':
-            obj.select_set(True)
-    bpy.ops.object.delete()
-    
-    # Éclairage principal - LED strips roses
-    bpy.ops.object.light_add(type='AREA', location=(0, 2, 3))
-    light1 = bpy.context.active_object
-    light1.name = "LED_Strip_Pink"
-    light1.data.energy = 50
-    light1.data.color = (1.0, 0.4, 0.7)  # Rose K-pop
-    light1.data.size = 2
-    light1.data.size_y = 0.1
-    
-    # LED strips cyan
-    bpy.ops.object.light_add(type='AREA', location=(3, 0, 3))
-    light2 = bpy.context.active_object
-    light2.name = "LED_Strip_Cyan"
-    light2.data.energy = 45
-    light2.data.color = (0.0, 1.0, 1.0)  # Cyan
-    light2.data.size = 2
-    light2.data.size_y = 0.1
-    
-    # Lumière dorée Argentine (fenêtre)
-    bpy.ops.object.light_add(type='SUN', location=(5, 5, 8))
-    sun_light = bpy.context.active_object
-    sun_light.name = "Salta_Golden_Light"
-    sun_light.data.energy = 3
-    sun_light.data.color = (1.0, 0.8, 0.6)  # Doré chaud
-    sun_light.rotation_euler = (0.5, 0.3, -0.8)
-    
-    # Éclairage de remplissage
-    bpy.ops.object.light_add(type='AREA', location=(-2, -2, 2))
-    fill_light = bpy.context.active_object
-    fill_light.name = "Fill_Soft"
-    fill_light.data.energy = 20
-    fill_light.data.color = (0.9, 0.9, 1.0)  # Bleu doux
-    
-    print("Éclairage K-pop configuré!")
-
-# Exécution
-if __name__ == "__main__":
-    setup_kpop_cameras()
-    setup_lighting_kpop()
-    print("Setup Blender K-pop terminé!")
-""",
+            code_python=render_template("camera_movements_kpop.py.tmpl", orbit_channels=orbit_channels, **lighting),
             description="Script automatique pour configurer caméras et éclairage K-pop dans Blender",
             compatibilite="Blender 3.0+"
-        )
-        scripts.append(camera_script)
+        ))
         
-        # Script 2: Animation et rigging
-        animation_script = BlenderScript(
+        # Script 2: Animation et rigging, une pose clé par shot
+        kpop_poses = "[\n" + "".join(
+            f"        {{\"frame\": {start + 1}, \"pose\": {json.dumps(shot.action, ensure_ascii=False)}, "
+            f"\"energy\": {shot.intensite_emotionnelle / 10}}},\n"
+            for shot, start in zip(self.shots, starts)
+        ) + "    ]"
+        scripts.append(BlenderScript(
             nom_script="character_animation_kpop.py",
-            code_python="""
-import bpy
-import mathutils
-
-def create_kpop_dance_animation():
-    \"\"\"Crée une animation de base pour la danse K-pop\"\"\"
-    
-    # Vérifier qu'un personnage est sélectionné
-    if not bpy.context.active_object or bpy.context.active_object.type != 'ARMATURE':
-        print("Erreur: Sélectionnez un armature de personnage")
-        return
-    
-    armature = bpy.context.active_object
-    
-    # Poses clés K-pop
-    kpop_poses = [
-        {"frame": 1, "pose": "idle", "energy": 0.3},
-        {"frame": 30, "pose": "preparation", "energy": 0.6},
-        {"frame": 60, "pose": "explosion_joie", "energy": 1.0},
-        {"frame": 120, "pose": "concentration", "energy": 0.8},
-        {"frame": 150, "pose": "finale", "energy": 0.9}
-    ]
-    
-    # Configuration des keyframes
-    bpy.context.scene.frame_set(1)
-    
-    for pose_data in kpop_poses:
-        frame = pose_data["frame"]
-        energy = pose_data["energy"]
-        
-        bpy.context.scene.frame_set(frame)
-        
-        # Animation des bras (simulation gestuelle K-pop)
-        if "arm_L" in armature.pose.bones:
-            bone_L = armature.pose.bones["arm_L"]
-            bone_L.rotation_quaternion = mathutils.Quaternion((1, energy, 0.5, 0.2))
-            bone_L.keyframe_insert(data_path="rotation_quaternion")
-        
-        if "arm_R" in armature.pose.bones:
-            bone_R = armature.pose.bones["arm_R"]
-            bone_R.rotation_quaternion = mathutils.Quaternion((1, -energy, 0.5, -0.2))
-            bone_R.keyframe_insert(data_path="rotation_quaternion")
-        
-        # Animation du torse
-        if "spine" in armature.pose.bones:
-            spine = armature.pose.bones["spine"]
-            spine.rotation_euler = (0, 0, energy * 0.1)
-            spine.keyframe_insert(data_path="rotation_euler")
-    
-    print(f"Animation K-pop créée avec {len(kpop_poses)} poses clés!")
-
-def setup_facial_expressions():
-    \"\"\"Configure les expressions faciales exagérées\"\"\"
-    
-    obj = bpy.context.active_object
-    if not obj or not obj.data.shape_keys:
-        print("Erreur: Objet avec shape keys requis")
-        return
-    
-    # Expressions clés
-    expressions = [
-        {"frame": 30, "joy": 0.8, "surprise": 0.2},
-        {"frame": 60, "joy": 1.0, "energy": 1.0},
-        {"frame": 120, "concentration": 0.9, "focus": 0.8}
-    ]
-    
-    for expr in expressions:
-        frame = expr["frame"]
-        bpy.context.scene.frame_set(frame)
-        
-        for shape_name, value in expr.items():
-            if shape_name != "frame" and shape_name in obj.data.shape_keys.key_blocks:
-                obj.data.shape_keys.key_blocks[shape_name].value = value
-                obj.data.shape_keys.key_blocks[shape_name].keyframe_insert(data_path="value")
-    
-    print("Expressions faciales configurées!")
-
-# Exécution
-if __name__ == "__main__":
-    create_kpop_dance_animation()
-    setup_facial_expressions()
-""",
+            code_python=render_template("character_animation_kpop.py.tmpl", kpop_poses=kpop_poses),
             description="Système d'animation automatique pour personnages K-pop",
             compatibilite="Blender 3.0+ avec Rigify"
-        )
-        scripts.append(animation_script)
+        ))
+        
+        # Scripts 3+: un script de caméra et de lumière par shot, avec les mesures qu'il couvre
+        shot_template = load_template("shot_camera.py.tmpl")
+        music = index["music"]
+        beats = index.beats
+        for position, (shot, start, end) in enumerate(zip(self.shots, starts, ends)):
+            track = music.at(start)
+            bars = [(beats.label(i), beats.frames[i] + 1) for i in index.beats_in("shots", position)
+                    if grid.beat_in_bar[i] == 0]
+            params = self._shot_script_params(shot, start, end, lighting, bars,
+                                              music.labels[track] if track is not None else "")
+            scripts.append(BlenderScript(
+                nom_script=f"shots/shot_{shot.numero:02d}_camera.py",
+                code_python=shot_template.render(params),
+                description=f"Caméra et lumière clé du shot {shot.numero} ({shot.action})",
+                compatibilite="Blender 3.0+"
+            ))
         
         self.blender_scripts = scripts
         return scripts
@@ -440,120 +350,122 @@ if __name__ == "__main__":
             total=total
         )
 
-    def export_pdf_professional(self, config: ExportConfig) -> str:
-        """Export PDF ultra-professionnel"""
+    def export_pdf_professional(self, config: ExportConfig, max_workers: Optional[int] = None,
+                                budget: Optional[BudgetEstimate] = None) -> str:
+        """Export PDF ultra-professionnel
+
+        Chaque section activée dans `config` est un fragment PDF rendu en
+        parallèle et mis en cache dans pdf_reports/.fragments (voir
+        pdf_fragments) : seules les sections modifiées sont refaites.
+        `budget` : estimation déjà calculée (estimate_budget() sinon).
+        """
         
-        if not REPORTLAB_AVAILABLE:
-            return self._export_html_fallback(config)
+        budget = budget or self.estimate_budget()
+        if not _module_available("reportlab"):
+            return self._export_html_fallback(config, budget)
         
-        filename = f"court_metrage_kpop_production_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf"
-        filepath = self.project_path / "pdf_reports" / filename
+        from pdf_fragments import build_pdf
         
-        # Configuration du document
-        doc = SimpleDocTemplate(
-            str(filepath),
-            pagesize=A4,
-            rightMargin=72,
-            leftMargin=72,
-            topMargin=72,
-            bottomMargin=18
-        )
+        filename = f"court_metrage_kpop_production_{self._now().strftime('%Y%m%d_%H%M')}.pdf"
+        filepath = self.project_path / "pdf_reports" / filename
         
-        # Styles
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            spaceAfter=30,
-            textColor=colors.HexColor('#FF69B4'),
-            alignment=1  # Centré
+        sections = self._pdf_sections(config, budget)
+        self.last_pdf_fragments = build_pdf(
+            filepath, sections, self.project_path / "pdf_reports" / ".fragments",
+            invariant=self.generated_at is not None, max_workers=max_workers
         )
+        self.last_export_path = filepath
         
-        content = []
-        
-        # Page de titre
-        content.append(Paragraph("COURT-MÉTRAGE", title_style))
-        content.append(Paragraph("Petite Fille K-pop à Salta", title_style))
-        content.append(Spacer(1, 20))
-        content.append(Paragraph("Dossier de Production Complet", styles['Heading2']))
-        content.append(Paragraph(f"Généré le {datetime.now().strftime('%d/%m/%Y')}", styles['Normal']))
-        content.append(Spacer(1, 50))
-        
-        # Résumé exécutif
-        content.append(Paragraph("RÉSUMÉ EXÉCUTIF", styles['Heading2']))
-        resume = """
-        Court-métrage d'animation 3D de 36 secondes racontant l'histoire touchante d'une petite fille 
-        argentine passionnée de K-pop. Le projet mélange modernité coréenne et authenticité sud-américaine 
-        dans un style visuel Pixar. Budget estimé: 14,000€. Production: 8-12 semaines.
+        return f"PDF professionnel généré: {filepath}"
+
+    def _production_phases(self) -> List[Dict[str, Any]]:
+        """Phases de production_pipeline (config.json) avec leurs semaines de début et de fin"""
+        phases, week = [], 0
+        for phase in self.config.get("production_pipeline", {}).get("phases", []):
+            phases.append({"name": phase["name"], "start_week": week,
+                           "end_week": week + phase["duration_weeks"], "tasks": phase.get("tasks", [])})
+            week += phase["duration_weeks"]
+        return phases
+
+    def _summary(self) -> str:
+        """Résumé exécutif : durée et planning calculés depuis les shots et config.json
+
+        Le budget n'y figure pas : il a sa propre section, et le modifier ne
+        doit pas invalider le fragment titre du PDF.
         """
-        content.append(Paragraph(resume, styles['Normal']))
-        content.append(Spacer(1, 30))
+        duration = math.fsum(self.shots.durees)
+        phases = self._production_phases()
+        weeks = f" Production: {phases[-1]['end_week']} semaines." if phases else ""
+        return (
+            f"Court-métrage d'animation 3D de {duration:g} secondes ({len(self.shots)} shots) racontant "
+            "l'histoire touchante d'une petite fille argentine passionnée de K-pop. Le projet mélange modernité "
+            f"coréenne et authenticité sud-américaine dans un style visuel Pixar.{weeks}"
+        )
+
+    def _pdf_sections(self, config: ExportConfig, budget: BudgetEstimate) -> List[tuple]:
+        """Données de chaque section du dossier PDF : [(section, données JSON-compatibles)]"""
+        sections = [("title", {"generated_on": self._now().strftime('%d/%m/%Y'), "summary": self._summary()})]
         
         # Analyse des shots
         if config.include_shots:
-            content.append(Paragraph("ANALYSE DÉTAILLÉE DES SHOTS", styles['Heading2']))
+            from pdf_fragments import shot_table_sections
+            from script_analyzer_v2 import ScriptAnalyzerV2
             
-            shots_data = [
+            # Un fragment par bloc de lignes : reportlab ne construit jamais tout le tableau
+            analyzer = ScriptAnalyzerV2()
+            sections.extend(shot_table_sections(
                 ['Shot', 'Durée', 'Description', 'Intensité', 'Plans suggérés'],
-                ['1', '8s', 'Préparation danse', '6/10', '3 plans'],
-                ['2', '12s', 'Explosion joie', '9/10', '4 plans'],
-                ['3', '10s', 'Concentration', '8/10', '3 plans'],
-                ['4', '6s', 'Interruption', '5/10', '3 plans'],
-            ]
-            
-            shots_table = Table(shots_data)
-            shots_table.setStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#FF69B4')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ])
-            content.append(shots_table)
-            content.append(Spacer(1, 20))
+                [
+                    [str(shot.numero), f"{shot.duree_estimee:g}s", shot.description,
+                     f"{shot.intensite_emotionnelle}/10", f"{len(analyzer.suggerer_plans_avances(shot))} plans"]
+                    for shot in self.shots
+                ]
+            ))
+        
+        if config.include_concept_art:
+            sections.append(("concept_art", {"concepts": [
+                {"titre": prompt.titre, "style": prompt.style_artistique, "prompt": prompt.prompt_detaille}
+                for prompt in self.generate_ai_image_prompts()
+            ]}))
+        
+        if config.include_music:
+            tracks, start = [], 0
+            for track in self.config.get("music_sync", {}).get("secondary_tracks", []):
+                tracks.append({"name": track["name"], "bpm": track["bpm"], "start": start, "duration": track["duration"]})
+                start += track["duration"]
+            sections.append(("music", {"tracks": tracks}))
+        
+        if config.include_planning:
+            sections.append(("planning", {"phases": self._production_phases()}))
         
         # Budget
         if config.include_budget:
-            budget = self.estimate_budget()
-            content.append(Paragraph("ESTIMATION BUDGÉTAIRE", styles['Heading2']))
-            
-            budget_data = [
-                ['Poste', 'Montant (€)'],
-                ['Pré-production', f'{budget.pre_production:.0f}'],
-                ['Production', f'{budget.production:.0f}'],
-                ['Post-production', f'{budget.post_production:.0f}'],
-                ['Matériel', f'{budget.materiel:.0f}'],
-                ['Logiciels', f'{budget.logiciels:.0f}'],
-                ['TOTAL', f'{budget.total:.0f}'],
-            ]
-            
-            budget_table = Table(budget_data)
-            budget_table.setStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#00FFFF')),
-                ('BACKGROUND', (-1, -1), (-1, -1), colors.HexColor('#FFD700')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTNAME', (-1, -1), (-1, -1), 'Helvetica-Bold'),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ])
-            content.append(budget_table)
-        
-        # Construction du PDF
-        doc.build(content)
+            sections.append(("budget", asdict(budget)))
         
-        return f"PDF professionnel généré: {filepath}"
+        return sections
 
-    def _export_html_fallback(self, config: ExportConfig) -> str:
+    def _export_html_fallback(self, config: ExportConfig, budget: Optional[BudgetEstimate] = None) -> str:
         """Export HTML si ReportLab non disponible"""
         
-        filename = f"court_metrage_kpop_report_{datetime.now().strftime('%Y%m%d_%H%M')}.html"
+        from html import escape
+        
+        filename = f"court_metrage_kpop_report_{self._now().strftime('%Y%m%d_%H%M')}.html"
         filepath = self.project_path / "pdf_reports" / filename
         
+        budget = budget or self.estimate_budget()
+        shots_html = ""
+        if config.include_shots:
+            shots_html = "<h2>Analyse des Shots</h2>\n" + "\n".join(
+                f'            <div class="shot"><strong>Shot {shot.numero}</strong> '
+                f'({shot.duree_estimee:g}s, intensité {shot.intensite_emotionnelle}/10) : {escape(shot.description)}</div>'
+                for shot in self.shots
+            )
+        planning_html = "\n".join(
+            f"                <li><strong>Semaines {phase['start_week'] + 1}-{phase['end_week']}:</strong> "
+            f"{escape(phase['name'])} ({escape(', '.join(phase['tasks']))})</li>"
+            for phase in self._production_phases()
+        )
+        
         html_content = f"""
         <!DOCTYPE html>
         <html>
@@ -570,31 +482,28 @@ if __name__ == "__main__":
         <body>
             <h1>Court-Métrage: Petite Fille K-pop à Salta</h1>
             <h2>Rapport de Production Complet</h2>
-            <p><strong>Généré le:</strong> {datetime.now().strftime('%d/%m/%Y à %H:%M')}</p>
+            <p><strong>Généré le:</strong> {self._now().strftime('%d/%m/%Y à %H:%M')}</p>
             
             <h2>Résumé Exécutif</h2>
-            <p>Court-métrage d'animation 3D innovant mélangeant culture K-pop et authenticité argentine. 
-            Durée: 36 secondes. Style: Animation 3D moderne type Pixar.</p>
+            <p>{escape(self._summary())}</p>
+            
+            {shots_html}
             
             <div class="budget">
                 <h2>Estimation Budgétaire</h2>
-                <p><strong>Budget total estimé: 14,000€</strong></p>
+                <p><strong>Budget total estimé: {budget.total:,.0f}€</strong></p>
                 <ul>
-                    <li>Pré-production: 2,500€</li>
-                    <li>Production: 8,000€</li>
-                    <li>Post-production: 1,500€</li>
-                    <li>Matériel: 1,200€</li>
-                    <li>Logiciels: 800€</li>
+                    <li>Pré-production: {budget.pre_production:,.0f}€</li>
+                    <li>Production: {budget.production:,.0f}€</li>
+                    <li>Post-production: {budget.post_production:,.0f}€</li>
+                    <li>Matériel: {budget.materiel:,.0f}€</li>
+                    <li>Logiciels: {budget.logiciels:,.0f}€</li>
                 </ul>
             </div>
             
             <h2>Planning de Production</h2>
-            <p><strong>Durée totale estimée:</strong> 8-12 semaines</p>
             <ul>
-                <li><strong>Semaines 1-2:</strong> Pré-production (concept art, storyboard)</li>
-                <li><strong>Semaines 3-8:</strong> Production 3D (modélisation, animation, rendu)</li>
-                <li><strong>Semaines 9-10:</strong> Post-production (montage, audio)</li>
-                <li><strong>Semaines 11-12:</strong> Finalisation et livraison</li>
+{planning_html}
             </ul>
         </body>
         </html>
@@ -602,99 +511,77 @@ if __name__ == "__main__":
         
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(html_content)
+        self.last_export_path = filepath
         
         return f"Rapport HTML généré: {filepath}"
 
-    def generate_music_sync_files(self) -> Dict[str, str]:
-        """Génère les fichiers de synchronisation musicale"""
+    def generate_music_sync_files(self, store_path: Optional[Path] = None) -> Dict[str, str]:
+        """Génère les fichiers de synchronisation musicale
+
+        Clips vidéo issus des shots, clips audio et marqueurs de beats issus
+        de la grille calculée depuis config.json (music_sync). La timeline
+        Premiere est écrite en flux, clips placés via l'index de timeline.
+        La timeline Resolve est lue dans la base du projet (`store_path`,
+        construite par build_project_store si absente) : chaque clip vidéo
+        porte sa piste et les beats qu'il couvre, lus par l'index SQLite des
+        frames.
+        """
+        from music_sync import BeatGrid, write_premiere_xml
+        from project_store import ProjectStore
+        from timeline_index import IntervalLayer
         
         sync_files = {}
+        grid = BeatGrid.from_config(self.config)
+        framerate = grid.framerate
         
         # Timeline XML pour Premiere Pro
-        premiere_xml = """<?xml version="1.0" encoding="UTF-8"?>
-<xmeml version="5">
-    <sequence>
-        <name>Kpop_Salta_Timeline</name>
-        <duration>1080</duration>
-        <rate>
-            <timebase>24</timebase>
-        </rate>
-        <media>
-            <video>
-                <track>
-                    <clipitem>
-                        <name>Shot_01_Preparation</name>
-                        <start>0</start>
-                        <end>192</end>
-                        <file>
-                            <name>Shot_01.mov</name>
-                            <duration>192</duration>
-                        </file>
-                    </clipitem>
-                    <clipitem>
-                        <name>Shot_02_Dance</name>
-                        <start>192</start>
-                        <end>480</end>
-                        <file>
-                            <name>Shot_02.mov</name>
-                            <duration>288</duration>
-                        </file>
-                    </clipitem>
-                </track>
-            </video>
-            <audio>
-                <track>
-                    <clipitem>
-                        <name>Kpop_Track</name>
-                        <start>192</start>
-                        <end>480</end>
-                        <file>
-                            <name>kpop_song.wav</name>
-                            <duration>288</duration>
-                        </file>
-                    </clipitem>
-                </track>
-            </audio>
-        </media>
-        <marker>
-            <name>Beat_1</name>
-            <in>192</in>
-            <out>192</out>
-        </marker>
-        <marker>
-            <name>Beat_2</name>
-            <in>216</in>
-            <out>216</out>
-        </marker>
-    </sequence>
-</xmeml>"""
-        
         premiere_file = self.project_path / "music_sync" / "premiere_timeline.xml"
         with open(premiere_file, 'w', encoding='utf-8') as f:
-            f.write(premiere_xml)
+            write_premiere_xml(f, self.shots, grid, index=self.build_timeline_index(grid))
         sync_files["Premiere Pro"] = str(premiere_file)
         
-        # JSON pour DaVinci Resolve
+        # JSON pour DaVinci Resolve, depuis la base du projet
+        if store_path is None:
+            self.build_project_store()
+            store_path = self.last_project_store
+        with ProjectStore(store_path, read_only=True) as store:
+            tracks = list(store.iter_music_tracks())
+            music = IntervalLayer("music", [track[3] for track in tracks], [track[4] for track in tracks],
+                                  [track[1] for track in tracks])
+            video_clips = []
+            debut, start = 0.0, 0
+            for shot in store.iter_shots():
+                # Bornes arrondies depuis le temps cumulé, comme music_sync.shot_frame_ranges
+                debut += shot.duree_estimee
+                end = math.floor(debut * framerate + 0.5)
+                track = music.at(start)
+                video_clips.append({
+                    "name": f"Shot_{shot.numero:02d}",
+                    "start_frame": start,
+                    "end_frame": end,
+                    "media_type": "video",
+                    "music_track": music.labels[track] if track is not None else None,
+                    "beat_markers": [frame for frame, _, _ in store.iter_beat_markers(start, end)]
+                })
+                start = end
+            audio_clips = [
+                {
+                    "name": name,
+                    "start_frame": start_frame,
+                    "end_frame": end_frame,
+                    "media_type": "audio",
+                    "tempo": bpm,
+                    "frames_per_beat": frames_per_beat,
+                    "beat_markers": [frame for frame, _, _ in store.iter_beat_markers(track_index=index)],
+                    "bar_markers": [frame for frame, _, _ in store.iter_beat_markers(track_index=index, bars_only=True)]
+                }
+                for index, name, bpm, start_frame, end_frame, frames_per_beat in tracks
+            ]
         resolve_json = {
             "timeline": {
                 "name": "Kpop_Salta_Master",
-                "framerate": 24,
-                "clips": [
-                    {
-                        "name": "Shot_01",
-                        "start_frame": 0,
-                        "end_frame": 192,
-                        "media_type": "video"
-                    },
-                    {
-                        "name": "Kpop_Audio",
-                        "start_frame": 192,
-                        "end_frame": 480,
-                        "media_type": "audio",
-                        "tempo": 128,
-                        "beat_markers": [192, 216, 240, 264, 288]
-                    }
-                ]
+                "framerate": framerate,
+                "clips": video_clips + audio_clips
             }
         }
         
@@ -705,13 +592,154 @@ if __name__ == "__main__":
         
         return sync_files
 
-    def save_all_scripts(self):
+    def plan_render_farm(self, workers: Optional[int] = None, max_frames: Optional[int] = None):
+        """Plan de rendu des shots pour `workers` processus locaux, écrit dans exports/render_manifest.json
+
+        Exécution : python render_farm.py exports/render_manifest.json
+        """
+        from render_farm import DEFAULT_MAX_FRAMES, plan_render
+        
+        render_config = self.config.get("blender_integration", {}).get("render_farm", {})
+        plan = plan_render(
+            self.shots, self.config,
+            workers=workers or render_config.get("workers"),
+            max_frames=max_frames or render_config.get("max_frames_per_range", DEFAULT_MAX_FRAMES)
+        )
+        self.last_render_manifest = plan.write_manifest(self.project_path / "exports" / "render_manifest.json")
+        return plan
+
+    def check_continuity(self, threshold: Optional[float] = None) -> Dict[str, Any]:
+        """Continuité couleur du montage, écrite dans exports/continuity.json
+
+        Chaque shot reçoit un look (palette du mood board V1, template de
+        concept art V2, lumière clé de color_palette.lighting_colors) ; les
+        raccords d'un même lieu trop éloignés en ΔE2000 sont signalés.
+        """
+        from continuity import CONTINUITY_THRESHOLD, build_looks, check_continuity
+        from script_analyzer import ScriptAnalyzer
+        from script_analyzer_v2 import ScriptAnalyzerV2
+        
+        if threshold is None:
+            threshold = self.config.get("continuity", {}).get("threshold", CONTINUITY_THRESHOLD)
+        lighting_colors = {**LIGHTING_COLORS, **self.config.get("color_palette", {}).get("lighting_colors", {})}
+        looks = build_looks(ScriptAnalyzer().mood_database, ScriptAnalyzerV2().concept_art_templates, lighting_colors)
+        report = check_continuity(self.shots, looks, threshold)
+        
+        result = {
+            "threshold": threshold,
+            "transitions": len(report.delta_e),
+            "looks": [asdict(look) for look in report.looks],
+            "shot_looks": {str(numero): report.looks[look].name
+                           for numero, look in zip(self.shots.numeros, report.shot_looks.tolist())},
+            "flagged": report.flagged,
+        }
+        self.last_continuity_report = self.project_path / "exports" / "continuity.json"
+        self.last_continuity_report.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.last_continuity_report, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        return result
+
+    def analyze_pacing(self, window: Optional[int] = None) -> Dict[str, Any]:
+        """Rythme du montage (pacing.analyse_pacing) face à la grille de beats, écrit dans exports/pacing.json"""
+        from music_sync import BeatGrid
+        from pacing import ROLLING_WINDOW, analyse_pacing
+        
+        grid = BeatGrid.from_config(self.config)
+        report = analyse_pacing(self.shots, grid, grid.framerate, window or ROLLING_WINDOW)
+        self.last_pacing_report = self.project_path / "exports" / "pacing.json"
+        self.last_pacing_report.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.last_pacing_report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        return report
+
+    def build_timeline_index(self, grid=None):
+        """Index des shots, pistes et beats en frames (timeline_index.TimelineIndex)
+
+        `grid` : grille de beats, calculée depuis config.json si absente.
+        """
+        from music_sync import BeatGrid
+        from timeline_index import TimelineIndex
+        
+        grid = grid or BeatGrid.from_config(self.config)
+        return TimelineIndex.from_project(self.shots, grid)
+
+    def build_project_store(self, path: Optional[Path] = None) -> Dict[str, int]:
+        """Enregistre l'état du projet dans la base SQLite exports/project.sqlite
+
+        Shots, suggestions de plans V2, prompts IA, marqueurs de beats et
+        lignes de budget ; les exporteurs peuvent ensuite la parcourir en flux
+        (voir project_store.ProjectStore).
+        """
+        from music_sync import BeatGrid
+        from project_store import ProjectStore
+        from script_analyzer_v2 import ScriptAnalyzerV2
+        
+        analyzer = ScriptAnalyzerV2()
+        path = path or self.project_path / "exports" / "project.sqlite"
+        with ProjectStore(path) as store:
+            store.save_shots(self.shots)
+            store.save_plans(analyzer.suggerer_plans_avances(shot) for shot in self.shots)
+            store.save_prompts(self.generate_ai_image_prompts())
+            store.save_beat_grid(BeatGrid.from_config(self.config))
+            store.save_budget(asdict(self.estimate_budget()))
+            counts = {
+                "shots": store.count_shots(),
+                "plans": store.connection.execute("SELECT COUNT(*) FROM plan_suggestions").fetchone()[0],
+                "beat_markers": store.connection.execute("SELECT COUNT(*) FROM beat_markers").fetchone()[0],
+            }
+        self.last_project_store = Path(path)
+        return counts
+
+    @staticmethod
+    def _shot_script_params(shot, start: int, end: int, lighting: Dict[str, tuple],
+                            bar_markers: Sequence[tuple] = (), music_track: str = "") -> Dict[str, Any]:
+        """Paramètres du template shot_camera : cadrage et lumière selon l'intensité du shot
+
+        `bar_markers` : (nom, frame Blender) des premiers temps de mesure
+        pendant le shot ; `music_track` : piste qui joue à son début.
+
+        Intensité 1 → plan large à 7.5 m (35 mm), 10 → gros plan à 3 m (85 mm).
+        Lumière clé : neon_pink au-delà de 8, neon_cyan dès 5, golden_hour sinon.
+        """
+        intensity = min(max(shot.intensite_emotionnelle, 1), 10)
+        distance = round(8.0 - intensity / 2, 2)
+        if intensity >= 8:
+            light_name, lens = "neon_pink", 85
+        elif intensity >= 5:
+            light_name, lens = "neon_cyan", 50
+        else:
+            light_name, lens = "golden_hour", 35
+        return {
+            "numero": shot.numero,
+            "numero_padded": f"{shot.numero:02d}",
+            "description": shot.description,
+            "action": shot.action,
+            "emotion": shot.emotion,
+            "intensite": shot.intensite_emotionnelle,
+            "frame_start": start + 1,
+            "frame_end": max(end, start + 1),
+            "camera_location": (0.0, -distance, 1.6),
+            "camera_rotation": (1.45, 0.0, 0.0),
+            "lens": lens,
+            "light_location": (2.0, -distance / 2, 3.0),
+            "light_energy": 20 + 5 * intensity,
+            "light_color": lighting[light_name],
+            "light_color_name": light_name,
+            "music_track": json.dumps(music_track, ensure_ascii=False),
+            "bar_markers": repr([(name, frame) for name, frame in bar_markers]),
+        }
+
+    def save_all_scripts(self) -> List[Path]:
         """Sauvegarde tous les scripts Blender générés"""
         
+        from blender_templates import write_if_changed
+        
+        # Les scripts dont le contenu n'a pas changé ne sont pas réécrits
+        written = []
         for script in self.blender_scripts:
             script_path = self.project_path / "blender_scripts" / script.nom_script
-            with open(script_path, 'w', encoding='utf-8') as f:
-                f.write(script.code_python)
+            if write_if_changed(script_path, script.code_python):
+                written.append(script_path)
         
         # Fichier README pour les scripts
         readme_content = """# Scripts Blender - Court-Métrage K-pop Salta
@@ -723,7 +751,8 @@ if __name__ == "__main__":
 
 ## Scripts disponibles:
 - `camera_movements_kpop.py`: Configuration automatique des caméras
-- `character_animation_kpop.py`: Animation de base pour personnages
+- `character_animation_kpop.py`: Animation de base pour personnages (une pose clé par shot)
+- `shots/shot_XX_camera.py`: Caméra, plage de frames et lumière clé de chaque shot
 
 ## Notes:
 - Compatible Blender 3.0+
@@ -732,44 +761,314 @@ if __name__ == "__main__":
 """
         
         readme_path = self.project_path / "blender_scripts" / "README.md"
-        with open(readme_path, 'w', encoding='utf-8') as f:
-            f.write(readme_content)
+        if write_if_changed(readme_path, readme_content):
+            written.append(readme_path)
+        return written
 
-    def generate_complete_project(self) -> Dict[str, Any]:
-        """Génère le projet complet avec tous les outils"""
+    def _fingerprint(self, *inputs) -> str:
+        """Empreinte SHA-256 des entrées d'un artefact
+
+        Les méthodes génératrices sont hachées par leur code source, qui
+        contient les templates (scripts Blender, XML, HTML...).
+        """
+        import inspect
+        
+        hasher = hashlib.sha256()
+        for item in inputs:
+            if callable(item):
+                try:
+                    item = inspect.getsource(item)
+                except (OSError, TypeError):
+                    item = getattr(item, '__qualname__', repr(item))
+            hasher.update(json.dumps(item, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8'))
+            hasher.update(b'\0')
+        return hasher.hexdigest()
+
+    def _load_build_manifest(self) -> Dict[str, Any]:
+        """Charge le manifeste de build incrémental (empreintes des artefacts)"""
+        manifest_file = self.project_path / BUILD_MANIFEST
+        if manifest_file.exists():
+            try:
+                with open(manifest_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                pass
+        return {}
+
+    def _save_build_manifest(self, manifest: Dict[str, Any]):
+        """Sauvegarde atomique du manifeste de build"""
+        manifest_file = self.project_path / BUILD_MANIFEST
+        tmp_file = manifest_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_file, manifest_file)
+
+    def _relative(self, path) -> str:
+        """Chemin d'artefact relatif au projet, pour le manifeste"""
+        return str(Path(path).relative_to(self.project_path))
+
+    def _build_ai_prompts(self, project_store: Dict[str, Any]):
+        """Artefact prompts IA : image_prompts.json, écrit en flux depuis la base du projet"""
+        from project_store import ProjectStore
+        
+        prompts_file = self.project_path / "ai_generated" / "image_prompts.json"
+        count = 0
+        with ProjectStore(self.project_path / project_store["path"], read_only=True) as store, \
+                open(prompts_file, 'w', encoding='utf-8') as f:
+            # Même mise en forme que json.dump(liste, indent=2), un prompt à la fois
+            for prompt in store.iter_prompts():
+                f.write(",\n  " if count else "[\n  ")
+                f.write(json.dumps(prompt, indent=2, ensure_ascii=False).replace("\n", "\n  "))
+                count += 1
+            f.write("\n]" if count else "[]")
+        return count, [self._relative(prompts_file)]
+
+    def _build_blender_scripts(self):
+        """Artefact scripts Blender + README"""
+        blender_scripts = self.generate_blender_scripts()
+        self.save_all_scripts()
+        outputs = [f"blender_scripts/{script.nom_script}" for script in blender_scripts]
+        outputs.append("blender_scripts/README.md")
+        return len(blender_scripts), outputs
+
+    def _build_music_sync(self, project_store: Dict[str, Any]):
+        """Artefact fichiers de synchronisation musicale, timeline Resolve lue dans la base du projet"""
+        sync_files = self.generate_music_sync_files(self.project_path / project_store["path"])
+        return list(sync_files.keys()), [self._relative(path) for path in sync_files.values()]
+
+    def _build_render_plan(self):
+        """Artefact manifeste de rendu"""
+        plan = self.plan_render_farm()
+        return round(plan.makespan, 2), [self._relative(self.last_render_manifest)]
+
+    def _build_continuity(self):
+        """Artefact rapport de continuité couleur"""
+        result = self.check_continuity()
+        return len(result["flagged"]), [self._relative(self.last_continuity_report)]
+
+    def _build_pacing(self):
+        """Artefact rapport de rythme"""
+        report = self.analyze_pacing()
+        return {"mean_shot_length": report["mean_shot_length"], "anomalies": len(report["anomalies"])}, \
+            [self._relative(self.last_pacing_report)]
+
+    def _build_project_store(self):
+        """Artefact base SQLite du projet : effectifs et chemin relatif, lu par les exports en aval"""
+        counts = self.build_project_store()
+        path = self._relative(self.last_project_store)
+        return {**counts, "path": path}, [path]
+
+    def _build_budget(self):
+        """Artefact budget (sans fichier) : postes et total, repris par le dossier PDF"""
+        return asdict(self.estimate_budget()), []
+
+    def _build_pdf(self, export_config: ExportConfig, estimated_budget: Dict[str, float]):
+        """Artefact dossier PDF (ou HTML de repli), avec le budget de l'étape estimated_budget"""
+        pdf_result = self.export_pdf_professional(export_config, budget=BudgetEstimate(**estimated_budget))
+        return pdf_result, [self._relative(self.last_export_path)]
+
+    def _project_stages(self, export_config: ExportConfig) -> Dict[str, tuple]:
+        """Graphe des artefacts : nom → (entrées hachées, fonction de build, dépendances)
+
+        Les fonctions de build sont non liées (appelées sur une copie de
+        l'analyzer, voir _run_stage) et reçoivent les résultats de leurs
+        dépendances en arguments nommés ; elles retournent (résultat,
+        fichiers produits).
+        """
+        from blender_templates import template_sources
+        
+        cls = type(self)
+        config = self.config
+        shots_data = self.shots.to_dicts()
+        return {
+            "ai_prompts": (
+                (config.get("ai_settings"), self.generate_ai_image_prompts, self._build_ai_prompts,
+                 _module_source("project_store")),
+                cls._build_ai_prompts,
+                ("project_store",)
+            ),
+            "blender_scripts": (
+                (config.get("blender_integration"), config.get("export_settings", {}).get("blender_scripts"),
+                 config.get("color_palette"), config.get("technical_specs"), config.get("music_sync"),
+                 config.get("project_config"), shots_data,
+                 self.generate_blender_scripts, self._shot_script_params, self.save_all_scripts,
+                 self.build_timeline_index, _module_source("camera_paths"), _module_source("blender_templates"),
+                 _module_source("music_sync"), _module_source("timeline_index"), template_sources()),
+                cls._build_blender_scripts,
+                ()
+            ),
+            "music_sync_files": (
+                (config.get("music_sync"), config.get("technical_specs"), config.get("project_config"),
+                 self.generate_music_sync_files, self.build_timeline_index, self._build_music_sync,
+                 _module_source("music_sync"), _module_source("timeline_index"), _module_source("project_store"),
+                 shots_data),
+                cls._build_music_sync,
+                ("project_store",)
+            ),
+            "render_plan": (
+                (config.get("technical_specs"), config.get("project_config", {}).get("target_resolution"),
+                 config.get("blender_integration"), shots_data, os.cpu_count(), self.plan_render_farm,
+                 _module_source("render_farm")),
+                cls._build_render_plan,
+                ()
+            ),
+            "continuity": (
+                (config.get("continuity"), config.get("color_palette"), shots_data, self.check_continuity,
+                 _module_source("continuity"), _module_source("palette_engine"),
+                 _module_source("script_analyzer"), _module_source("script_analyzer_v2")),
+                cls._build_continuity,
+                ()
+            ),
+            "pacing": (
+                (config.get("music_sync"), config.get("technical_specs"), config.get("project_config"), shots_data,
+                 self.analyze_pacing, _module_source("pacing"), _module_source("music_sync")),
+                cls._build_pacing,
+                ()
+            ),
+            "project_store": (
+                (config.get("ai_settings"), config.get("music_sync"), config.get("technical_specs"),
+                 config.get("budget_estimates"), shots_data, _module_source("plan_rules"),
+                 self.generate_ai_image_prompts, self.estimate_budget, self.build_project_store,
+                 self._build_project_store, _module_source("project_store"), _module_source("music_sync")),
+                cls._build_project_store,
+                ()
+            ),
+            "estimated_budget": (
+                (config.get("budget_estimates"), self.estimate_budget, self._build_budget),
+                cls._build_budget,
+                ()
+            ),
+            "pdf_export": (
+                (asdict(export_config), config.get("export_settings", {}).get("pdf_reports"),
+                 config.get("budget_estimates"), config.get("music_sync"), config.get("production_pipeline"),
+                 shots_data, _module_source("plan_rules"),
+                 _module_available("reportlab"), _module_available("pypdf"), self.estimate_budget,
+                 self.generate_ai_image_prompts, self.export_pdf_professional, self._pdf_sections,
+                 self._export_html_fallback, _module_source("pdf_fragments")),
+                partial(cls._build_pdf, export_config=export_config),
+                ("estimated_budget",)
+            ),
+        }
+
+    def _run_stage(self, build: Callable, dependencies: Dict[str, Any]):
+        """Exécute une étape sur une copie de l'analyzer et la chronomètre
+
+        L'étape n'écrit que dans sa copie (thread ou processus) : les
+        attributs qu'elle a réassignés sont renvoyés dans `state` et fusionnés
+        par _run_stage_graph.
+        """
+        worker = copy.copy(self)
+        before = dict(vars(worker))
+        start = time.perf_counter()
+        result, outputs = build(worker, **dependencies)
+        elapsed = time.perf_counter() - start
+        state = {name: value for name, value in vars(worker).items() if before.get(name, _MISSING) is not value}
+        return result, outputs, elapsed, state
+
+    def _run_stage_graph(self, names: List[str], stages: Dict[str, tuple], known: Dict[str, Any],
+                         max_workers: Optional[int] = None, executor: str = "thread") -> Dict[str, tuple]:
+        """Ordonnance les étapes selon leurs dépendances sur un pool de workers
+
+        Une étape est soumise dès que toutes ses dépendances à exécuter sont
+        terminées ; elle reçoit leurs résultats, ou ceux de `known` pour les
+        dépendances non reconstruites. `executor` vaut "thread" ou "process".
+        """
+        from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+        
+        pending = {name: set(stages[name][2]) & set(names) for name in names}
+        results = dict(known)
+        outcomes = {}
+        
+        pool_class = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+        with pool_class(max_workers=max_workers) as pool:
+            running = {}
+            while pending or running:
+                for name in [n for n, deps in pending.items() if not deps]:
+                    del pending[name]
+                    _, build, deps = stages[name]
+                    dependencies = {dep: results[dep] for dep in deps}
+                    running[pool.submit(self._run_stage, build, dependencies)] = name
+                
+                if not running:
+                    raise ValueError(f"Dépendances cycliques entre étapes: {sorted(pending)}")
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    result, outputs, elapsed, state = future.result()
+                    # Fusion dans le thread principal, dans l'ordre de fin des étapes
+                    vars(self).update(state)
+                    results[name] = result
+                    outcomes[name] = (result, outputs, elapsed)
+                    for deps in pending.values():
+                        deps.discard(name)
+        
+        return outcomes
+
+    def generate_complete_project(self, incremental: bool = False, max_workers: Optional[int] = None,
+                                  executor: str = "thread", stages: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Génère le projet complet avec tous les outils
+
+        Les étapes indépendantes s'exécutent en parallèle (`max_workers`
+        workers, pool de threads ou de processus) ; leurs durées sont
+        rapportées dans results["timings"]. En mode incrémental, un artefact
+        dont l'empreinte des entrées n'a pas changé depuis le dernier build (et
+        dont les fichiers existent) n'est pas régénéré. `stages` restreint
+        la génération à certaines étapes (ex. ["pdf_export"]), plus leurs
+        dépendances.
+        """
         
         results = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": self._now().isoformat(),
             "project_name": "Court-Métrage K-pop Salta",
             "version": "3.0"
         }
         
-        # Génération des prompts IA
-        ai_prompts = self.generate_ai_image_prompts()
-        results["ai_prompts"] = len(ai_prompts)
+        start = time.perf_counter()
+        export_config = ExportConfig()
+        manifest = self._load_build_manifest()
+        digests = {}
+        to_build, skipped = [], []
+        timings = {}
         
-        # Scripts Blender
-        blender_scripts = self.generate_blender_scripts()
-        self.save_all_scripts()
-        results["blender_scripts"] = len(blender_scripts)
+        stage_table = self._project_stages(export_config)
+        selected = set(stage_table)
+        if stages is not None:
+            selected, todo = set(), list(stages)
+            while todo:
+                name = todo.pop()
+                if name not in selected:
+                    selected.add(name)
+                    todo.extend(stage_table[name][2])
         
-        # Synchronisation musicale
-        sync_files = self.generate_music_sync_files()
-        results["music_sync_files"] = list(sync_files.keys())
+        for name, (inputs, _, _) in stage_table.items():
+            if name not in selected:
+                continue
+            digests[name] = self._fingerprint(*inputs)
+            entry = manifest.get(name)
+            
+            if (incremental and entry and entry.get("hash") == digests[name]
+                    and all((self.project_path / output).exists() for output in entry["outputs"])):
+                results[name] = entry["result"]
+                timings[name] = 0.0
+                skipped.append(name)
+            else:
+                to_build.append(name)
         
-        # Estimation budgétaire
-        budget = self.estimate_budget()
-        results["estimated_budget"] = budget.total
+        known = {name: results[name] for name in skipped}
+        outcomes = self._run_stage_graph(to_build, stage_table, known, max_workers, executor)
         
-        # Export PDF
-        export_config = ExportConfig()
-        pdf_result = self.export_pdf_professional(export_config)
-        results["pdf_export"] = pdf_result
+        for name in to_build:
+            result, outputs, elapsed = outcomes[name]
+            manifest[name] = {"hash": digests[name], "outputs": outputs, "result": result}
+            results[name] = result
+            timings[name] = elapsed
         
-        # Sauvegarde des prompts IA
-        prompts_file = self.project_path / "ai_generated" / "image_prompts.json"
-        with open(prompts_file, 'w', encoding='utf-8') as f:
-            json.dump([asdict(prompt) for prompt in ai_prompts], f, indent=2, ensure_ascii=False)
+        self._save_build_manifest(manifest)
+        timings["total"] = time.perf_counter() - start
+        results["rebuilt"] = to_build
+        results["skipped"] = skipped
+        results["timings"] = timings
         
         return results
 
@@ -803,10 +1102,13 @@ def main():
         elif choix == "2":
             print("\n🎮 Création des scripts Blender...")
             scripts = analyzer.generate_blender_scripts()
-            analyzer.save_all_scripts()
-            print(f"✅ {len(scripts)} scripts créés!")
+            written = analyzer.save_all_scripts()
+            print(f"✅ {len(scripts)} scripts générés ({len(written)} fichiers mis à jour)!")
             for script in scripts:
                 print(f"   • {script.nom_script}")
+            for camera, stats in analyzer.camera_compression.items():
+                print(f"   🎥 {camera}: {stats['original_keyframes']} → {stats['kept_keyframes']} keyframes "
+                      f"(x{stats['compression_ratio']:.1f})")
         
         elif choix == "3":
             print("\n📄 Export PDF professionnel...")
@@ -836,14 +1138,17 @@ def main():
             print("\n🚀 Génération complète du projet...")
             print("⏳ Ceci peut prendre quelques minutes...")
             
-            results = analyzer.generate_complete_project()
+            results = analyzer.generate_complete_project(incremental=True)
             
             print("✅ PROJET COMPLET GÉNÉRÉ!")
             print(f"   • Prompts IA: {results['ai_prompts']}")
             print(f"   • Scripts Blender: {results['blender_scripts']}")
             print(f"   • Sync musicale: {len(results['music_sync_files'])}")
-            print(f"   • Budget estimé: {results['estimated_budget']:.0f}€")
+            print(f"   • Budget estimé: {results['estimated_budget']['total']:.0f}€")
+            print(f"   • Rendu estimé: {results['render_plan'] / 3600:.1f} h (exports/render_manifest.json)")
             print(f"   • Export PDF: ✅")
+            print(f"   • Reconstruits: {', '.join(results['rebuilt']) or 'aucun'}")
+            print(f"   • Inchangés: {', '.join(results['skipped']) or 'aucun'}")
             print(f"\n🎯 Votre court-métrage est prêt pour la production!")
         
         elif choix == "7":
@@ -854,4 +1159,9 @@ def main():
             print("❌ Choix invalide. Veuillez choisir entre 1 et 7.")
 
 if __name__ == "__main__":
+    # Arguments en ligne de commande : mode lot non interactif
+    if len(sys.argv) > 1:
+        from script_analyzer_cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+    
     main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Parseur de Script - Court-Métrage K-pop Salta
+Lecture en flux des scripts de tournage au format :
+
+    SHOT 1: Petite fille seule dans sa chambre, se préparant à danser
+    Personnages: Petite fille
+    Action: preparation_danse
+    Émotion: anticipation_joyeuse
+    Lieu: chambre_salta
+    Durée: 8s
+    Intensité: 6/10
+
+Seule la ligne `SHOT n:` est obligatoire ; les autres champs sont optionnels
+et complétés par chaque analyzer. Les lignes libres qui suivent l'en-tête
+prolongent la description.
+"""
+
+import io
+import os
+import re
+from typing import Dict, Iterable, Iterator, Optional, Union
+
+# Une seule expression par ligne : en-tête de shot, champ "Clé: valeur" ou texte libre
+LIGNE_RE = re.compile(
+    r"^\s*(?:"
+    r"SHOT\s+(?P<numero>\d+)\s*[:.\-]\s*(?P<description>.*?)"
+    r"|(?P<cle>personnages?|action|[ée]motion|lieu|dur[ée]e|intensit[ée])\s*:\s*(?P<valeur>.*?)"
+    r"|(?P<texte>\S.*?)"
+    r")\s*$",
+    re.IGNORECASE
+)
+
+NOMBRE_RE = re.compile(r"\d+(?:[.,]\d+)?")
+
+# Normalisation des clés reconnues vers les noms de champs des dataclasses Shot
+CLES_CHAMPS = {
+    'personnage': 'personnages',
+    'personnages': 'personnages',
+    'action': 'action',
+    'emotion': 'emotion',
+    'émotion': 'emotion',
+    'lieu': 'lieu',
+    'duree': 'duree_estimee',
+    'durée': 'duree_estimee',
+    'intensite': 'intensite_emotionnelle',
+    'intensité': 'intensite_emotionnelle',
+}
+
+SourceScript = Union[str, os.PathLike, Iterable[str]]
+
+
+def iter_lignes(source: SourceScript) -> Iterator[str]:
+    """Itère sur les lignes d'un script (chemin de fichier, texte brut ou objet fichier)"""
+    if isinstance(source, os.PathLike) or (
+        isinstance(source, str) and '\n' not in source and os.path.isfile(source)
+    ):
+        with open(source, 'r', encoding='utf-8') as f:
+            yield from f
+    elif isinstance(source, str):
+        yield from io.StringIO(source)
+    else:
+        yield from source
+
+
+def _convertir_valeur(champ: str, valeur: str):
+    """Convertit la valeur brute d'un champ vers son type Python"""
+    if champ == 'personnages':
+        return [p.strip() for p in valeur.split(',') if p.strip()]
+    if champ in ('duree_estimee', 'intensite_emotionnelle'):
+        nombre = NOMBRE_RE.search(valeur)
+        if not nombre:
+            return None
+        nombre = float(nombre.group().replace(',', '.'))
+        return int(nombre) if champ == 'intensite_emotionnelle' else nombre
+    return valeur
+
+
+def iter_blocs_shots(source: SourceScript) -> Iterator[Dict]:
+    """Générateur : produit un dictionnaire de champs par bloc `SHOT n:`
+
+    Le fichier est lu ligne par ligne, un seul bloc est gardé en mémoire.
+    """
+    bloc: Optional[Dict] = None
+
+    for ligne in iter_lignes(source):
+        match = LIGNE_RE.match(ligne)
+        if not match:
+            continue
+
+        if match.group('numero') is not None:
+            if bloc is not None:
+                yield bloc
+            bloc = {
+                'numero': int(match.group('numero')),
+                'description': match.group('description'),
+            }
+        elif bloc is None:
+            # Texte avant le premier shot (titre, notes...) : ignoré
+            continue
+        elif match.group('cle') is not None:
+            champ = CLES_CHAMPS[match.group('cle').lower()]
+            valeur = _convertir_valeur(champ, match.group('valeur'))
+            if valeur is not None:
+                bloc[champ] = valeur
+        else:
+            texte = match.group('texte')
+            bloc['description'] = f"{bloc['description']} {texte}".strip()
+
+    if bloc is not None:
+        yield bloc
+
+
+def completer_champs(champs: Dict, lexique, defauts: Dict) -> Dict:
+    """Complète les champs absents d'un bloc à partir de mots-clés de la description
+
+    `lexique` est une liste ordonnée de (mots-clés, champs) : le premier
+    mot-clé trouvé dans la description fournit les valeurs manquantes,
+    puis `defauts` comble ce qui reste.
+    """
+    description = champs.get('description', '').lower()
+    complet = dict(champs)
+
+    for mots_cles, valeurs in lexique:
+        if any(mot in description for mot in mots_cles):
+            for champ, valeur in valeurs.items():
+                complet.setdefault(champ, list(valeur) if isinstance(valeur, list) else valeur)
+            break
+
+    for champ, valeur in defauts.items():
+        complet.setdefault(champ, list(valeur) if isinstance(valeur, list) else valeur)
+
+    return complet
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sérialisation JSON - Court-Métrage K-pop Salta
+Couche commune des exports JSON : orjson ou msgspec s'ils sont installés,
+module json de la bibliothèque standard sinon. Les dataclasses (Shot,
+ConceptArt, SuggestionMusicale...) et les ShotRecord sont convertis champ par
+champ au moment de l'encodage, sans la copie récursive de `asdict`.
+
+Deux modes : "pretty" (indentation de 2 espaces, format historique des
+exports) et "compact" (sans espaces, le plus rapide).
+"""
+
+import json
+from dataclasses import fields, is_dataclass
+from functools import lru_cache
+from typing import Any, BinaryIO, Callable, Dict, IO, Iterator, List, Optional
+
+MODES = ("pretty", "compact")
+
+# Ordre de préférence des encodeurs ; "json" est toujours disponible
+BACKENDS = ("orjson", "msgspec", "json")
+
+
+def encode_default(obj: Any) -> Any:
+    """Conversion des objets que les encodeurs ne savent pas sérialiser seuls"""
+    to_dict = getattr(obj, 'to_dict', None)
+    if to_dict is not None:
+        return to_dict()
+    if is_dataclass(obj) and not isinstance(obj, type):
+        # Un seul niveau : l'encodeur redescend dans les champs lui-même
+        return {field.name: getattr(obj, field.name) for field in fields(obj)}
+    if hasattr(obj, 'tolist'):  # scalaires et tableaux NumPy, array.array
+        return obj.tolist()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    raise TypeError(f"Objet non sérialisable en JSON : {type(obj).__name__}")
+
+
+def _orjson_encoder(pretty: bool) -> Callable[[Any], bytes]:
+    import orjson
+
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    if pretty:
+        option |= orjson.OPT_INDENT_2
+    return lambda data: orjson.dumps(data, default=encode_default, option=option)
+
+
+def _msgspec_encoder(pretty: bool) -> Callable[[Any], bytes]:
+    import msgspec
+
+    encoder = msgspec.json.Encoder(enc_hook=encode_default)
+    if pretty:
+        return lambda data: msgspec.json.format(encoder.encode(data), indent=2)
+    return encoder.encode
+
+
+def _json_encoder(pretty: bool) -> Callable[[Any], bytes]:
+    if pretty:
+        encoder = json.JSONEncoder(indent=2, ensure_ascii=False, default=encode_default)
+    else:
+        encoder = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False, default=encode_default)
+    return lambda data: encoder.encode(data).encode('utf-8')
+
+
+_ENCODERS = {"orjson": _orjson_encoder, "msgspec": _msgspec_encoder, "json": _json_encoder}
+
+
+@lru_cache(maxsize=None)
+def backend_available(name: str) -> bool:
+    if name == "json":
+        return True
+    try:
+        __import__(name)
+    except ImportError:
+        return False
+    return True
+
+
+def available_backends() -> List[str]:
+    return [name for name in BACKENDS if backend_available(name)]
+
+
+def default_backend() -> str:
+    """Encodeur le plus rapide installé"""
+    return available_backends()[0]
+
+
+@lru_cache(maxsize=None)
+def get_encoder(mode: str = "pretty", backend: Optional[str] = None) -> Callable[[Any], bytes]:
+    """Fonction d'encodage objet → octets UTF-8 pour un mode et un encodeur"""
+    if mode not in MODES:
+        raise ValueError(f"Mode de sérialisation inconnu : {mode} (attendu : {', '.join(MODES)})")
+    backend = backend or default_backend()
+    if backend not in _ENCODERS:
+        raise ValueError(f"Encodeur JSON inconnu : {backend}")
+    if not backend_available(backend):
+        raise ImportError(f"Encodeur JSON non installé : {backend}")
+    return _ENCODERS[backend](mode == "pretty")
+
+
+def dumps(data: Any, mode: str = "pretty", backend: Optional[str] = None) -> bytes:
+    return get_encoder(mode, backend)(data)
+
+
+def dump(data: Any, stream: BinaryIO, mode: str = "pretty", backend: Optional[str] = None) -> int:
+    """Écrit `data` encodé dans un flux binaire ; retourne le nombre d'octets écrits"""
+    payload = dumps(data, mode, backend)
+    stream.write(payload)
+    return len(payload)
+
+
+def iter_ndjson(stream: IO) -> Iterator[Dict[str, Any]]:
+    """Enregistrements d'un export NDJSON, lus ligne par ligne
+
+    Une dernière ligne incomplète (fichier encore en cours d'écriture) est
+    ignorée : relancer la lecture plus tard pour la récupérer.
+    """
+    for line in stream:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if not line.endswith("\n"):
+            return
+        if line.strip():
+            yield json.loads(line)
+
+
+def describe() -> Dict[str, Any]:
+    """Encodeurs disponibles (affichage, benchmarks)"""
+    return {"default": default_backend(), "available": available_backends()}
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests de l'analyse par lot V2 - Court-Métrage K-pop Salta
+analyser_lot doit donner les mêmes résultats que le chemin shot par shot
+(calculer_timing_total, suggerer_plans_avances).
+"""
+
+import math
+import unittest
+
+from project_model import Shot
+from script_analyzer_v2 import NUMPY_AVAILABLE, SEUIL_INTENSITE_FORTE, ScriptAnalyzerV2
+
+SHOTS = [
+    Shot(1, "Préparation devant le miroir", ["Petite fille"], "preparation_danse", "anticipation_joyeuse",
+         "chambre_salta", 8.0, 6),
+    Shot(2, "Elle danse sur du K-pop", ["Petite fille"], "danse_energique", "extase_creative",
+         "chambre_salta", 12.5, 9),
+    Shot(3, "Même chorégraphie, même énergie", ["Petite fille"], "danse_energique", "extase_creative",
+         "chambre_salta", 4.25, 9),
+    Shot(4, "Son père frappe à la porte", ["Petite fille", "Père (voix off)"], "interruption_surprise",
+         "surprise_retour_realite", "chambre_porte_salta", 6.0, 5),
+    Shot(5, "Repas en famille", ["Petite fille", "Mère"], "repas_familial", "tendresse",
+         "cuisine_salta", 20.0, 2),
+]
+
+
+@unittest.skipUnless(NUMPY_AVAILABLE, "NumPy est requis pour analyser_lot")
+class AnalyseLotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.analyzer = ScriptAnalyzerV2()
+
+    def test_timing_identique_au_chemin_par_shot(self):
+        lot = self.analyzer.analyser_lot(SHOTS)
+        self.assertEqual(lot['timing_stats'], self.analyzer.calculer_timing_total(SHOTS))
+        self.assertEqual(lot['timing_stats'], self.analyzer.calculer_timing_total(iter(SHOTS)))
+
+    def test_colonnes_alignees_sur_les_shots(self):
+        lot = self.analyzer.analyser_lot(SHOTS)
+        debut = 0.0
+        for i, shot in enumerate(SHOTS):
+            plans = self.analyzer.suggerer_plans_avances(shot)
+            self.assertEqual(lot['numero'][i], shot.numero)
+            self.assertEqual(lot['nombre_plans'][i], len(plans))
+            self.assertEqual(lot['insert_emotion_forte'][i], shot.intensite_emotionnelle >= SEUIL_INTENSITE_FORTE)
+            self.assertTrue(math.isclose(lot['debut_secondes'][i], debut))
+            debut += shot.duree_estimee
+
+    def test_lot_vide(self):
+        lot = self.analyzer.analyser_lot([])
+        self.assertEqual(len(lot['numero']), 0)
+        self.assertEqual(len(lot['debut_secondes']), 0)
+        self.assertEqual(lot['timing_stats'], self.analyzer.calculer_timing_total([]))
+        self.assertEqual(lot['timing_stats']['nombre_shots'], 0)
+        self.assertEqual(lot['timing_stats']['intensite_emotionnelle_moyenne'], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
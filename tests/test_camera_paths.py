@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests des trajectoires de caméra - Court-Métrage K-pop Salta
+Les keyframes simplifiées doivent rester dans la tolérance de la trajectoire
+échantillonnée, et add_fcurves (camera_movements_kpop.py) remplir les
+F-curves en bloc sans dupliquer les keyframes d'une exécution à l'autre.
+"""
+
+import sys
+import types
+import unittest
+
+try:
+    import numpy as np
+    from camera_paths import bezier_keyframes, orbit_path, reduce_channels, simplify_keyframes
+except ImportError:
+    np = None
+
+from blender_templates import render_template
+
+
+def _bezier_values(co, left, right, frames):
+    """Évalue la courbe de Bézier (keyframes + poignées, tableaux plats) aux `frames`"""
+    co, left, right = (np.asarray(a).reshape(-1, 2) for a in (co, left, right))
+    values = np.empty(len(frames))
+    for i, frame in enumerate(frames):
+        k = min(max(np.searchsorted(co[:, 0], frame, side="right") - 1, 0), len(co) - 2)
+        p0, p1, p2, p3 = co[k], right[k], left[k + 1], co[k + 1]
+        # Poignées au tiers : x(t) est linéaire, t se déduit directement de la frame
+        t = (frame - p0[0]) / (p3[0] - p0[0])
+        values[i] = ((1 - t) ** 3 * p0[1] + 3 * (1 - t) ** 2 * t * p1[1]
+                     + 3 * (1 - t) * t ** 2 * p2[1] + t ** 3 * p3[1])
+    return values
+
+
+@unittest.skipIf(np is None, "NumPy est requis pour camera_paths")
+class SimplifyKeyframesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.frames = np.arange(1, 180, dtype=np.float64)
+        self.channels = orbit_path(self.frames)
+
+    def test_erreur_bornee_par_la_tolerance(self):
+        values = np.stack([self.channels[("location", axis)] for axis in range(3)])
+        for tolerance in (0.05, 1e-3, 1e-5):
+            keys = simplify_keyframes(self.frames, values, tolerance)
+            self.assertEqual(keys[0], 0)
+            self.assertEqual(keys[-1], len(self.frames) - 1)
+            self.assertTrue(np.all(np.diff(keys) > 0))
+            curves = np.stack([_bezier_values(*bezier_keyframes(self.frames, values[axis], keys), self.frames)
+                               for axis in range(3)])
+            error = np.linalg.norm(curves - values, axis=0).max()
+            self.assertLessEqual(error, tolerance * (1 + 1e-9))
+
+    def test_tolerance_plus_fine_plus_de_keyframes(self):
+        values = self.channels[("location", 0)]
+        counts = [len(simplify_keyframes(self.frames, values, tolerance)) for tolerance in (0.1, 1e-2, 1e-4)]
+        self.assertEqual(counts, sorted(counts))
+        self.assertLess(counts[0], len(self.frames))
+
+    def test_canal_constant_deux_keyframes(self):
+        keys = simplify_keyframes(self.frames, self.channels[("rotation_euler", 1)], 1e-6)
+        self.assertEqual(keys.tolist(), [0, len(self.frames) - 1])
+
+    def test_statistiques_de_compression(self):
+        reduced, stats = reduce_channels(self.frames, self.channels, {"location": 1e-3, "rotation_euler": 1e-3})
+        self.assertEqual(set(reduced), set(self.channels))
+        self.assertEqual(stats["original_keyframes"], len(self.frames) * len(self.channels))
+        self.assertGreater(stats["compression_ratio"], 1.0)
+        # Canaux d'un même groupe : mêmes keyframes
+        self.assertEqual(len(reduced[("location", 0)][0]), len(reduced[("location", 2)][0]))
+
+
+class _KeyframePoints(list):
+    def __init__(self):
+        super().__init__()
+        self.arrays = {}
+
+    def add(self, count):
+        self.extend(object() for _ in range(count))
+
+    def foreach_set(self, attribute, values):
+        values = list(values)
+        width = 2 if attribute in ("co", "handle_left", "handle_right") else 1
+        assert len(values) == len(self) * width, attribute
+        self.arrays[attribute] = values
+
+
+class _FCurve:
+    def __init__(self, data_path, index):
+        self.data_path, self.array_index = data_path, index
+        self.keyframe_points = _KeyframePoints()
+
+    def update(self):
+        pass
+
+
+class _FCurves(list):
+    def find(self, data_path, index=0):
+        return next((c for c in self if (c.data_path, c.array_index) == (data_path, index)), None)
+
+    def new(self, data_path, index=0):
+        assert self.find(data_path, index) is None, "F-curve déjà présente"
+        self.append(_FCurve(data_path, index))
+        return self[-1]
+
+
+class _Object:
+    name = "Camera_Shot02_Circular"
+
+    def __init__(self):
+        self.animation_data = None
+
+    def animation_data_create(self):
+        if self.animation_data is None:
+            self.animation_data = types.SimpleNamespace(action=None)
+        return self.animation_data
+
+
+@unittest.skipIf(np is None, "NumPy est requis pour camera_paths")
+class AddFcurvesTest(unittest.TestCase):
+    """add_fcurves du script généré, exécuté avec un module bpy minimal"""
+
+    def setUp(self):
+        frames = np.arange(1, 180, dtype=np.float64)
+        self.channels, _ = reduce_channels(frames, orbit_path(frames), {"location": 1e-3, "rotation_euler": 1e-3})
+        colors = {name: (1.0, 1.0, 1.0) for name in ("neon_pink", "neon_cyan", "golden_hour", "soft_fill")}
+        source = render_template("camera_movements_kpop.py.tmpl", orbit_channels="{}", **colors)
+        bpy = types.ModuleType("bpy")
+        bpy.data = types.SimpleNamespace(actions=types.SimpleNamespace(
+            new=lambda name: types.SimpleNamespace(name=name, fcurves=_FCurves())))
+        self.addCleanup(sys.modules.pop, "bpy", None)
+        sys.modules["bpy"] = bpy
+        self.namespace = {"__name__": "camera_movements_kpop"}
+        exec(compile(source, "camera_movements_kpop.py", "exec"), self.namespace)
+
+    def test_remplissage_en_bloc(self):
+        obj = _Object()
+        self.namespace["add_fcurves"](obj, self.channels)
+        fcurves = obj.animation_data.action.fcurves
+        self.assertEqual(len(fcurves), len(self.channels))
+        for fcurve in fcurves:
+            co = self.channels[(fcurve.data_path, fcurve.array_index)][0]
+            arrays = fcurve.keyframe_points.arrays
+            self.assertEqual(len(fcurve.keyframe_points), len(co) // 2)
+            self.assertEqual(set(arrays), {"co", "interpolation", "handle_left_type", "handle_right_type",
+                                           "handle_left", "handle_right"})
+            self.assertEqual(set(arrays["interpolation"]), {self.namespace["BEZIER"]})
+
+    def test_relance_sans_doublons(self):
+        obj = _Object()
+        self.namespace["add_fcurves"](obj, self.channels)
+        self.namespace["add_fcurves"](obj, self.channels)
+        fcurves = obj.animation_data.action.fcurves
+        self.assertEqual(len(fcurves), len(self.channels))
+        for fcurve in fcurves:
+            co = self.channels[(fcurve.data_path, fcurve.array_index)][0]
+            self.assertEqual(len(fcurve.keyframe_points), len(co) // 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
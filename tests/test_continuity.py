@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests de la continuité couleur - Court-Métrage K-pop Salta
+Le calcul vectorisé de check_continuity doit signaler exactement les raccords
+qu'une comparaison shot par shot signale : seulement entre shots consécutifs
+d'un même lieu, au-delà du seuil ΔE2000.
+"""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from project_model import Shot
+from script_analyzer import ScriptAnalyzer
+from script_analyzer_v2 import ScriptAnalyzerV2
+
+try:
+    import numpy as np
+    from continuity import (CONTINUITY_THRESHOLD, assign_looks, build_looks, check_continuity, key_lights,
+                            palette_distance_matrix)
+    from palette_engine import delta_e_2000
+    from script_analyzer_v3_backend import LIGHTING_COLORS, ScriptAnalyzerV3
+except ImportError:
+    np = None
+
+
+def _shot(numero, action, emotion, lieu, intensite):
+    return Shot(numero, f"Shot {numero}", ["Petite fille"], action, emotion, lieu, 5.0, intensite)
+
+
+SHOTS = [
+    _shot(1, "preparation_danse", "anticipation_joyeuse", "chambre_salta", 6),
+    _shot(2, "danse_energique", "extase_creative", "chambre_salta", 9),
+    # Changement de look dans la même chambre : raccord à signaler
+    _shot(3, "interruption_surprise", "surprise_retour_realite", "chambre_salta", 5),
+    # Changement de lieu : jamais signalé, quel que soit l'écart
+    _shot(4, "danse_energique", "extase_creative", "cuisine_salta", 10),
+    _shot(5, "repas_familial", "chaleur_familiale", "cuisine_salta", 3),
+    _shot(6, "inconnue", "concentration_totale", "cuisine_salta", 3),
+    _shot(7, "inconnue", "neutre", "patio", 1),
+]
+
+
+@unittest.skipIf(np is None, "NumPy est requis pour continuity")
+class ContinuityTest(unittest.TestCase):
+
+    def setUp(self):
+        self.looks = build_looks(ScriptAnalyzer().mood_database, ScriptAnalyzerV2().concept_art_templates,
+                                 LIGHTING_COLORS)
+
+    def _reference(self, shots, threshold):
+        """Raccords signalés, calculés shot par shot"""
+        names = [look.name for look in self.looks]
+        matrix = palette_distance_matrix(self.looks)
+        looks = [assign_looks([shot.action], self.looks, [shot.emotion])[0] for shot in shots]
+        flagged = []
+        for index in range(len(shots) - 1):
+            avant, apres = shots[index], shots[index + 1]
+            if avant.lieu != apres.lieu:
+                continue
+            lights = [key_lights(self.looks, np.array([looks[i]]),
+                                 np.array([float(shots[i].intensite_emotionnelle)]))[0]
+                      for i in (index, index + 1)]
+            palette = float(matrix[looks[index], looks[index + 1]])
+            light = float(delta_e_2000(lights[0], lights[1]))
+            if palette + light > threshold:
+                flagged.append({"from_shot": avant.numero, "to_shot": apres.numero, "lieu": avant.lieu,
+                                "looks": [names[looks[index]], names[looks[index + 1]]],
+                                "delta_e": round(palette + light, 2), "palette_delta_e": round(palette, 2),
+                                "light_delta_e": round(light, 2)})
+        return flagged
+
+    def test_looks(self):
+        self.assertEqual([look.name for look in self.looks], ["kpop", "salta"])
+        kpop, salta = self.looks
+        self.assertEqual(kpop.key_light, LIGHTING_COLORS["neon_pink"])
+        self.assertEqual(assign_looks(["danse_energique", "repas_familial"], self.looks), [0, 1])
+        # Action inconnue : l'émotion tranche, puis le look par défaut
+        self.assertEqual(assign_looks(["inconnue", "inconnue"], self.looks, ["concentration_totale", "neutre"]),
+                         [0, 1])
+        matrix = palette_distance_matrix(self.looks)
+        np.testing.assert_allclose(matrix, matrix.T)
+        np.testing.assert_allclose(np.diag(matrix), 0.0)
+        self.assertGreater(matrix[0, 1], 0.0)
+
+    def test_conforme_au_calcul_par_paire(self):
+        for threshold in (0.0, 10.0, CONTINUITY_THRESHOLD, 40.0, float("inf")):
+            with self.subTest(threshold=threshold):
+                report = check_continuity(SHOTS, self.looks, threshold)
+                self.assertEqual(report.flagged, self._reference(SHOTS, threshold))
+        report = check_continuity(SHOTS, self.looks)
+        self.assertEqual(report.shot_looks.tolist(), [0, 0, 1, 0, 1, 0, 1])
+        self.assertEqual(report.same_location.tolist(), [True, True, False, True, True, False])
+        self.assertEqual(len(report.delta_e), len(SHOTS) - 1)
+        self.assertIn((2, 3), [(r["from_shot"], r["to_shot"]) for r in report.flagged])
+
+    def test_raccords_du_meme_lieu_seulement(self):
+        report = check_continuity(SHOTS, self.looks, 0.0)
+        pairs = [(r["from_shot"], r["to_shot"]) for r in report.flagged]
+        self.assertNotIn((3, 4), pairs)
+        self.assertNotIn((6, 7), pairs)
+        self.assertTrue(all(SHOTS[a - 1].lieu == SHOTS[b - 1].lieu for a, b in pairs))
+        self.assertEqual(check_continuity(SHOTS, self.looks, float("inf")).flagged, [])
+
+    def test_montage_court(self):
+        report = check_continuity(SHOTS[:1], self.looks)
+        self.assertEqual(len(report.delta_e), 0)
+        self.assertEqual(report.flagged, [])
+
+    def test_export_v3(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            analyzer = ScriptAnalyzerV3(tmp, shots=SHOTS)
+            result = analyzer.check_continuity(threshold=15.0)
+            with open(Path(tmp) / "exports" / "continuity.json", encoding="utf-8") as f:
+                self.assertEqual(json.load(f), result)
+        self.assertEqual(result["transitions"], len(SHOTS) - 1)
+        self.assertEqual(result["shot_looks"]["3"], "salta")
+        self.assertEqual(result["flagged"], self._reference(SHOTS, 15.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
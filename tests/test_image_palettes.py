@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests de l'extraction des palettes de références - Court-Métrage K-pop Salta
+Un fichier illisible est ignoré (avec ou sans pool) et le cache des autres
+images est enregistré.
+"""
+
+import contextlib
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+try:
+    import numpy  # noqa: F401
+    from PIL import Image
+except ImportError:
+    Image = None
+
+SCRIPT = "SHOT 1: Petite fille dans sa chambre, dansant sur de la K-pop\n"
+
+
+@unittest.skipIf(Image is None, "Pillow et NumPy sont requis pour image_palettes")
+class ExtractPalettesTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        self.folder = self.tmp / "mood_board"
+        self.folder.mkdir()
+        Image.new("RGB", (32, 32), (20, 90, 40)).save(self.folder / "foret.png")
+        Image.new("RGB", (32, 32), (240, 140, 10)).save(self.folder / "orange.jpg")
+        (self.folder / "broken.jpg").write_bytes(b"pas une image")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _check(self, workers):
+        from image_palettes import CACHE_FILE, extract_palettes
+
+        result = extract_palettes(self.folder, workers=workers)
+        self.assertEqual(sorted(result["palettes"]), ["foret.png", "orange.jpg"])
+        self.assertEqual(list(result["errors"]), ["broken.jpg"])
+        self.assertEqual(result["computed"], 2)
+
+        with open(self.folder / CACHE_FILE, encoding="utf-8") as f:
+            self.assertEqual(sorted(json.load(f)["entries"]), ["foret.png", "orange.jpg"])
+        again = extract_palettes(self.folder, workers=workers)
+        self.assertEqual((again["computed"], again["cached"]), (0, 2))
+        self.assertEqual(again["palettes"], result["palettes"])
+
+    def test_fichier_corrompu_sans_pool(self):
+        self._check(workers=1)
+
+    def test_fichier_corrompu_avec_pool(self):
+        self._check(workers=2)
+
+    def test_fichier_corrige_analyse(self):
+        from image_palettes import extract_palettes
+
+        extract_palettes(self.folder, workers=1)
+        Image.new("RGB", (16, 16), (10, 10, 200)).save(self.folder / "broken.jpg", format="JPEG")
+        result = extract_palettes(self.folder, workers=1)
+        self.assertEqual(result["errors"], {})
+        self.assertEqual((result["computed"], result["cached"]), (1, 2))
+
+    def test_option_references_du_cli(self):
+        from script_analyzer_cli import main
+
+        script = self.tmp / "ep01.txt"
+        script.write_text(SCRIPT, encoding="utf-8")
+        stderr = io.StringIO()
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(stderr):
+            code = main(["report", str(script), "-o", str(self.tmp / "sorties"), "-j", "1",
+                         "--references", str(self.folder)])
+        self.assertEqual(code, 0)
+        self.assertIn("broken.jpg", stderr.getvalue())
+        self.assertTrue((self.tmp / "sorties" / "ep01" / "analyse_script.txt").is_file())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du mood board V1 - Court-Métrage K-pop Salta
+Les couleurs dominantes des images de référence (image_palettes) doivent
+changer le mood board, par l'appel direct, le rapport et l'option
+--references de script_analyzer_cli.
+"""
+
+import contextlib
+import io
+import tempfile
+import unittest
+from pathlib import Path
+
+from script_analyzer import ScriptAnalyzer
+
+try:
+    import numpy  # noqa: F401
+    from PIL import Image
+except ImportError:
+    Image = None
+
+SCRIPT = """
+SHOT 1: Petite fille dans sa chambre, dansant sur de la K-pop
+SHOT 2: Le père frappe à la porte pour qu'elle vienne l'aider
+"""
+
+
+@unittest.skipIf(Image is None, "Pillow et NumPy sont requis pour image_palettes")
+class MoodBoardReferencesTest(unittest.TestCase):
+
+    def setUp(self):
+        from image_palettes import dominant_colors, extract_palettes
+
+        self.analyzer = ScriptAnalyzer()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        self.references = self.tmp / "mood_board"
+        self.references.mkdir()
+        # Deux références unies, vert sapin et orange, absentes des palettes K-pop et Salta
+        Image.new("RGB", (32, 32), (20, 90, 40)).save(self.references / "foret.png")
+        Image.new("RGB", (32, 32), (240, 140, 10)).save(self.references / "orange.png")
+        self.colors = dominant_colors(extract_palettes(self.references, workers=1)["palettes"])
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_references_changent_le_mood_board(self):
+        sans = self.analyzer.generer_mood_board([])
+        avec = self.analyzer.generer_mood_board([], palettes_images=self.colors)
+        self.assertEqual(len(self.colors), 2)
+        self.assertEqual(sans['palette_references'], [])
+        self.assertEqual(sorted(avec['palette_references']), sorted(self.colors))
+        self.assertNotEqual(sans, avec)
+
+    def test_rapport_avec_references(self):
+        sans = self.analyzer.generer_rapport_complet(SCRIPT)
+        avec = self.analyzer.generer_rapport_complet(SCRIPT, palettes_images=self.colors)
+        self.assertNotIn("Palette des références", sans)
+        for color in self.colors:
+            self.assertIn(color, avec)
+
+    def test_option_references_du_cli(self):
+        from script_analyzer_cli import main
+
+        script = self.tmp / "ep01.txt"
+        script.write_text(SCRIPT, encoding="utf-8")
+        with contextlib.redirect_stdout(io.StringIO()):
+            code = main(["report", str(script), "-o", str(self.tmp / "sorties"), "-j", "1",
+                         "--references", str(self.references), "--date", "2026-01-01"])
+        self.assertEqual(code, 0)
+        rapport = (self.tmp / "sorties" / "ep01" / "analyse_script.txt").read_text(encoding="utf-8")
+        for color in self.colors:
+            self.assertIn(color, rapport)
+
+
+if __name__ == "__main__":
+    unittest.main()
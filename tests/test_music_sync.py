@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests de la grille de beats - Court-Métrage K-pop Salta
+Chaque beat doit tomber sur la frame exacte (arithmétique rationnelle), sans
+dérive sur une longue piste, aux changements de tempo et avec une cadence
+fractionnaire (23.976).
+"""
+
+import unittest
+from fractions import Fraction
+
+try:
+    from music_sync import BeatGrid, round_frame, shot_frame_ranges
+except ImportError:
+    BeatGrid = None
+
+
+def _frames_exactes(tracks, framerate):
+    """Frames attendues, beat par beat, en Fraction depuis le début de chaque piste"""
+    fps = Fraction(str(framerate))
+    frames, start = [], Fraction(0)
+    for track in tracks:
+        bpm, duration = Fraction(str(track["bpm"])), Fraction(str(track["duration"]))
+        k = 0
+        while k * 60 / bpm < duration:
+            frames.append(round_frame((start + k * 60 / bpm) * fps))
+            k += 1
+        start += duration
+    return frames
+
+
+@unittest.skipIf(BeatGrid is None, "NumPy est requis pour music_sync")
+class BeatGridTest(unittest.TestCase):
+
+    def test_arrondi_demi_frame_vers_le_haut(self):
+        self.assertEqual([round_frame(Fraction(n, 2)) for n in range(-3, 6)], [-1, -1, 0, 0, 1, 1, 2, 2, 3])
+        starts, ends = shot_frame_ranges([0.6875, 1.0], 24)
+        self.assertEqual((starts.tolist(), ends.tolist()), ([0, 17], [17, 41]))
+
+    def test_pas_de_derive_sur_une_longue_piste(self):
+        # 128 BPM à 24 fps : 11.25 frames par beat ; une heure de musique
+        tracks = [{"bpm": 128, "duration": 3600}]
+        grid = BeatGrid(tracks, 24)
+        self.assertEqual(grid.frames.tolist(), _frames_exactes(tracks, 24))
+        self.assertEqual(grid.tracks[0].frames_per_beat, 11.25)
+        # Dernier beat : k × 45/4 frames exactement, pas une somme de pas arrondis
+        self.assertEqual(grid.frames[-1], round_frame(Fraction(len(grid.frames) - 1) * Fraction(45, 4)))
+
+    def test_changements_de_tempo(self):
+        tracks = [{"name": "Intro", "bpm": 100, "duration": 8}, {"name": "Danse", "bpm": 128, "duration": 12.3},
+                  {"name": "Calme", "bpm": 72.5, "duration": 10}]
+        grid = BeatGrid(tracks, 24, beats_per_bar=4)
+        self.assertEqual(grid.frames.tolist(), _frames_exactes(tracks, 24))
+        self.assertEqual([t.start_frame for t in grid.tracks], [0, 192, 487])
+        self.assertEqual(grid.tracks[-1].end_frame, 727)
+        for index, track in enumerate(grid.tracks):
+            frames = grid.track_frames(index)
+            self.assertEqual(frames[0], track.start_frame)
+            self.assertTrue((frames < track.end_frame).all())
+        # Chaque piste ouvre une nouvelle mesure
+        firsts = [int((grid.track_index == index).argmax()) for index in range(3)]
+        self.assertTrue(all(grid.beat_in_bar[i] == 0 for i in firsts))
+        self.assertEqual(grid.bar_number[firsts[1]], grid.bar_number[firsts[1] - 1] + 1)
+        self.assertEqual(grid.marker_name(0), "Bar_1")
+        self.assertEqual(grid.marker_name(1), "Beat_1.2")
+
+    def test_cadence_fractionnaire(self):
+        tracks = [{"bpm": 120, "duration": 60}, {"bpm": 90, "duration": 30}]
+        grid = BeatGrid(tracks, 23.976)
+        self.assertEqual(grid.frames.tolist(), _frames_exactes(tracks, 23.976))
+        self.assertEqual(grid.tracks[0].end_frame, 1439)  # 60 × 23.976 = 1438.56
+        self.assertAlmostEqual(grid.tracks[0].frames_per_beat, 11.988)
+        config = {"technical_specs": {"framerate": 29.97},
+                  "music_sync": {"secondary_tracks": [{"bpm": 128, "duration": 5}]}}
+        self.assertEqual(BeatGrid.from_config(config).frames.tolist(),
+                         _frames_exactes(config["music_sync"]["secondary_tracks"], 29.97))
+
+    def test_grille_vide(self):
+        grid = BeatGrid([], 24)
+        self.assertEqual(len(grid.frames), 0)
+        self.assertEqual(grid.duration_frames, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests de l'export NDJSON - Court-Métrage K-pop Salta
+Une ligne metadata, une ligne par shot, puis timing_stats ; les lignes sont
+lisibles (serialization.iter_ndjson) pendant que l'export s'écrit.
+"""
+
+import io
+import json
+import tempfile
+import unittest
+from dataclasses import asdict
+from pathlib import Path
+
+from project_model import Shot
+from render_farm import ndjson_shots
+from script_analyzer_v2 import ScriptAnalyzerV2
+from serialization import available_backends, iter_ndjson
+
+
+class ExporterNdjsonTest(unittest.TestCase):
+
+    def setUp(self):
+        self.analyzer = ScriptAnalyzerV2()
+        self.shots = [Shot(**champs) for champs in self.analyzer.analyser_script_avance().to_dicts()]
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "project_data.ndjson"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _records(self):
+        with open(self.path, "rb") as f:
+            return list(iter_ndjson(f))
+
+    def test_structure_des_enregistrements(self):
+        self.analyzer.exporter_ndjson(iter(self.shots), str(self.path))
+        records = self._records()
+        self.assertEqual([r["type"] for r in records], ["metadata"] + ["shot"] * len(self.shots) + ["timing_stats"])
+
+        debut = 0.0
+        for record, shot in zip(records[1:-1], self.shots):
+            self.assertEqual(record["shot"], asdict(shot))
+            self.assertAlmostEqual(record["debut_secondes"], debut)
+            self.assertEqual(record["plans_suggeres"],
+                             [asdict(plan) for plan in self.analyzer.suggerer_plans_avances(shot)])
+            self.assertEqual(record["suggestion_musicale"], asdict(self.analyzer._suggestion_musicale(shot)))
+            debut += shot.duree_estimee
+
+        stats = dict(records[-1])
+        del stats["type"]
+        self.assertEqual(stats, json.loads(json.dumps(self.analyzer.calculer_timing_total(self.shots))))
+
+    def test_sources_et_encodeurs_equivalents(self):
+        attendu = None
+        for backend in available_backends():
+            for source in (iter(self.shots), self.analyzer.analyser_script_avance()):
+                self.analyzer.exporter_ndjson(source, str(self.path), backend=backend)
+                records = [r for r in self._records() if r["type"] != "metadata"]
+                attendu = attendu or records
+                self.assertEqual(records, attendu, backend)
+        self.assertEqual(list(ndjson_shots(self.path)), self.shots)
+
+    def test_lecture_pendant_l_ecriture(self):
+        lues = []
+
+        def shots_surveilles():
+            for rang, shot in enumerate(self.shots):
+                # Avec flush_every=1, tout ce qui précède ce shot est déjà sur disque
+                with open(self.path, "rb") as f:
+                    lues.append(len(list(iter_ndjson(f))))
+                yield shot
+
+        self.analyzer.exporter_ndjson(shots_surveilles(), str(self.path), flush_every=1)
+        self.assertEqual(lues, list(range(1, len(self.shots) + 1)))
+
+    def test_ligne_incomplete_ignoree(self):
+        flux = io.BytesIO(b'{"type":"metadata"}\n{"type":"shot","shot":{"numero":1}}\n{"type":"sh')
+        self.assertEqual([r["type"] for r in iter_ndjson(flux)], ["metadata", "shot"])
+
+    def test_projet_vide(self):
+        self.analyzer.exporter_ndjson(iter([]), str(self.path))
+        records = self._records()
+        self.assertEqual([r["type"] for r in records], ["metadata", "timing_stats"])
+        self.assertEqual(records[-1]["nombre_shots"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
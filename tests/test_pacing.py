@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du rapport de rythme - Court-Métrage K-pop Salta
+analyse_pacing doit rendre des types Python natifs (pas de scalaires NumPy)
+et les moyennes de PacingIndex retourner des float.
+"""
+
+import json
+import unittest
+from pathlib import Path
+
+from project_model import Shot
+
+try:
+    from music_sync import BeatGrid
+    from pacing import PacingIndex, analyse_pacing
+except ImportError:
+    analyse_pacing = None
+
+SHOTS = [
+    Shot(1, "Préparation devant le miroir", ["Petite fille"], "preparation_danse", "anticipation_joyeuse",
+         "chambre_salta", 8.0, 6),
+    Shot(2, "Elle danse sur du K-pop", ["Petite fille"], "danse_energique", "extase_creative",
+         "chambre_salta", 12.5, 9),
+    Shot(3, "Son père frappe à la porte", ["Petite fille", "Père (voix off)"], "interruption_surprise",
+         "surprise_retour_realite", "chambre_porte_salta", 6.0, 5),
+]
+
+CONFIG = Path(__file__).resolve().parent.parent / "config.json"
+
+
+def _types_natifs(value, chemin="rapport"):
+    """Chemins des valeurs qui ne sont pas des types JSON natifs"""
+    if isinstance(value, dict):
+        return [p for key, item in value.items() for p in _types_natifs(item, f"{chemin}.{key}")]
+    if isinstance(value, list):
+        return [p for i, item in enumerate(value) for p in _types_natifs(item, f"{chemin}[{i}]")]
+    return [] if type(value) in (int, float, str, bool, type(None)) else [f"{chemin} : {type(value).__name__}"]
+
+
+@unittest.skipIf(analyse_pacing is None, "NumPy est requis pour pacing")
+class AnalysePacingTest(unittest.TestCase):
+
+    def test_rapport_en_types_natifs(self):
+        with open(CONFIG, encoding="utf-8") as f:
+            grid = BeatGrid.from_config(json.load(f))
+        report = analyse_pacing(SHOTS, grid, grid.framerate)
+        self.assertEqual(_types_natifs(report), [])
+        self.assertIs(type(report["mean_shot_length"]), float)
+        self.assertEqual(report["mean_shot_length"], round((8.0 + 12.5 + 6.0) / 3, 3))
+
+    def test_moyennes_en_float(self):
+        index = PacingIndex.from_shots(SHOTS, 24)
+        self.assertIs(type(index.mean_shot_length(0, 3)), float)
+        self.assertIs(type(index.mean_intensity(0, 3)), float)
+        self.assertIs(type(index.mean_intensity_between(0, 240)), float)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du moteur de palettes - Court-Métrage K-pop Salta
+Conversions hexadécimal ↔ CIELAB, ΔE2000 sur les données de référence de
+Sharma, déduplication des teintes proches et palettes de fusion du mood board.
+"""
+
+import unittest
+
+try:
+    import numpy as np
+    from palette_engine import (best_palette, collect_palettes, dedupe_colors, delta_e_2000, fusion_palettes,
+                                hex_to_lab, is_hex_color, lab_to_hex, normalize_hex, pairwise_delta_e)
+except ImportError:
+    np = None
+
+from script_analyzer import ScriptAnalyzer
+
+# Paires (Lab1, Lab2, ΔE00) de Sharma, Wu et Dalal (2005)
+SHARMA = [
+    ((50.0, 2.6772, -79.7751), (50.0, 0.0, -82.7485), 2.0425),
+    ((50.0, 0.0, 0.0), (50.0, -1.0, 2.0), 2.3669),
+    ((50.0, 2.49, -0.001), (50.0, -2.49, 0.0009), 7.1792),
+    ((50.0, 2.49, -0.001), (50.0, -2.49, 0.0011), 7.2195),
+    ((50.0, 2.5, 0.0), (73.0, 25.0, -18.0), 27.1492),
+    ((60.2574, -34.0099, 36.2677), (60.4626, -34.1751, 39.4387), 1.2644),
+    ((90.8027, -2.0831, 1.441), (91.1528, -1.6435, 0.0447), 1.4441),
+    ((2.0776, 0.0795, -1.135), (0.9033, -0.0636, -0.5514), 0.9082),
+]
+
+KPOP = ["#FF69B4", "#00FFFF", "#9370DB", "#FFD700", "#FF1493"]
+SALTA = ["#D2691E", "#DEB887", "#8B4513", "#F4A460", "#CD853F"]
+
+
+@unittest.skipIf(np is None, "NumPy est requis pour palette_engine")
+class PaletteEngineTest(unittest.TestCase):
+
+    def test_hexadecimal(self):
+        self.assertTrue(is_hex_color("ff69b4"))
+        self.assertFalse(is_hex_color("Palettes saturées"))
+        self.assertFalse(is_hex_color(0xFF69B4))
+        self.assertEqual(normalize_hex("ff69b4"), "#FF69B4")
+
+    def test_aller_retour_lab(self):
+        couleurs = KPOP + SALTA + ["#000000", "#FFFFFF", "#808080"]
+        lab = hex_to_lab(couleurs)
+        self.assertEqual(lab.shape, (len(couleurs), 3))
+        self.assertEqual(lab_to_hex(lab), couleurs)
+        np.testing.assert_allclose(lab[-3:, 0], [0.0, 100.0, 53.585], atol=1e-3)
+        np.testing.assert_allclose(lab[-3:, 1:], 0.0, atol=1e-3)
+
+    def test_delta_e_2000_sharma(self):
+        lab1 = np.array([paire[0] for paire in SHARMA])
+        lab2 = np.array([paire[1] for paire in SHARMA])
+        attendu = [paire[2] for paire in SHARMA]
+        np.testing.assert_allclose(delta_e_2000(lab1, lab2), attendu, atol=1e-4)
+        np.testing.assert_allclose(delta_e_2000(lab2, lab1), attendu, atol=1e-4)
+        # Version matricielle : mêmes valeurs que paire par paire, diagonale nulle
+        distances = pairwise_delta_e(lab1)
+        self.assertEqual(distances.shape, (len(SHARMA), len(SHARMA)))
+        np.testing.assert_allclose(np.diag(distances), 0.0, atol=1e-9)
+        np.testing.assert_allclose(distances[0, 1], delta_e_2000(lab1[0], lab1[1]))
+
+    def test_deduplication(self):
+        couleurs = ["#ff69b4", "#FF6AB4", "Palettes saturées", "#00FFFF", "#FF69B5", "#00FEFF", "#8B4513"]
+        self.assertEqual(dedupe_colors(couleurs), ["#FF69B4", "#00FFFF", "#8B4513"])
+        self.assertEqual(dedupe_colors(KPOP + SALTA), KPOP + SALTA)
+        self.assertEqual(dedupe_colors(couleurs, threshold=0.0), [normalize_hex(c) for c in couleurs
+                                                                  if is_hex_color(c)])
+        self.assertEqual(dedupe_colors(["Néon"]), [])
+
+    def test_collecte_des_palettes(self):
+        base = {
+            "kpop_chambre": {"couleurs": ["ff69b4", "Palettes saturées", "#00FFFF"]},
+            "animation_3d_graphique": {"couleurs": ["Style graphique"]},
+            "argentine_salta": {"eclairage": "Lumière dorée"},
+        }
+        config = {"kpop_colors": {"neon_pink": "#FF1493", "note": "vif"}, "vide": {"note": "aucune"}}
+        self.assertEqual(collect_palettes(base, config), {
+            "kpop_chambre": ["#FF69B4", "#00FFFF"],
+            "kpop_colors": ["#FF1493"],
+        })
+
+    def test_fusion_et_meilleure_palette(self):
+        fusions = fusion_palettes(KPOP, SALTA)
+        self.assertEqual(len(fusions), 3)
+        self.assertEqual(fusions, fusion_palettes(KPOP, SALTA))
+        for palette in fusions:
+            self.assertEqual(len(palette), 5)
+            self.assertTrue(all(is_hex_color(couleur) for couleur in palette))
+            luminances = hex_to_lab(palette)[:, 0]
+            self.assertTrue((np.diff(luminances) <= 1e-9).all())
+
+        meilleure = best_palette(fusions, KPOP + SALTA)
+        self.assertIn(meilleure, fusions)
+        # Une candidate qui reprend exactement la référence l'emporte
+        self.assertEqual(best_palette(fusions + [KPOP], KPOP), KPOP)
+
+    def test_mood_board(self):
+        mood = ScriptAnalyzer().generer_mood_board([])
+        principale = mood['palette_principale']
+        self.assertEqual(principale, dedupe_colors(principale))
+        self.assertEqual(len(mood['palette_fusion']), 5)
+        self.assertTrue(all(is_hex_color(couleur) for couleur in mood['palette_fusion']))
+        self.assertEqual(mood, ScriptAnalyzer().generer_mood_board([]))
+
+
+if __name__ == "__main__":
+    unittest.main()
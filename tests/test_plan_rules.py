@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du moteur de règles de plans - Court-Métrage K-pop Salta
+L'index doit donner les mêmes plans qu'un parcours linéaire des règles, et
+les plans partagés ne doivent pas pouvoir être modifiés par un appelant.
+"""
+
+import dataclasses
+import itertools
+import random
+import unittest
+
+from plan_rules import TAILLE_CACHE, MoteurReglesPlans, ReglePlan, jetons
+from project_model import PlanSuggestion, Shot
+from script_analyzer import ScriptAnalyzer
+from script_analyzer_v2 import ScriptAnalyzerV2
+
+ACTIONS = ["danse_energique", "preparation_danse", "repas_familial", "interruption_surprise", "sortie"]
+EMOTIONS = ["extase_creative", "tendresse", "surprise_retour_realite", "focus_passion"]
+JETONS = sorted({jeton for valeur in ACTIONS + EMOTIONS for jeton in jetons(valeur)})
+
+
+def _reference(regles, action, emotion, intensite):
+    """Parcours linéaire de toutes les règles, dans l'ordre (priorité, déclaration)"""
+    jetons_action, jetons_emotion = jetons(action), jetons(emotion)
+    plans = []
+    for _, regle in sorted(enumerate(regles), key=lambda item: (item[1].priorite, item[0])):
+        if regle.actions and not {a.lower() for a in regle.actions} & jetons_action:
+            continue
+        if regle.emotions and not {e.lower() for e in regle.emotions} & jetons_emotion:
+            continue
+        if regle.intensite_min is not None or regle.intensite_max is not None:
+            if intensite is None:
+                continue
+            if regle.intensite_min is not None and intensite < regle.intensite_min:
+                continue
+            if regle.intensite_max is not None and intensite > regle.intensite_max:
+                continue
+        plans.extend(regle.plans)
+    return plans
+
+
+class MoteurReglesPlansTest(unittest.TestCase):
+
+    def test_index_equivalent_au_parcours_lineaire(self):
+        rng = random.Random(7)
+        regles = []
+        for i in range(60):
+            bas = rng.choice([None, rng.randint(0, 10)])
+            regles.append(ReglePlan(
+                plans=[f"plan_{i}_{j}" for j in range(rng.randint(1, 2))],
+                actions=tuple(rng.sample(JETONS, rng.choice([0, 0, 1, 2]))),
+                emotions=tuple(rng.sample(JETONS, rng.choice([0, 1]))),
+                intensite_min=bas,
+                intensite_max=rng.choice([None, rng.randint(bas or 0, 10)]),
+                priorite=rng.randint(-2, 2),
+            ))
+        moteur = MoteurReglesPlans(regles)
+        for action, emotion, intensite in itertools.product(ACTIONS, EMOTIONS, [None, 0, 5, 8, 10]):
+            self.assertEqual(list(moteur.plans_pour(action, emotion, intensite)),
+                             _reference(regles, action, emotion, intensite), (action, emotion, intensite))
+
+    def test_plans_partages_non_modifiables(self):
+        plan = PlanSuggestion("Gros plan", "Fixe", "Face", "Émotion")
+        moteur = MoteurReglesPlans([ReglePlan(plans=[plan, {"type": "Insert"}])])
+        plans = moteur.plans_pour("danse", "joie")
+        self.assertIsInstance(plans, tuple)
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            plans[0].type_plan = "Plan large"
+        with self.assertRaises(TypeError):
+            plans[1]["type"] = "Plan large"
+        self.assertEqual(moteur.plans_pour("danse", "joie"), (plan, {"type": "Insert"}))
+
+    def test_cache_borne(self):
+        moteur = MoteurReglesPlans([ReglePlan(plans=["a"], intensite_min=5)])
+        for i in range(TAILLE_CACHE + 10):
+            moteur.plans_pour(f"action_{i}", "joie", 6)
+        info = moteur._selection.cache_info()
+        self.assertEqual(info.maxsize, TAILLE_CACHE)
+        self.assertLessEqual(info.currsize, TAILLE_CACHE)
+
+    def test_suggestions_v1_et_v2_independantes_d_un_shot_a_l_autre(self):
+        shot = Shot(1, "Elle danse", ["Petite fille"], "danse_energique", "extase_creative", "chambre_salta", 10.0, 9)
+        v1 = ScriptAnalyzer()
+        premieres = v1.suggerer_plans(shot)
+        premieres.append(PlanSuggestion("Ajout", "", "", ""))
+        self.assertEqual(len(v1.suggerer_plans(shot)), len(premieres) - 1)
+
+        v2 = ScriptAnalyzerV2()
+        plans = v2.suggerer_plans_avances(shot)
+        self.assertTrue(plans)
+        self.assertEqual(v2.suggerer_plans_avances(shot), plans)
+
+
+if __name__ == "__main__":
+    unittest.main()
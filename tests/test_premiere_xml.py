@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests de l'export Premiere en flux - Court-Métrage K-pop Salta
+Le xmeml écrit par write_premiere_xml doit être bien formé, placer clips et
+marqueurs sur les frames de la timeline, et partir dans le flux au fil de
+l'écriture (aucune écriture de la taille du document).
+"""
+
+import io
+import unittest
+import xml.etree.ElementTree as ET
+
+from project_model import Shot
+
+try:
+    from music_sync import BeatGrid, XMLStreamWriter, shot_frame_ranges, write_premiere_xml
+except ImportError:
+    BeatGrid = None
+
+
+def _shots(count):
+    return [Shot(i, f"Shot {i}", ["Petite fille"], "danse_energique" if i % 2 else "repas_familial",
+                 "extase_creative", "chambre_salta", 3.0 + (i % 5) * 0.6875, 5)
+            for i in range(1, count + 1)]
+
+
+class _Flux(io.StringIO):
+    """Flux texte qui garde la taille de chaque écriture"""
+
+    def __init__(self):
+        super().__init__()
+        self.tailles = []
+
+    def write(self, text):
+        self.tailles.append(len(text))
+        return super().write(text)
+
+
+@unittest.skipIf(BeatGrid is None, "NumPy est requis pour music_sync")
+class PremiereXMLTest(unittest.TestCase):
+
+    def test_echappement(self):
+        flux = io.StringIO()
+        xml = XMLStreamWriter(flux)
+        xml.start("sequence", {"id": 'a"b'})
+        xml.leaf("name", "Danse & <K-pop>")
+        xml.end("sequence")
+        xml.close()
+        root = ET.fromstring(flux.getvalue().encode("utf-8"))
+        self.assertEqual(root.get("id"), 'a"b')
+        self.assertEqual(root.findtext("name"), "Danse & <K-pop>")
+
+    def test_clips_et_marqueurs_sur_la_timeline(self):
+        shots = _shots(40)
+        grid = BeatGrid([{"name": "Intro", "bpm": 100, "duration": 60},
+                         {"name": "K-pop Dance", "bpm": 128, "duration": 90}], 24)
+        flux = io.StringIO()
+        write_premiere_xml(flux, shots, grid)
+        root = ET.fromstring(flux.getvalue().encode("utf-8"))
+
+        starts, ends = shot_frame_ranges([shot.duree_estimee for shot in shots], 24)
+        video = root.findall("./sequence/media/video/track/clipitem")
+        self.assertEqual([(int(c.findtext("start")), int(c.findtext("end"))) for c in video],
+                         list(zip(starts.tolist(), ends.tolist())))
+        self.assertEqual(video[0].findtext("name"), "Shot_01_danse_energique")
+
+        audio = root.findall("./sequence/media/audio/track/clipitem")
+        self.assertEqual([c.findtext("name") for c in audio], ["Intro", "K-pop Dance"])
+        self.assertEqual(audio[1].findtext("file/name"), "k-pop_dance.wav")
+
+        markers = root.findall("./sequence/marker")
+        self.assertEqual([int(m.findtext("in")) for m in markers], grid.frames.tolist())
+        self.assertEqual([m.findtext("name") for m in markers], list(grid.marker_names()))
+        self.assertEqual(int(root.findtext("./sequence/duration")), max(int(ends[-1]), grid.duration_frames))
+        self.assertEqual(root.findtext("./sequence/rate/timebase"), "24")
+
+    def test_ecriture_en_flux(self):
+        # Deux heures de montage, un marqueur par beat à 128 BPM
+        shots = _shots(1500)
+        grid = BeatGrid([{"name": "Main", "bpm": 128, "duration": 7200}], 24)
+        flux = _Flux()
+        write_premiere_xml(flux, shots, grid)
+        total = sum(flux.tailles)
+        self.assertGreater(len(grid.frames), 15000)
+        self.assertGreater(total, 1_000_000)
+        self.assertLess(max(flux.tailles), 200)
+        ET.fromstring(flux.getvalue().encode("utf-8"))
+
+
+if __name__ == "__main__":
+    unittest.main()
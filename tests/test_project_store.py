@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests de la base SQLite du projet - Court-Métrage K-pop Salta
+Requêtes filtrées et en flux, appariement shots/plans, marqueurs de beats,
+lecture seule et fichiers laissés à côté de la base exportée.
+"""
+
+import contextlib
+import io
+import json
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+from project_model import PlanSuggestion, Shot
+from project_store import ProjectStore, main
+
+try:
+    from music_sync import BeatGrid
+except ImportError:
+    BeatGrid = None
+
+SHOTS = [
+    Shot(1, "Préparation devant le miroir", ["Petite fille"], "preparation_danse", "anticipation_joyeuse",
+         "chambre_salta", 8.0, 6),
+    Shot(2, "Elle danse sur du K-pop", ["Petite fille"], "danse_energique", "extase_creative",
+         "chambre_salta", 12.5, 9),
+    Shot(3, "Son père frappe à la porte", ["Petite fille", "Père (voix off)"], "interruption_surprise",
+         "surprise_retour_realite", "chambre_porte_salta", 6.0, 5),
+    Shot(4, "Repas en famille", ["Petite fille", "Mère"], "repas_familial", "tendresse", "cuisine_salta", 20.0, 2),
+]
+
+
+def _plans(shot):
+    # Le shot 3 n'a aucun plan : les curseurs appariés doivent le garder
+    return [PlanSuggestion(f"Plan {shot.numero}.{rang}", "fixe", "face", "test", 2.0, "facile")
+            for rang in range(0 if shot.numero == 3 else shot.numero)]
+
+
+class ProjectStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        self.path = self.tmp / "exports" / "project.sqlite"
+        with ProjectStore(self.path) as store:
+            store.save_shots(SHOTS)
+            store.save_plans(_plans(shot) for shot in SHOTS)
+            store.save_budget({"production": 8000.0, "total": 8000.0})
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_filtres_et_ordre_du_montage(self):
+        with ProjectStore(self.path, read_only=True) as store:
+            self.assertEqual(list(store.iter_shots()), SHOTS)
+            self.assertEqual([s.numero for s in store.iter_shots(lieu="chambre_salta", intensite_min=8)], [2])
+            self.assertEqual([s.numero for s in store.iter_shots(intensite_max=5)], [3, 4])
+            self.assertEqual(store.count_shots(lieu="chambre_salta"), 2)
+            self.assertEqual(store.budget_lines(), {"production": 8000.0, "total": 8000.0})
+            plan = " ".join(store.query_plan(lieu="chambre_salta", intensite_min=8))
+            self.assertIn("idx_shots_lieu_intensite", plan)
+
+    def test_shots_apparies_a_leurs_plans(self):
+        with ProjectStore(self.path, read_only=True) as store:
+            lignes = list(store.iter_shots_with_plans())
+            self.assertEqual([shot for shot, _ in lignes], SHOTS)
+            self.assertEqual([plans for _, plans in lignes], [_plans(shot) for shot in SHOTS])
+            filtrees = list(store.iter_shots_with_plans(intensite_max=5))
+            self.assertEqual([(shot.numero, len(plans)) for shot, plans in filtrees], [(3, 0), (4, 4)])
+            self.assertEqual([numero for numero, _ in store.iter_plans(numero=2)], [2, 2])
+
+    def test_lecture_seule(self):
+        with ProjectStore(self.path, read_only=True) as store:
+            with self.assertRaises(sqlite3.OperationalError):
+                store.save_budget({"total": 0.0})
+        with ProjectStore(":memory:", read_only=True) as store:
+            self.assertEqual(list(store.iter_shots()), [])
+
+    def test_aucun_fichier_wal_apres_export(self):
+        ndjson = self.tmp / "project.ndjson"
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(main([str(self.path), "--ndjson", str(ndjson)]), 0)
+        self.assertEqual(sorted(p.name for p in self.path.parent.iterdir()), ["project.sqlite"])
+        records = [json.loads(line) for line in ndjson.read_text(encoding="utf-8").splitlines()]
+        shots = [record for record in records if record["type"] == "shot"]
+        self.assertEqual([record["shot"]["numero"] for record in shots], [1, 2, 3, 4])
+
+    def test_base_wal_reconvertie(self):
+        connection = sqlite3.connect(str(self.path))
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.close()
+        with ProjectStore(self.path) as store:
+            mode = store.connection.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "delete")
+
+    @unittest.skipIf(BeatGrid is None, "NumPy est requis pour music_sync")
+    def test_marqueurs_de_beats(self):
+        grid = BeatGrid([{"name": "Intro", "bpm": 100, "duration": 8},
+                         {"name": "Danse", "bpm": 128, "duration": 6}], 24)
+        with ProjectStore(self.path) as store:
+            store.save_beat_grid(grid)
+            tracks = list(store.iter_music_tracks())
+            self.assertEqual([track[1] for track in tracks], ["Intro", "Danse"])
+            self.assertEqual(tracks[1][3:5], (grid.tracks[1].start_frame, grid.tracks[1].end_frame))
+            for index in range(2):
+                self.assertEqual([m[0] for m in store.iter_beat_markers(track_index=index)],
+                                 grid.track_frames(index).tolist())
+                self.assertEqual([m[0] for m in store.iter_beat_markers(track_index=index, bars_only=True)],
+                                 grid.track_bar_frames(index).tolist())
+            frames = grid.frames.tolist()
+            window = [m[0] for m in store.iter_beat_markers(50, 200)]
+            self.assertEqual(window, [frame for frame in frames if 50 <= frame < 200])
+            names = [m[1] for m in store.iter_beat_markers()]
+            self.assertEqual(names, list(grid.marker_names()))
+
+
+if __name__ == "__main__":
+    unittest.main()
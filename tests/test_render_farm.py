@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du planificateur de rendu - Court-Métrage K-pop Salta
+Les plages du manifeste doivent couvrir exactement les frames de la
+timeline (music_sync.shot_frame_ranges) et la répartition LPT rester
+équilibrée.
+"""
+
+import unittest
+
+from project_model import Shot
+from render_farm import RenderPlan, expand_shots, pack_ranges, plan_render, render_settings
+
+try:
+    from music_sync import shot_frame_ranges
+except ImportError:
+    shot_frame_ranges = None
+
+# 0.6875 s × 24 = 16.5 frames : demi-frame arrondie vers le haut par la timeline
+DURATIONS = [0.6875, 1.0, 2.5, 0.3125, 4.0, 1.0625]
+CONFIG = {"technical_specs": {"framerate": 24}, "project_config": {"target_resolution": "1080p"},
+          "blender_integration": {"render_settings": {"engine": "Cycles", "samples": 64}}}
+
+
+def _shots(durations=DURATIONS):
+    return [Shot(i, f"Shot {i}", ["Petite fille"] * (1 + i % 3), "danse_energique", "extase_creative",
+                 "chambre_salta", duration, 5)
+            for i, duration in enumerate(durations, 1)]
+
+
+class ExpandShotsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.settings = render_settings(CONFIG)
+
+    @unittest.skipIf(shot_frame_ranges is None, "NumPy est requis pour music_sync")
+    def test_plages_egales_a_la_timeline(self):
+        starts, ends = shot_frame_ranges(DURATIONS, 24)
+        for max_frames in (4, 48):
+            ranges = expand_shots(_shots(), self.settings, max_frames)
+            for numero, (start, end) in enumerate(zip(starts.tolist(), ends.tolist()), 1):
+                shot_ranges = [r for r in ranges if r.shot == numero]
+                # Frames Blender à partir de 1, bornes incluses
+                self.assertEqual(shot_ranges[0].start, start + 1)
+                self.assertEqual(shot_ranges[-1].end, end)
+                self.assertTrue(all(r.frames <= max_frames for r in shot_ranges))
+                for previous, current in zip(shot_ranges, shot_ranges[1:]):
+                    self.assertEqual(current.start, previous.end + 1)
+
+    def test_demi_frame_vers_le_haut(self):
+        ranges = expand_shots(_shots([0.6875, 1.0]), self.settings)
+        self.assertEqual([(r.start, r.end) for r in ranges], [(1, 17), (18, 41)])
+
+    def test_shot_plus_court_qu_une_demi_frame(self):
+        ranges = expand_shots(_shots([0.01, 1.0]), self.settings)
+        self.assertEqual([(r.shot, r.start, r.end) for r in ranges], [(2, 1, 24)])
+
+
+class PackRangesTest(unittest.TestCase):
+
+    def test_chaque_plage_attribuee_une_fois(self):
+        ranges = expand_shots(_shots(), render_settings(CONFIG), 8)
+        chunks = pack_ranges(ranges, 3)
+        attribuees = sorted((r.start, r.end) for chunk in chunks for r in chunk.ranges)
+        self.assertEqual(attribuees, sorted((r.start, r.end) for r in ranges))
+        for chunk in chunks:
+            self.assertEqual([r.start for r in chunk.ranges], sorted(r.start for r in chunk.ranges))
+            self.assertAlmostEqual(chunk.cost, sum(r.cost for r in chunk.ranges))
+
+    def test_borne_lpt(self):
+        ranges = expand_shots(_shots(), render_settings(CONFIG), 8)
+        workers = 3
+        plan = RenderPlan({}, pack_ranges(ranges, workers))
+        # LPT : au plus la charge moyenne plus la plus longue plage
+        bound = sum(r.cost for r in ranges) / workers + max(r.cost for r in ranges)
+        self.assertLessEqual(plan.makespan, bound + 1e-9)
+
+    def test_manifeste_aller_retour(self):
+        plan = plan_render(_shots(), CONFIG, workers=2, max_frames=12)
+        again = RenderPlan.from_manifest(plan.to_manifest())
+        self.assertEqual(again.total_frames, plan.total_frames)
+        self.assertEqual([c.ranges for c in again.chunks], [c.ranges for c in plan.chunks])
+
+
+if __name__ == "__main__":
+    unittest.main()
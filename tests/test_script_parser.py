@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du parseur de script en flux - Court-Métrage K-pop Salta
+Champs reconnus, description sur plusieurs lignes, sources (texte, chemin,
+objet fichier) et lecture paresseuse : un seul bloc en mémoire à la fois.
+"""
+
+import io
+import tempfile
+import unittest
+from pathlib import Path
+
+from script_analyzer import ScriptAnalyzer
+from script_analyzer_v2 import ScriptAnalyzerV2
+from script_parser import iter_blocs_shots, iter_lignes
+
+SCRIPT = """Court-métrage K-pop Salta
+Notes : version de travail
+SHOT 1: Petite fille seule dans sa chambre
+  qui se prépare à danser
+Personnages: Petite fille, Mère
+Émotion: anticipation_joyeuse
+Durée: 8,5s
+Intensité: 6/10
+shot 2 - Le père frappe à la porte
+Lieu: chambre_porte_salta
+Duree: inconnue
+"""
+
+
+class IterBlocsShotsTest(unittest.TestCase):
+
+    def test_champs_et_description(self):
+        blocs = list(iter_blocs_shots(SCRIPT))
+        self.assertEqual(blocs, [
+            {'numero': 1, 'description': 'Petite fille seule dans sa chambre qui se prépare à danser',
+             'personnages': ['Petite fille', 'Mère'], 'emotion': 'anticipation_joyeuse',
+             'duree_estimee': 8.5, 'intensite_emotionnelle': 6},
+            # Préambule ignoré, en-tête en minuscules, durée illisible laissée aux défauts
+            {'numero': 2, 'description': 'Le père frappe à la porte', 'lieu': 'chambre_porte_salta'},
+        ])
+
+    def test_sources_equivalentes(self):
+        attendu = list(iter_blocs_shots(SCRIPT))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "ep01.txt"
+            path.write_text(SCRIPT, encoding="utf-8")
+            self.assertEqual(list(iter_blocs_shots(path)), attendu)
+            self.assertEqual(list(iter_blocs_shots(str(path))), attendu)
+        self.assertEqual(list(iter_blocs_shots(io.StringIO(SCRIPT))), attendu)
+        self.assertEqual(list(iter_blocs_shots(SCRIPT.splitlines(keepends=True))), attendu)
+        self.assertEqual(list(iter_lignes("SHOT 1: seul")), ["SHOT 1: seul"])
+
+    def test_lecture_paresseuse(self):
+        lues = []
+
+        def lignes():
+            for numero in range(1, 100001):
+                for ligne in (f"SHOT {numero}: Plan {numero}\n", "Lieu: chambre_salta\n"):
+                    lues.append(ligne)
+                    yield ligne
+
+        blocs = iter_blocs_shots(lignes())
+        premier = next(blocs)
+        self.assertEqual(premier['numero'], 1)
+        # Le bloc 1 n'est complet qu'à l'en-tête du shot 2 : trois lignes lues, pas le script entier
+        self.assertEqual(len(lues), 3)
+        self.assertEqual(next(blocs)['numero'], 2)
+        self.assertEqual(len(lues), 5)
+
+    def test_script_sans_shot(self):
+        self.assertEqual(list(iter_blocs_shots("Titre\n\nNotes\n")), [])
+
+
+class AnalyzersTest(unittest.TestCase):
+
+    def test_v2_complete_les_champs(self):
+        shots = list(ScriptAnalyzerV2().iter_shots_avance(SCRIPT))
+        self.assertEqual([shot.numero for shot in shots], [1, 2])
+        self.assertEqual(shots[0].duree_estimee, 8.5)
+        self.assertEqual(shots[0].personnages, ['Petite fille', 'Mère'])
+        # Champs absents : lexique de la description (« frappe à la porte »), puis défauts
+        self.assertEqual(shots[1].action, 'interruption_surprise')
+        self.assertEqual(shots[1].lieu, 'chambre_porte_salta')
+        self.assertIsInstance(shots[1].duree_estimee, float)
+
+    def test_analyser_script_lit_son_argument(self):
+        self.assertEqual(len(ScriptAnalyzerV2().analyser_script_avance(SCRIPT)), 2)
+        self.assertEqual(len(ScriptAnalyzer().analyser_script(SCRIPT)), 2)
+        # Sans bloc SHOT : shots du prototype
+        self.assertEqual(len(ScriptAnalyzer().analyser_script("")), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests de la couche de sérialisation JSON - Court-Métrage K-pop Salta
+Tous les encodeurs installés (orjson, msgspec, json) doivent produire les
+mêmes données, en mode "pretty" comme "compact", dataclasses comprises.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from dataclasses import asdict
+from datetime import datetime
+
+from project_model import PlanSuggestion, Shot
+from script_analyzer_v2 import ScriptAnalyzerV2
+from serialization import MODES, available_backends, dumps, encode_default, get_encoder
+
+SHOT = Shot(1, "Elle danse « K-pop » & rêve", ["Petite fille"], "danse_energique", "extase_creative",
+            "chambre_salta", 12.5, 9)
+
+DATA = {
+    "shot": SHOT,
+    "plans": (PlanSuggestion("Gros plan", "Fixe", "Face", "Émotion", 2.5, "Facile"),),
+    "tags": ["néon", "salta"],
+    "date": datetime(2026, 1, 1, 12, 30),
+    "vide": None,
+}
+
+ATTENDU = {
+    "shot": asdict(SHOT),
+    "plans": [asdict(DATA["plans"][0])],
+    "tags": ["néon", "salta"],
+    "date": "2026-01-01T12:30:00",
+    "vide": None,
+}
+
+
+class SerializationTest(unittest.TestCase):
+
+    def test_encodeurs_equivalents(self):
+        self.assertIn("json", available_backends())
+        for backend in available_backends():
+            for mode in MODES:
+                with self.subTest(backend=backend, mode=mode):
+                    payload = dumps(DATA, mode, backend)
+                    self.assertIsInstance(payload, bytes)
+                    self.assertEqual(json.loads(payload), ATTENDU)
+                    self.assertEqual(b"\n" in payload, mode == "pretty")
+
+    def test_pretty_au_format_historique(self):
+        # Même texte que json.dump(asdict(...), indent=2, ensure_ascii=False)
+        attendu = json.dumps(ATTENDU, indent=2, ensure_ascii=False).encode("utf-8")
+        self.assertEqual(dumps(DATA, "pretty", "json"), attendu)
+
+    def test_numpy(self):
+        try:
+            import numpy as np
+        except ImportError:
+            self.skipTest("NumPy absent")
+        data = {"scalaire": np.float64(1.5), "entier": np.int64(3), "tableau": np.arange(3)}
+        for backend in available_backends():
+            self.assertEqual(json.loads(dumps(data, "compact", backend)),
+                             {"scalaire": 1.5, "entier": 3, "tableau": [0, 1, 2]})
+
+    def test_erreurs(self):
+        with self.assertRaises(ValueError):
+            get_encoder("indente")
+        with self.assertRaises(ValueError):
+            get_encoder("compact", "pickle")
+        with self.assertRaises(TypeError):
+            encode_default(object())
+
+    def test_exporter_json(self):
+        analyzer = ScriptAnalyzerV2()
+        analyzer.horodatage = datetime(2026, 1, 1)
+        shots = analyzer.analyser_script_avance()
+        with tempfile.TemporaryDirectory() as tmp:
+            resultats = {}
+            for backend in available_backends():
+                for mode in MODES:
+                    path = os.path.join(tmp, f"{backend}_{mode}.json")
+                    analyzer.exporter_json(shots, path, mode=mode, backend=backend)
+                    with open(path, encoding="utf-8") as f:
+                        resultats[backend, mode] = json.load(f)
+        data = next(iter(resultats.values()))
+        self.assertTrue(all(resultat == data for resultat in resultats.values()))
+        self.assertEqual(data["shots"], shots.to_dicts())
+        self.assertEqual(data["metadata"]["date_generation"], "2026-01-01T00:00:00")
+        # SuggestionMusicale : dataclass convertie, plus d'échec de json.dump
+        self.assertIsInstance(next(iter(data["suggestions_musicales"].values())), dict)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests de l'index de timeline - Court-Métrage K-pop Salta
+Les recherches dichotomiques des couches doivent rendre les mêmes indices
+qu'un parcours exhaustif, trous et intervalles vides compris, et l'index
+construit depuis le projet répondre frame par frame comme les exports.
+"""
+
+import random
+import unittest
+
+from project_model import Shot
+
+try:
+    from music_sync import BeatGrid, shot_frame_ranges
+    from timeline_index import IntervalLayer, PointLayer, TimelineIndex
+except ImportError:
+    BeatGrid = None
+
+SHOTS = [
+    Shot(1, "Préparation devant le miroir", ["Petite fille"], "preparation_danse", "anticipation_joyeuse",
+         "chambre_salta", 8.0, 6),
+    Shot(2, "Elle danse sur du K-pop", ["Petite fille"], "danse_energique", "extase_creative",
+         "chambre_salta", 12.5, 9),
+    Shot(3, "Son père frappe à la porte", ["Petite fille", "Père (voix off)"], "interruption_surprise",
+         "surprise_retour_realite", "chambre_porte_salta", 6.0, 5),
+]
+
+
+def _intervalles(graine, nombre=200):
+    """Intervalles disjoints triés, avec des trous et des intervalles vides"""
+    rng = random.Random(graine)
+    starts, ends, position = [], [], 0
+    for _ in range(nombre):
+        position += rng.choice([0, 0, 1, 3])
+        start, position = position, position + rng.choice([0, 1, 2, 5])
+        starts.append(start)
+        ends.append(position)
+    return starts, ends
+
+
+@unittest.skipIf(BeatGrid is None, "NumPy est requis pour music_sync")
+class IntervalLayerTest(unittest.TestCase):
+
+    def test_conforme_au_parcours_exhaustif(self):
+        for graine in range(5):
+            starts, ends = _intervalles(graine)
+            layer = IntervalLayer("shots", starts, ends)
+            paires = list(enumerate(zip(starts, ends)))
+            for frame in range(-2, ends[-1] + 3):
+                contient = [i for i, (s, e) in paires if s <= frame < e]
+                self.assertEqual(layer.at(frame), contient[0] if contient else None, (graine, frame))
+            rng = random.Random(graine)
+            for _ in range(300):
+                a = rng.randint(-2, ends[-1] + 2)
+                b = a + rng.randint(0, 20)
+                # Un intervalle vide ne chevauche rien ; il est compris dans [a, b) s'il tombe dedans
+                self.assertEqual(list(layer.overlapping(a, b)),
+                                 [i for i, (s, e) in paires if s < b and a < e], (graine, a, b))
+                self.assertEqual(list(layer.within(a, b)),
+                                 [i for i, (s, e) in paires if a <= s and e <= b], (graine, a, b))
+
+    def test_libelles_et_erreurs(self):
+        layer = IntervalLayer("music", [0, 10], [10, 25])
+        self.assertEqual(layer.labels, ["music_1", "music_2"])
+        self.assertEqual(layer.interval(1), (10, 25))
+        self.assertEqual(len(IntervalLayer("vide", [], [])), 0)
+        with self.assertRaises(ValueError):
+            IntervalLayer("shots", [0, 10], [10])
+        with self.assertRaises(ValueError):
+            IntervalLayer("shots", [0, 10], [12, 20])  # chevauchement
+        with self.assertRaises(ValueError):
+            IntervalLayer("shots", [10, 0], [20, 5])  # non trié
+        with self.assertRaises(ValueError):
+            IntervalLayer("shots", [5], [2])  # inversé
+
+
+@unittest.skipIf(BeatGrid is None, "NumPy est requis pour music_sync")
+class PointLayerTest(unittest.TestCase):
+
+    def test_conforme_au_parcours_exhaustif(self):
+        frames = [0, 0, 3, 7, 7, 12, 20]
+        layer = PointLayer("beats", frames)
+        for frame in range(-3, 25):
+            avant = [i for i, f in enumerate(frames) if f <= frame]
+            self.assertEqual(layer.at_or_before(frame), avant[-1] if avant else None, frame)
+            distance = min(abs(f - frame) for f in frames)
+            plus_proche = next(i for i, f in enumerate(frames) if abs(f - frame) == distance)
+            self.assertEqual(layer.nearest(frame), plus_proche, frame)
+            for fin in range(frame, frame + 8):
+                self.assertEqual(list(layer.between(frame, fin)),
+                                 [i for i, f in enumerate(frames) if frame <= f < fin])
+
+    def test_cas_limites(self):
+        vide = PointLayer("beats", [])
+        self.assertIsNone(vide.nearest(5))
+        self.assertIsNone(vide.at_or_before(5))
+        self.assertEqual(PointLayer("beats", [4], lambda i: f"Bar_{i + 1}").label(0), "Bar_1")
+        self.assertEqual(PointLayer("beats", [4]).label(0), "beats_1")
+        with self.assertRaises(ValueError):
+            PointLayer("beats", [3, 1])
+
+
+@unittest.skipIf(BeatGrid is None, "NumPy est requis pour music_sync")
+class TimelineIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.grid = BeatGrid([{"name": "Intro", "bpm": 100, "duration": 10},
+                              {"name": "K-pop Dance", "bpm": 128, "duration": 20}], 24)
+        self.index = TimelineIndex.from_project(SHOTS, self.grid)
+        self.starts, self.ends = (r.tolist() for r in shot_frame_ranges([s.duree_estimee for s in SHOTS], 24))
+
+    def test_couches_du_projet(self):
+        self.assertEqual(self.index.shots.starts, self.starts)
+        self.assertEqual(self.index.shots.ends, self.ends)
+        self.assertEqual(self.index.shots.labels, ["Shot_01", "Shot_02", "Shot_03"])
+        self.assertEqual(self.index["music"].labels, ["Intro", "K-pop Dance"])
+        self.assertEqual(self.index.beats.frames, self.grid.frames.tolist())
+        self.assertEqual(self.index.duration_frames, max(self.ends[-1], self.grid.duration_frames))
+
+    def test_requete_ponctuelle(self):
+        for frame in range(0, self.index.duration_frames + 5):
+            resultat = self.index.query(frame)
+            shots = [i for i, (s, e) in enumerate(zip(self.starts, self.ends)) if s <= frame < e]
+            self.assertEqual(resultat["shots"], f"Shot_{shots[0] + 1:02d}" if shots else None, frame)
+            beats = [i for i, f in enumerate(self.grid.frames.tolist()) if f <= frame]
+            self.assertEqual(resultat["beat_frame"], self.grid.frames[beats[-1]] if beats else None)
+            self.assertEqual(resultat["beat"], self.grid.marker_name(beats[-1]) if beats else None)
+        self.assertEqual(self.index.query(240)["music"], "K-pop Dance")
+        self.assertEqual(self.index.query(239)["music"], "Intro")
+
+    def test_requete_de_plage(self):
+        resultat = self.index.query_range(self.starts[1], self.starts[1] + 1)
+        self.assertEqual(resultat["shots"], ["Shot_02"])
+        resultat = self.index.query_range(self.ends[0] - 1, self.starts[2] + 1)
+        self.assertEqual(resultat["shots"], ["Shot_01", "Shot_02", "Shot_03"])
+        self.assertEqual(resultat["music"], ["Intro", "K-pop Dance"])
+        frames = self.grid.frames.tolist()
+        self.assertEqual(resultat["beats"], [self.grid.marker_name(i) for i, f in enumerate(frames)
+                                             if self.ends[0] - 1 <= f < self.starts[2] + 1])
+        self.assertEqual(list(self.index.beats_in("shots", 0)),
+                         [i for i, f in enumerate(frames) if f < self.ends[0]])
+
+    def test_sans_grille(self):
+        index = TimelineIndex.from_project(SHOTS, framerate=25)
+        self.assertEqual(list(index.layers), ["shots"])
+        self.assertEqual(index.query(0), {"frame": 0, "shots": "Shot_01", "beat": None, "beat_frame": None})
+        self.assertEqual(index.query_range(0, 10_000)["beats"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Index de Timeline - Court-Métrage K-pop Salta
+Répond à « qu'y a-t-il à l'écran et sur quel beat tombe la frame N » : les
+shots (clips vidéo des exports Premiere/Resolve), les pistes musicales
+(clips audio) et les beats de music_sync.BeatGrid sont indexés en frames.
+
+Chaque couche est une suite d'intervalles [début, fin) sans chevauchement,
+triés par début : les débuts et les fins sont alors tous deux croissants et
+une recherche dichotomique (bisect) sur l'un ou l'autre suffit pour les
+requêtes ponctuelles, de plage et de chevauchement, en O(log n). Les beats
+forment une couche de points triés.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from music_sync import DEFAULT_FRAMERATE, BeatGrid, shot_frame_ranges
+from project_model import ShotTable, en_table
+
+SHOTS = "shots"
+MUSIC = "music"
+
+
+class IntervalLayer:
+    """Intervalles [start, end) en frames, triés et disjoints, avec un libellé chacun"""
+
+    def __init__(self, name: str, starts: Iterable[int], ends: Iterable[int],
+                 labels: Optional[Sequence[str]] = None):
+        self.name = name
+        self.starts: List[int] = [int(start) for start in starts]
+        self.ends: List[int] = [int(end) for end in ends]
+        if len(self.starts) != len(self.ends):
+            raise ValueError(f"Couche {name} : {len(self.starts)} débuts pour {len(self.ends)} fins")
+        self.labels = list(labels) if labels is not None else [f"{name}_{i + 1}" for i in range(len(self.starts))]
+        for i, (start, end) in enumerate(zip(self.starts, self.ends)):
+            if end < start:
+                raise ValueError(f"Couche {name} : intervalle {i} inversé ({start}, {end})")
+            if i and start < self.ends[i - 1]:
+                raise ValueError(f"Couche {name} : l'intervalle {i} chevauche le précédent")
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def interval(self, index: int) -> tuple:
+        return self.starts[index], self.ends[index]
+
+    def at(self, frame: int) -> Optional[int]:
+        """Indice de l'intervalle qui contient `frame`, None dans un trou ou hors timeline
+
+        Parmi plusieurs intervalles commençant à la même frame, seul le
+        dernier peut être non vide : c'est celui que retient bisect_right.
+        """
+        index = bisect_right(self.starts, frame) - 1
+        if index >= 0 and frame < self.ends[index]:
+            return index
+        return None
+
+    def overlapping(self, start: int, end: int) -> range:
+        """Indices des intervalles qui chevauchent [start, end)"""
+        first = bisect_right(self.ends, start)
+        last = bisect_left(self.starts, end)
+        return range(first, max(first, last))
+
+    def within(self, start: int, end: int) -> range:
+        """Indices des intervalles entièrement compris dans [start, end)"""
+        first = bisect_left(self.starts, start)
+        last = bisect_right(self.ends, end)
+        return range(first, max(first, last))
+
+
+class PointLayer:
+    """Frames triées (beats), libellées à la demande par `namer(indice)`"""
+
+    def __init__(self, name: str, frames: Iterable[int], namer: Optional[Callable[[int], str]] = None):
+        self.name = name
+        self.frames: List[int] = [int(frame) for frame in frames]
+        if any(b < a for a, b in zip(self.frames, self.frames[1:])):
+            raise ValueError(f"Couche {name} : frames non triées")
+        self._namer = namer
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def label(self, index: int) -> str:
+        return self._namer(index) if self._namer is not None else f"{self.name}_{index + 1}"
+
+    def at_or_before(self, frame: int) -> Optional[int]:
+        """Dernier point à `frame` ou avant (le beat en cours)"""
+        index = bisect_right(self.frames, frame) - 1
+        return index if index >= 0 else None
+
+    def nearest(self, frame: int) -> Optional[int]:
+        """Point le plus proche de `frame` (le plus tôt en cas d'égalité)"""
+        index = bisect_left(self.frames, frame)
+        if index and (index == len(self.frames) or frame - self.frames[index - 1] <= self.frames[index] - frame):
+            # Premier des points confondus sur la frame précédente
+            return bisect_left(self.frames, self.frames[index - 1])
+        return index if index < len(self.frames) else None
+
+    def between(self, start: int, end: int) -> range:
+        """Indices des points dans [start, end)"""
+        return range(bisect_left(self.frames, start), bisect_left(self.frames, end))
+
+
+class TimelineIndex:
+    """Couches d'intervalles nommées (shots, music...) et grille de beats"""
+
+    def __init__(self, framerate: int = DEFAULT_FRAMERATE, beats: Optional[PointLayer] = None):
+        self.framerate = framerate
+        self.layers: Dict[str, IntervalLayer] = {}
+        self.beats = beats or PointLayer("beats", [])
+
+    @classmethod
+    def from_project(cls, shots, grid: Optional[BeatGrid] = None,
+                     framerate: Optional[int] = None) -> "TimelineIndex":
+        """Index des shots montés bout à bout, des pistes et des beats de la grille"""
+        shots: ShotTable = en_table(shots)
+        framerate = framerate or (grid.framerate if grid is not None else DEFAULT_FRAMERATE)
+        starts, ends = shot_frame_ranges(shots.durees, framerate)
+        beats = PointLayer("beats", grid.frames.tolist(), grid.marker_name) if grid is not None else None
+
+        index = cls(framerate, beats)
+        index.add_layer(SHOTS, starts.tolist(), ends.tolist(),
+                        [f"Shot_{numero:02d}" for numero in shots.numeros])
+        if grid is not None:
+            index.add_layer(MUSIC, [track.start_frame for track in grid.tracks],
+                            [track.end_frame for track in grid.tracks], [track.name for track in grid.tracks])
+        return index
+
+    def add_layer(self, name: str, starts: Iterable[int], ends: Iterable[int],
+                  labels: Optional[Sequence[str]] = None) -> IntervalLayer:
+        layer = IntervalLayer(name, starts, ends, labels)
+        self.layers[name] = layer
+        return layer
+
+    def __getitem__(self, name: str) -> IntervalLayer:
+        return self.layers[name]
+
+    @property
+    def shots(self) -> IntervalLayer:
+        return self.layers[SHOTS]
+
+    @property
+    def duration_frames(self) -> int:
+        return max((layer.ends[-1] for layer in self.layers.values() if len(layer)), default=0)
+
+    def beats_in(self, layer: str, index: int) -> range:
+        """Beats qui tombent pendant l'intervalle `index` de la couche `layer`"""
+        return self.beats.between(*self.layers[layer].interval(index))
+
+    def query(self, frame: int) -> Dict[str, Any]:
+        """Ce qui est à l'écran et à l'oreille à la frame `frame` : libellé par couche et beat en cours"""
+        result: Dict[str, Any] = {"frame": frame}
+        for name, layer in self.layers.items():
+            index = layer.at(frame)
+            result[name] = layer.labels[index] if index is not None else None
+        beat = self.beats.at_or_before(frame)
+        result["beat"] = self.beats.label(beat) if beat is not None else None
+        result["beat_frame"] = self.beats.frames[beat] if beat is not None else None
+        return result
+
+    def query_range(self, start: int, end: int) -> Dict[str, List[str]]:
+        """Libellés des intervalles de chaque couche qui chevauchent [start, end), et des beats compris"""
+        result = {name: [layer.labels[i] for i in layer.overlapping(start, end)]
+                  for name, layer in self.layers.items()}
+        result["beats"] = [self.beats.label(i) for i in self.beats.between(start, end)]
+        return result